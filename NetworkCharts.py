@@ -1,9 +1,18 @@
 import streamlit as st
 import streamlit.components.v1 as components
-import pandas as pd
 import json
 import os
 
+import numpy as np
+import pandas as pd
+
+from chartassets import d3_script, inline_script
+from graphdata import cache_stats, load_graph
+from graphlayout import lod_json, positioned_json
+from graphlive import live_graph
+from graphmetrics import METRICS, node_metric, top_nodes, top_subgraph
+from graphquery import focus_graph
+
 st.set_page_config(layout="wide")
 st.title("Interactive Network Graph on Assets")
 
@@ -12,42 +21,217 @@ st.title("Interactive Network Graph on Assets")
 # ---------------------------
 BASE_DIR = os.path.dirname(__file__)
 csv_path = os.path.join(BASE_DIR, "networkdata.csv")
-df = pd.read_csv(csv_path)
+
+# Cluster assignment (graphdata.GROUPINGS): "louvain" detects communities by
+# modularity, "label_propagation" is faster on very large graphs, "letter"
+# buckets nodes by the first letter of their name.
+GROUPING = "louvain"
+
+# Large exports are streamed in chunks (graphdata.stream_graph); show how far it got.
+progress_bar = None
+
+def show_progress(done, total, edges):
+    global progress_bar
+    if progress_bar is None:
+        progress_bar = st.progress(0.0)
+    progress_bar.progress(min(done / total, 1.0), text=f"Loading edges: {edges:,}")
+
+built = load_graph(csv_path, grouping=GROUPING, progress=show_progress)
+if progress_bar is not None:
+    progress_bar.empty()
+
+# Node importance (graphmetrics.py, measured once per CSV version) sizes the
+# nodes: METRIC is "pagerank", "degree" or "betweenness" (sampled, slower on
+# large graphs). Graphs of more than TOP_K nodes are cut down to their TOP_K
+# most important nodes and the links among them (None = draw every node).
+METRIC = "pagerank"
+TOP_K = None
 
 # ---------------------------
-# Build nodes and clusters
+# Focus view
 # ---------------------------
-node_ids = list(set(df["source"]).union(set(df["target"])))
-nodes = []
-for n in node_ids:
-    cluster = ord(n[0].upper()) % 10
-    nodes.append({"id": n, "group": cluster})
-
-links = [{"source": r["source"], "target": r["target"]} for _, r in df.iterrows()]
-graph = {"nodes": nodes, "links": links}
-graph_json = json.dumps(graph)
+# graphquery.py: draw only the nodes within FOCUS_HOPS links of one node
+# (typed in, or picked in the chart) or cluster, at most FOCUS_LIMIT of them,
+# the most important kept when some must go. "Expand further" adds a hop and
+# room for FOCUS_LIMIT more nodes.
+FOCUS_HOPS = 1
+FOCUS_LIMIT = 500
+
+def set_focus(node, group, hops=FOCUS_HOPS, limit=FOCUS_LIMIT):
+    st.session_state["focus"] = {"node": node, "group": group, "hops": hops, "limit": limit}
+
+def focus_on_name():
+    name = st.session_state.get("focus_name", "").strip()
+    if name:
+        set_focus(name, None)
+
+def focus_on_selection():
+    # The node or cluster last picked in the live view. A node pick also
+    # reports the node's cluster; focus on the node's neighbourhood then.
+    picked = (st.session_state.get("graph_live") or {}).get("selection") or {}
+    node, group = picked.get("node"), picked.get("group")
+    if node is not None or group is not None:
+        set_focus(node, None if node is not None else group)
+
+def expand_focus():
+    focus = st.session_state["focus"]
+    set_focus(focus["node"], focus["group"], focus["hops"] + 1, focus["limit"] + FOCUS_LIMIT)
+
+def clear_focus():
+    st.session_state["focus"] = None
+
+col_name, col_pick, col_expand, col_all = st.columns([3, 1, 1, 1], vertical_alignment="bottom")
+col_name.text_input("Focus on node", key="focus_name", on_change=focus_on_name)
+col_pick.button("Focus on selection", on_click=focus_on_selection)
+focus = st.session_state.get("focus")
+col_expand.button("Expand further", on_click=expand_focus, disabled=focus is None)
+col_all.button("Show whole graph", on_click=clear_focus, disabled=focus is None)
+
+def view_of(graph):
+    """What the chart draws of ``graph``: ``(view, truncated)``.
+
+    The focus view and whether it left nodes out, or the TOP_K cut without
+    a focus; ``view`` is ``None`` when the focus is not in ``graph``.
+    """
+    if focus is not None:
+        return focus_graph(graph, focus["node"], focus["group"], focus["hops"], focus["limit"], METRIC)
+    return (top_subgraph(graph, TOP_K, METRIC) if TOP_K else graph), False
+
+full_graph = built
+built, truncated = view_of(full_graph)
+if focus is not None:
+    around = focus["node"] if focus["node"] is not None else f"cluster {focus['group']}"
+    if built is None:
+        st.warning(f"No node or cluster {around!r} in the graph.")
+        focus = None
+        clear_focus()
+        built, truncated = view_of(full_graph)
+    else:
+        st.caption(f"Focus: {len(built.names):,} of {len(full_graph.names):,} nodes within {focus['hops']} "
+                   f"links of {around}" + (f", the {focus['limit']:,} most important" if truncated else ""))
+
+# Compact wire format: name table + base64 Uint32 link/group arrays and
+# Float32 positions precomputed server-side (cached per CSV fingerprint),
+# decoded in the page by decodeGraph(). Use built.graph_json for plain dicts.
+# LAYOUT_MODE "static" draws the positions as-is, "warm" lets the browser
+# simulation refine them briefly.
+LAYOUT_MODE = "static"
+graph_json = positioned_json(built, metric=METRIC, charge=-200)
+adjacency_json = built.adjacency_json
+
+# Ambient motion (static/ambient-motion.js): instead of a permanently warm
+# simulation, it freezes once the mean per-node kinetic energy (px^2/tick)
+# drops below energyThreshold and stops entirely while the page is hidden.
+# Every burstInterval ms up to burstNodes random nodes get a kick.
+# maxFps is the CPU budget: ticks + redraws per second (0 = display rate).
+MOTION = {
+    "maxFps": 30, "energyThreshold": 0.02,
+    "burstInterval": 60 * 1000, "burstNodes": 150, "burstStrength": 55,
+}
+
+# RENDERER "svg", "canvas" or "lod"; "auto" switches to the single-<canvas>
+# renderer (static/canvas-renderer.js) above CANVAS_NODE_THRESHOLD nodes and
+# to the level-of-detail view (static/lod-view.js), which draws clusters as
+# super-nodes and expands them on zoom, above LOD_NODE_THRESHOLD.
+RENDERER = "auto"
+CANVAS_NODE_THRESHOLD = 3000
+LOD_NODE_THRESHOLD = 50000
+renderer = RENDERER
+if renderer == "auto":
+    n_nodes = len(built.names)
+    if n_nodes > LOD_NODE_THRESHOLD:
+        renderer = "lod"
+    elif n_nodes > CANVAS_NODE_THRESHOLD:
+        renderer = "canvas"
+    else:
+        renderer = "svg"
+
+PASTEL_COLORS = ["#A8D5BA","#FFD6A5","#FFAAA6","#A0CED9","#FFC3A0","#D5AAFF","#B5EAD7","#FFDAC1","#E2F0CB","#C7CEEA"]
+canvas_options = {
+    "width": 1200, "height": 700, "palette": PASTEL_COLORS,
+    "linkDistance": 120, "linkStrength": 0.8, "charge": -200, "collideRadius": 45,
+    "velocityDecay": 0.07, "motion": MOTION,
+    "layoutMode": LAYOUT_MODE, "minLabelPx": 9, "labelDegree": 1, "maxLabels": 1500,
+}
+# Level-of-detail view: a cluster expands once its radius reaches expandPx on
+# screen, as long as at most maxUnits circles and maxLinks lines are drawn.
+lod_options = {
+    "width": 1200, "height": 700, "palette": PASTEL_COLORS,
+    "expandPx": 150, "maxUnits": 1500, "maxLinks": 3000, "redrawDelay": 120,
+}
+
+# The SVG renderer is the live component (graphlive.py): its page stays
+# mounted across reruns, node clicks and dropdown picks come back to Python,
+# and the CSV is re-checked every REFRESH_SECONDS (None = only on reruns)
+# with only the added/removed edges pushed to the page.
+REFRESH_SECONDS = 30
+svg_options = {"motion": MOTION, "layoutMode": LAYOUT_MODE}
 
 # ---------------------------
-# Full HTML + D3
+# Full HTML + D3 (canvas, level-of-detail or SVG renderer)
 # ---------------------------
-html_content = f"""
+# Pages are built once per graph version and kept on the shared graph
+# (BuiltGraph.memo), so concurrent sessions send the same string instead of
+# each formatting its own copy. Editing this script rebuilds them.
+PAGE_KEY = ("NetworkCharts", renderer, os.stat(__file__).st_mtime_ns)
+
+def canvas_page():
+    return f"""
 <!DOCTYPE html>
 <html>
 <head>
 <meta charset="utf-8">
-<script src="https://d3js.org/d3.v7.min.js"></script>
+{d3_script()}
+{inline_script("graph-decode.js")}
+{inline_script("graph-adjacency.js")}
+{inline_script("ambient-motion.js")}
+{inline_script("viewport-index.js")}
+{inline_script("label-layer.js")}
+{inline_script("canvas-renderer.js")}
 <style>
   body {{ margin: 0; background: #000; }}
-  .link {{ stroke: #888; stroke-opacity: 0.4; }}
-  .node circle {{
+  canvas {{ display: block; cursor: pointer; }}
+  select {{
+    position:absolute; top:10px; left:10px; z-index:10;
+    background:#fff; color:#000; padding:3px; border-radius:4px;
+  }}
+  #clusterSelect {{ top:40px; }}
+</style>
+</head>
+
+<body>
+<select id="nodeSelect"><option value="">--Select Node--</option></select>
+<select id="clusterSelect"><option value="">--Select Cluster--</option></select>
+<canvas id="graphCanvas"></canvas>
+
+<script>
+renderCanvasGraph(decodeGraph({graph_json}), decodeAdjacency({adjacency_json}), {json.dumps(canvas_options)});
+</script>
+</body>
+</html>
+"""
+
+def lod_page():
+    lod_payload = lod_json(built, charge=-200)
+    return f"""
+<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+{d3_script()}
+{inline_script("graph-decode.js")}
+{inline_script("lod-view.js")}
+<style>
+  body {{ margin: 0; background: #000; }}
+  .link {{ stroke: #888; stroke-opacity: 0.4; vector-effect: non-scaling-stroke; }}
+  .unit circle {{
     stroke: #fff;
     stroke-width: 1.5px;
-    filter: url(#glow);
-    cursor: pointer;
+    vector-effect: non-scaling-stroke;
   }}
-  .node text {{
+  .unit.cluster circle {{ fill-opacity: 0.8; cursor: zoom-in; }}
+  .unit text {{
     font-family: Arial, sans-serif;
-    font-size: 19px;
     font-weight: 600;
     fill: #fff;
     pointer-events: none;
@@ -57,189 +241,62 @@ html_content = f"""
     position:absolute; top:10px; left:10px; z-index:10;
     background:#fff; color:#000; padding:3px; border-radius:4px;
   }}
-  #clusterSelect {{ top:40px; }}
 </style>
 </head>
 
 <body>
-<select id="nodeSelect"><option value="">--Select Node--</option></select>
 <select id="clusterSelect"><option value="">--Select Cluster--</option></select>
-
-<svg width="1200" height="700">
-  <defs>
-    <filter id="glow" x="-50%" y="-50%" width="200%" height="200%">
-      <feGaussianBlur stdDeviation="3" result="blur"/>
-      <feMerge>
-        <feMergeNode in="blur"/>
-        <feMergeNode in="SourceGraphic"/>
-      </feMerge>
-    </filter>
-  </defs>
-</svg>
+<svg width="1200" height="700"></svg>
 
 <script>
-const graph = {graph_json};
-const width = 1200;
-const height = 700;
-const svg = d3.select("svg");
-
-// Pastel palette
-const pastelColors = ["#A8D5BA","#FFD6A5","#FFAAA6","#A0CED9","#FFC3A0","#D5AAFF","#B5EAD7","#FFDAC1","#E2F0CB","#C7CEEA"];
-const color = d3.scaleOrdinal(pastelColors);
-
-// Zoom & Pan
-const zoomLayer = svg.append("g");
-svg.call(d3.zoom().scaleExtent([0.2,5]).on("zoom", event => {{
-    zoomLayer.attr("transform", event.transform);
-}}));
-
-// Force Simulation
-const simulation = d3.forceSimulation(graph.nodes)
-  .force("link", d3.forceLink(graph.links).id(d => d.id).distance(120).strength(0.8))
-  .force("charge", d3.forceManyBody().strength(-200))  // smaller repulsion for gentle motion
-  .force("center", d3.forceCenter(width/2, height/2))
-  .force("collision", d3.forceCollide().radius(45))
-  .alphaTarget(0.05)  // keep simulation slightly active
-  .velocityDecay(0.07); // slower movement
-
-
-// Links
-const link = zoomLayer.append("g")
-  .selectAll("line")
-  .data(graph.links)
-  .enter()
-  .append("line")
-  .attr("class","link")
-  .attr("stroke-width", 3);
-
-// Nodes
-const node = zoomLayer.append("g")
-  .selectAll("g")
-  .data(graph.nodes)
-  .enter()
-  .append("g")
-  .attr("class","node")
-  .call(d3.drag().on("start", dragstarted).on("drag", dragged).on("end", dragended));
-
-node.append("circle")
-  .attr("r", 20)
-  .attr("fill", d => color(d.group));
-
-node.append("text")
-  .attr("x", 26)
-  .attr("y", 6)
-  .text(d => d.id);
-
-// ------------------- Highlight Function -------------------
-function highlight(selectionNode, selectionGroup) {{{{
-    node.select("circle")
-        .transition().duration(300)
-        .attr("r", d => (!selectionNode || d.id === selectionNode || d.group == selectionGroup ? 30 : 15))
-        .attr("fill", d => {{{{
-            if(!selectionNode || d.id === selectionNode || d.group == selectionGroup) {{{{
-                return color(d.group);
-            }}}} else {{{{
-                return "#555";
-            }}}}
-        }}}})
-        .attr("opacity", d => (!selectionNode || d.id === selectionNode || d.group == selectionGroup ? 1 : 0.2));
-
-    node.select("text")
-        .transition().duration(300)
-        .attr("opacity", d => (!selectionNode || d.id === selectionNode || d.group == selectionGroup ? 1 : 0.2));
-
-    link.transition().duration(300)
-        .attr("stroke-width", d => {{
-            if(!selectionNode || d.source.id === selectionNode || d.source.group == selectionGroup || 
-               d.target.id === selectionNode || d.target.group == selectionGroup) {{{{
-                return 6;
-            }}}} else {{{{
-                return 3;
-            }}}}
-        }})
-        .attr("opacity", d => {{
-            if(!selectionNode || d.source.id === selectionNode || d.source.group == selectionGroup || 
-               d.target.id === selectionNode || d.target.group == selectionGroup) {{{{
-                return 0.8;
-            }}}} else {{{{
-                return 0.05;
-            }}}}
-        }});
-}}}}
-
-// ------------------- Dropdown Setup -------------------
-// Node dropdown
-const nodeSelect = document.getElementById("nodeSelect");
-graph.nodes.forEach(d => {{
-    const opt = document.createElement("option");
-    opt.value = d.id;
-    opt.text = d.id;
-    nodeSelect.appendChild(opt);
-}});
-
-// Cluster dropdown
-const clusterSelect = document.getElementById("clusterSelect");
-const clusters = [...new Set(graph.nodes.map(d => d.group))];
-clusters.forEach(g => {{
-    const opt = document.createElement("option");
-    opt.value = g;
-    opt.text = "Cluster " + g;
-    clusterSelect.appendChild(opt);
-}});
-
-// Event listeners
-nodeSelect.addEventListener("change", function() {{
-    const nodeId = this.value || null;
-    highlight(nodeId, null);
-}});
-
-clusterSelect.addEventListener("change", function() {{
-    const clusterId = this.value || null;
-    highlight(null, clusterId);
-}});
-
-// ------------------- Node Click -------------------
-node.on("click", function(event, d) {{{{
-    event.stopPropagation(); // prevent background reset
-    highlight(d.id, d.group);
-}}}});
-
-// Background click reset
-svg.on("click", function(event) {{{{
-    if(event.target.tagName === 'svg') {{
-        highlight(null, null);
-        nodeSelect.value = "";
-        clusterSelect.value = "";
-    }}
-}}}});
-
-// ------------------- Simulation Tick -------------------
-simulation.on("tick", () => {{
-    link.attr("x1", d=>d.source.x).attr("y1", d=>d.source.y)
-        .attr("x2", d=>d.target.x).attr("y2", d=>d.target.y);
-    node.attr("transform", d => `translate(${{d.x}},${{d.y}})`);
-}});
-
-function suddenBurst() {{
-    graph.nodes.forEach(d => {{
-        d.vx += (Math.random()-0.5)*55;// stronger horizontal push
-        d.vy += (Math.random()-0.5)*55;// stronger vertical push
-    }});
-    simulation.alpha(0.3).restart();
-}}
-setInterval(suddenBurst, 1*60*1000);
-
-
-// ------------------- Drag Functions -------------------
-function dragstarted(event,d){{ if(!event.active) simulation.alphaTarget(0.3).restart(); d.fx=d.x; d.fy=d.y; }}
-function dragged(event,d){{ d.fx=event.x; d.fy=event.y; }}
-function dragended(event,d){{ if(!event.active) simulation.alphaTarget(0.05); d.fx=null; d.fy=null; }}
-
-
-
+renderLodGraph(decodeGraph({graph_json}), decodeLod({lod_payload}), {json.dumps(lod_options)});
 </script>
 </body>
 </html>
 """
 
-components.html(html_content, height=700)
+if renderer == "svg":
+    html_content = None
+elif renderer == "canvas":
+    html_content = built.memo(PAGE_KEY, canvas_page)
+else:
+    html_content = built.memo(PAGE_KEY, lod_page)
+
+if html_content is None:
+    @st.fragment(run_every=REFRESH_SECONDS)
+    def live_view():
+        graph = load_graph(csv_path, grouping=GROUPING)
+        live = view_of(graph)[0] or graph
+        picked = live_graph(live, GROUPING, PASTEL_COLORS, options=svg_options, layout={"charge": -200},
+                            metric=METRIC)
+        hits = np.flatnonzero(live.names == picked["node"]) if picked and picked["node"] is not None else []
+        if len(hits):
+            i = int(hits[0])
+            degree = int(np.count_nonzero(live.source == i) + np.count_nonzero(live.target == i))
+            members = int(np.count_nonzero(live.groups == live.groups[i]))
+            score = node_metric(live, METRIC)[i]
+            st.caption(f"{picked['node']}: {degree} links, {METRIC} {score:.3g}, "
+                       f"cluster {live.groups[i]} ({members} nodes)")
+        elif picked and picked["group"] is not None:
+            members = int(np.count_nonzero(live.groups == picked["group"]))
+            st.caption(f"Cluster {picked['group']}: {members} nodes")
+
+    live_view()
+else:
+    components.html(html_content, height=700)
+
+# The most important nodes of the whole graph, e.g. the critical services
+if st.checkbox("Rank nodes by importance"):
+    top = top_nodes(full_graph, 20, METRIC)
+    st.dataframe(pd.DataFrame({
+        "node": full_graph.names[top],
+        "cluster": np.asarray(full_graph.groups)[top],
+        **{name: np.asarray(node_metric(full_graph, name))[top] for name in METRICS},
+    }), hide_index=True)
+
+# Memory of the graph store shared by all sessions (graphstore.py)
+store = cache_stats()
+st.caption(
+    f"Graph store: {store['size']} graph versions, {store['bytes'] / 2**20:.1f} MB in memory"
+    f" + {store['mapped_bytes'] / 2**20:.1f} MB mapped, {store['refs']} session references"
+)
@@ -0,0 +1,66 @@
+"""Benchmark: iterrows link construction vs. graphdata.build_graph.
+
+    python bench_edgelist.py                      # 10k, 1M and 10M edges
+    python bench_edgelist.py --sizes 10000 100000 --iterrows-max 1000000
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+from graphdata import build_graph
+
+
+def synthetic_edges(n_edges, seed=0):
+    rng = np.random.default_rng(seed)
+    n_nodes = max(10, n_edges // 5)
+    labels = np.array([f"Node_{i}" for i in range(n_nodes)], dtype=object)
+    return pd.DataFrame({
+        "source": labels[rng.integers(0, n_nodes, n_edges)],
+        "target": labels[rng.integers(0, n_nodes, n_edges)],
+    })
+
+
+def iterrows_build(df):
+    # The original per-script code path.
+    node_ids = list(set(df["source"]).union(set(df["target"])))
+    nodes = []
+    for n in node_ids:
+        cluster = ord(n[0].upper()) % 10
+        nodes.append({"id": n, "group": cluster})
+    links = [{"source": r["source"], "target": r["target"]} for _, r in df.iterrows()]
+    return json.dumps({"nodes": nodes, "links": links})
+
+
+def vectorized_build(df):
+    return build_graph(df, grouping="letter").graph_json
+
+
+def timed(fn, df):
+    t0 = time.perf_counter()
+    fn(df)
+    return time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 1_000_000, 10_000_000])
+    parser.add_argument("--iterrows-max", type=int, default=None,
+                        help="skip the iterrows baseline above this many edges")
+    args = parser.parse_args()
+
+    print(f"{'edges':>12} {'iterrows s':>12} {'vectorized s':>13} {'speedup':>9}")
+    for n in args.sizes:
+        df = synthetic_edges(n)
+        vec = timed(vectorized_build, df)
+        if args.iterrows_max is not None and n > args.iterrows_max:
+            print(f"{n:>12,} {'skipped':>12} {vec:>13.3f} {'-':>9}")
+            continue
+        old = timed(iterrows_build, df)
+        print(f"{n:>12,} {old:>12.3f} {vec:>13.3f} {old / vec:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
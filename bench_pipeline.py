@@ -0,0 +1,378 @@
+"""Benchmark: per-stage cost of the chart scripts' graph-building path.
+
+    python bench_pipeline.py                                  # 1e3..1e6 edges, all shapes
+    python bench_pipeline.py --large --shapes scale_free --variants NetworkCharts   # ... and 1e7
+    python bench_pipeline.py --out after.json                 # on this tree ...
+    git worktree add /tmp/before c9620a3
+    python bench_pipeline.py --repo /tmp/before --out before.json   # ... and on another commit
+    python bench_pipeline.py --out after.json --compare before.json
+
+Synthetic edge lists of four shapes (chain, star, scale_free, components)
+are written to CSV once per size and run through the stages of the tree in
+``--repo`` (this one by default), each timed on its own:
+
+    read_csv  graphdata.read_edges (pandas.read_csv on older trees)
+    node_set  graphdata.encode_edges: node table and integer link endpoints
+    clusters  group per node (graphdata.GROUPINGS)
+    layout    graphlayout.layout_positions and node importance
+              (variants that ship positions)
+    links     the node -> link index shipped for highlighting
+              (graphdata.adjacency_json_from_arrays)
+    json      the graph payload string (graph_json_from_arrays or
+              compact_json_from_arrays, graphdata's json.dumps)
+    html      the f-string page template with the payload and scripts inlined
+    page      the script file itself, run once with Streamlit's AppTest:
+              everything above as a first visit sees it
+    rerun     a second run of the same script session (cached paths)
+
+The first seven stages call graphdata/graphlayout functions and are blank
+on trees that lack them (from before graphdata.py, or with older
+signatures); ``page`` and ``rerun`` run the script file, so they measure
+any commit. Every measurement runs in a fresh
+subprocess, so each repetition starts with cold caches and no compiled
+artifact. Each stage is timed (best of ``--repeat``) and, unless
+``--no-memory``, run once more under tracemalloc for its peak allocation;
+rows also carry the worker's peak RSS. Results go to ``--out`` as JSON with
+the commit and library versions, and ``--compare`` prints the time and
+memory ratios against an earlier results file.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STAGES = ["read_csv", "node_set", "clusters", "layout", "links", "json", "html", "page", "rerun"]
+API_STAGES = STAGES[:7]
+PAGE_STAGES = STAGES[7:]
+
+# Script variants: the grouping, payload and index each one builds
+VARIANTS = {
+    "network4": {"grouping": "flat", "payload": "graph_json", "adjacency": False, "layout": None,
+                 "metric": None},
+    "network6": {"grouping": "louvain", "payload": "positioned_json", "adjacency": False, "layout": {},
+                 "metric": None},
+    "NetworkCharts": {"grouping": "louvain", "payload": "positioned_json", "adjacency": True,
+                      "layout": {"charge": -200}, "metric": "pagerank"},
+}
+SIZES = [1_000, 10_000, 100_000, 1_000_000]
+LARGE_SIZES = [10_000_000]
+COMPONENT_SIZE = 10  # nodes per component of the "components" shape
+SCRIPT_TIMEOUT = 1800  # s per script run
+
+
+# ---------------------------
+# Synthetic edge lists
+# ---------------------------
+def _labels(ids):
+    return ("Node_" + pd.Index(ids).astype(str)).to_numpy(dtype=object)
+
+
+def synthetic_shape(shape, n_edges, seed=0):
+    """Edge list DataFrame of ``n_edges`` edges shaped like ``shape``."""
+    rng = np.random.default_rng(seed)
+    if shape == "chain":
+        src = np.arange(n_edges)
+        tgt = src + 1
+    elif shape == "star":
+        src = np.zeros(n_edges, dtype=np.int64)
+        tgt = np.arange(1, n_edges + 1)
+    elif shape == "scale_free":
+        # Endpoints drawn with probability ~ 1 / rank: a few hubs, a long tail
+        n_nodes = max(10, n_edges // 4)
+        p = 1.0 / np.arange(1, n_nodes + 1)
+        src = rng.integers(0, n_nodes, n_edges)
+        tgt = rng.choice(n_nodes, n_edges, p=p / p.sum())
+    elif shape == "components":
+        # Many small clusters of COMPONENT_SIZE nodes with edges only inside them
+        n_comp = max(1, n_edges // (2 * COMPONENT_SIZE))
+        comp = rng.integers(0, n_comp, n_edges) * COMPONENT_SIZE
+        src = comp + rng.integers(0, COMPONENT_SIZE, n_edges)
+        tgt = comp + rng.integers(0, COMPONENT_SIZE, n_edges)
+    else:
+        raise ValueError(f"unknown shape {shape!r}")
+    return pd.DataFrame({"source": _labels(src), "target": _labels(tgt)})
+
+
+def synthetic_csv(directory, shape, n_edges):
+    path = os.path.join(directory, f"{shape}-{n_edges}.csv")
+    if not os.path.exists(path):
+        synthetic_shape(shape, n_edges).to_csv(path, index=False)
+    return path
+
+
+def script_dir(directory, repo, csv_path):
+    """A directory that looks like ``repo`` but whose networkdata.csv is ``csv_path``.
+
+    The scripts read BASE_DIR/networkdata.csv, so they run unchanged from
+    here; everything else is linked back to ``repo``.
+    """
+    run_dir = os.path.join(directory, "run-" + os.path.splitext(os.path.basename(csv_path))[0])
+    os.makedirs(run_dir, exist_ok=True)
+    for name in os.listdir(repo):
+        if name.startswith("networkdata.csv") or name.startswith("network_graph") or name == ".git":
+            continue
+        link = os.path.join(run_dir, name)
+        if not os.path.lexists(link):
+            os.symlink(os.path.join(repo, name), link)
+    link = os.path.join(run_dir, "networkdata.csv")
+    if not os.path.lexists(link):
+        os.symlink(os.path.abspath(csv_path), link)
+    return run_dir
+
+
+# ---------------------------
+# Workers (one subprocess per measurement)
+# ---------------------------
+def _measure(fn, memory):
+    if memory:
+        tracemalloc.start()
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return peak
+    t0 = time.perf_counter()
+    fn()
+    return time.perf_counter() - t0
+
+
+def render_page(payload, adjacency, assets):
+    # Same shape as the scripts' templates: scripts and payload inlined
+    return f"""
+<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+{assets}
+</head>
+<body>
+<svg width="1200" height="700"></svg>
+<script>
+const graph = decodeGraph({payload});
+const adjacency = {adjacency or "null"};
+</script>
+</body>
+</html>
+"""
+
+
+def api_worker(job):
+    """The graphdata/graphlayout stages of one variant; ``{}`` on trees without them."""
+    try:
+        import graphdata
+    except ImportError:
+        return {}, {}
+    # Imports are not part of any stage
+    import streamlit  # noqa: F401  every page imports it
+    try:
+        import graphlayout
+        import graphmetrics
+    except ImportError:
+        graphlayout = graphmetrics = None
+    try:
+        from chartassets import d3_script, inline_script
+        assets = "\n".join([d3_script(), inline_script("graph-decode.js"), inline_script("graph-adjacency.js")])
+    except ImportError:
+        assets = '<script src="https://d3js.org/d3.v7.min.js"></script>'
+    variant = VARIANTS[job["variant"]]
+    read_edges = getattr(graphdata, "read_edges", None) or (
+        lambda path: pd.read_csv(path, usecols=["source", "target"]))
+    s = {"x": None, "y": None, "importance": None, "adjacency": None}
+
+    def read_csv():
+        s["df"] = read_edges(job["csv"]).dropna()
+
+    def node_set():
+        s["names"], s["src"], s["tgt"] = graphdata.encode_edges(s["df"]["source"], s["df"]["target"])
+
+    def clusters():
+        s["groups"] = graphdata.GROUPINGS[variant["grouping"]](s["names"], s["src"], s["tgt"])
+
+    def layout():
+        built = graphdata.BuiltGraph(None, s["names"], s["groups"], s["src"], s["tgt"])
+        s["x"], s["y"] = graphlayout.layout_positions(built, **variant["layout"])
+        if variant["metric"]:
+            s["importance"] = graphmetrics.importance(built, variant["metric"])
+
+    def links():
+        s["adjacency"] = graphdata.adjacency_json_from_arrays(s["groups"], s["src"], s["tgt"])
+
+    def payload():
+        if variant["payload"] == "graph_json":
+            s["payload"] = graphdata.graph_json_from_arrays(s["names"], s["groups"], s["src"], s["tgt"])
+        else:
+            s["payload"] = graphdata.compact_json_from_arrays(s["names"], s["groups"], s["src"], s["tgt"],
+                                                              s["x"], s["y"], s["importance"])
+
+    def html():
+        s["html"] = render_page(s["payload"], s["adjacency"], assets)
+
+    stages = [("read_csv", read_csv), ("node_set", node_set), ("clusters", clusters)]
+    if variant["layout"] is not None and graphlayout is not None:
+        stages.append(("layout", layout))
+    if variant["adjacency"]:
+        stages.append(("links", links))
+    stages += [("json", payload), ("html", html)]
+    results = {name: _measure(fn, job["memory"]) for name, fn in stages}
+    return results, {"nodes": len(s["names"]), "html_bytes": len(s["html"])}
+
+
+def page_worker(job):
+    """A first run and a rerun of the variant's script against the job's CSV."""
+    from streamlit.testing.v1 import AppTest
+
+    shutil.rmtree(os.path.join(job["run_dir"], "networkdata.csv.graph"), ignore_errors=True)
+    at = AppTest.from_file(os.path.join(job["run_dir"], job["variant"] + ".py"), default_timeout=job["timeout"])
+    results = {}
+    for name in PAGE_STAGES:
+        results[name] = _measure(at.run, job["memory"])
+        if at.exception:
+            raise RuntimeError(f"{job['variant']}.py raised: {at.exception[0].value}")
+    return results, {}
+
+
+def run_worker(job):
+    # Import the chart modules of the measured tree only, not this file's
+    sys.path[:] = [job["repo"]] + [p for p in sys.path if os.path.abspath(p or ".") != BASE_DIR]
+    os.chdir(job["repo"])
+    results, sizes = (page_worker if job["kind"] == "page" else api_worker)(job)
+    sizes["max_rss_bytes"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    print(json.dumps({"results": results, "sizes": sizes}))
+
+
+def spawn(job):
+    """Run ``job`` in a fresh interpreter; ``None`` if it fails or times out."""
+    try:
+        out = subprocess.run([sys.executable, os.path.abspath(__file__), "--worker", json.dumps(job)],
+                             capture_output=True, text=True, timeout=job["timeout"] * len(PAGE_STAGES))
+    except subprocess.TimeoutExpired:
+        print(f"  {job['kind']} {job['variant']}: timed out", file=sys.stderr)
+        return None
+    if out.returncode != 0:
+        print(f"  {job['kind']} {job['variant']}: {out.stderr.strip().splitlines()[-1:]}", file=sys.stderr)
+        return None
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def bench(repo, csv_path, run_dir, variant, repeat, memory, timeout):
+    best, peaks, sizes = {}, {}, {}
+    for kind in ("api", "page"):
+        job = {"kind": kind, "repo": repo, "csv": csv_path, "run_dir": run_dir, "variant": variant,
+               "memory": False, "timeout": timeout}
+        for _ in range(repeat):
+            out = spawn(job)
+            if out is None:
+                break
+            sizes.update(out["sizes"])
+            for k, v in out["results"].items():
+                best[k] = min(best.get(k, np.inf), v)
+        if memory and out is not None:
+            out = spawn({**job, "memory": True})
+            if out is not None:
+                peaks.update(out["results"])
+    return best, peaks, sizes
+
+
+# ---------------------------
+# Results
+# ---------------------------
+def environment(repo=BASE_DIR):
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=repo).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "commit": commit,
+        "date": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "machine": platform.machine(),
+    }
+
+
+def _key(row):
+    return row["shape"], row["edges"], row["variant"], row["stage"]
+
+
+def compare(rows, baseline_path):
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    old = {_key(r): r for r in baseline["results"]}
+    print(f"\nvs {baseline_path} (commit {baseline['environment'].get('commit')}): new / old")
+    print(f"{'shape':>11} {'edges':>11} {'variant':>14} {'stage':>9} {'time':>7} {'memory':>7}")
+    for r in rows:
+        o = old.get(_key(r))
+        if o is None or r["seconds"] is None or o["seconds"] is None:
+            continue
+        t = r["seconds"] / o["seconds"] if o["seconds"] else float("nan")
+        m = r["peak_bytes"] / o["peak_bytes"] if r.get("peak_bytes") and o.get("peak_bytes") else float("nan")
+        print(f"{r['shape']:>11} {r['edges']:>11,} {r['variant']:>14} {r['stage']:>9} {t:>6.2f}x {m:>6.2f}x")
+
+
+def _cell(value):
+    return f"{value:>9.4f}" if value is not None else f"{'-':>9}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--large", action="store_true", help=f"also run {LARGE_SIZES} edges")
+    parser.add_argument("--shapes", nargs="+", default=["chain", "star", "scale_free", "components"])
+    parser.add_argument("--variants", nargs="+", default=["network4", "NetworkCharts"], choices=sorted(VARIANTS))
+    parser.add_argument("--repo", default=BASE_DIR, help="tree whose chart scripts are measured")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per stage; the best is kept")
+    parser.add_argument("--timeout", type=int, default=SCRIPT_TIMEOUT, help="seconds per script run")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc pass")
+    parser.add_argument("--data-dir", default=None, help="keep the synthetic CSVs here between runs")
+    parser.add_argument("--out", default=None, help="write the results as JSON")
+    parser.add_argument("--compare", default=None, help="results JSON of an earlier run to compare against")
+    parser.add_argument("--worker", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker:
+        run_worker(json.loads(args.worker))
+        return
+
+    repo = os.path.abspath(args.repo)
+    sizes = args.sizes + (LARGE_SIZES if args.large else [])
+    rows = []
+    with tempfile.TemporaryDirectory(prefix="bench-pipeline-") as tmp:
+        data_dir = os.path.abspath(args.data_dir or tmp)
+        os.makedirs(data_dir, exist_ok=True)
+        print(f"{'shape':>11} {'edges':>11} {'variant':>14} "
+              + " ".join(f"{s:>9}" for s in STAGES) + f" {'peak MB':>8}")
+        for shape in args.shapes:
+            for n in sizes:
+                csv_path = synthetic_csv(data_dir, shape, n)
+                run_dir = script_dir(tmp, repo, csv_path)
+                for name in args.variants:
+                    seconds, peaks, extra = bench(repo, csv_path, run_dir, name, args.repeat,
+                                                  not args.no_memory, args.timeout)
+                    for stage in STAGES:
+                        rows.append({"shape": shape, "edges": n, "variant": name, "stage": stage,
+                                     "seconds": seconds.get(stage), "peak_bytes": peaks.get(stage), **extra})
+                    peak = max(peaks.values()) / 2**20 if peaks else float("nan")
+                    print(f"{shape:>11} {n:>11,} {name:>14} "
+                          + " ".join(_cell(seconds.get(s)) for s in STAGES) + f" {peak:>8.1f}")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"environment": environment(repo), "results": rows}, f, indent=1)
+    if args.compare:
+        compare(rows, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,325 @@
+"""Benchmark: browser-side cost of the D3 templates in headless Chromium.
+
+    pip install playwright && playwright install chromium
+    python bench_render.py                                   # all scripts, 500..50k edges
+    python bench_render.py --scripts network8 NetworkCharts --sizes 2000 20000 --out after.json
+    python bench_render.py --out after.json --compare before.json
+
+Each chart script is run against a synthetic edge list (bench_pipeline.py)
+with ``components.html`` and the live component captured instead of sent to
+Streamlit. The captured page is served from a local HTTP server together
+with static/ (same paths as Streamlit's static serving), and every request
+to anything else is aborted, so d3 and the scripts load locally and nothing
+touches the network. Per page it reports:
+
+    ready_ms      navigation start until the graph is drawn
+    ticks/s       simulation ticks per second (timer-driven and manual ticks)
+    stable_ms     navigation start until alpha first drops below 0.01
+                  (blank when the layout is drawn as-is and never simulated)
+    long_tasks    main-thread tasks over 50 ms and their total duration
+    highlight_ms  median time from a real click on a node to the second
+                  frame after it (the highlight transition starts painting)
+    heap_mb       used JS heap once settled; dom_nodes: live DOM node count
+
+A page counts as settled once it is stable or no tick has happened for
+IDLE_SECONDS, and is given at most ``--settle`` seconds. Results go to
+``--out`` as JSON with the commit and browser version; ``--compare`` prints
+new/old ratios against an earlier results file.
+"""
+import argparse
+import contextlib
+import http.server
+import json
+import os
+import runpy
+import statistics
+import tempfile
+import threading
+import time
+
+import streamlit as st
+import streamlit.components.v1 as components
+
+import graphdata
+import graphlive
+from bench_pipeline import environment, synthetic_csv
+from chartassets import STATIC_DIR
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SCRIPTS = ["network4", "network5", "network6", "network7", "network8", "network9", "NetworkCharts"]
+COMPONENT_PATH = "/component/graphlive.graph_live/"
+ALPHA_STABLE = 0.01
+IDLE_SECONDS = 2
+HIGHLIGHT_CLICKS = 5
+METRICS = ["ready_ms", "ticks_per_sec", "stable_ms", "long_task_ms", "highlight_ms", "heap_bytes", "dom_nodes"]
+
+# Injected before any page script: counts simulation ticks and long tasks.
+# d3's UMD build creates window.d3 and then assigns its exports one by one,
+# so forceSimulation is wrapped as it is assigned.
+INSTRUMENT = """
+(() => {
+  const bench = window.__bench = {ticks: 0, firstTick: null, lastTick: null, stableAt: null,
+                                  longTasks: 0, longTaskMs: 0, latencies: []};
+  new PerformanceObserver(list => list.getEntries().forEach(e => {
+    bench.longTasks++;
+    bench.longTaskMs += e.duration;
+  })).observe({type: "longtask", buffered: true});
+
+  function counted(sim, n) {
+    const now = performance.now();
+    if (bench.firstTick === null) bench.firstTick = now;
+    bench.lastTick = now;
+    bench.ticks += n;
+    if (bench.stableAt === null && sim.alpha() < %(alpha)s) bench.stableAt = now;
+  }
+  function instrument(create) {
+    return function() {
+      const sim = create.apply(this, arguments);
+      sim.on("tick.bench", () => counted(sim, 1));
+      const tick = sim.tick;
+      sim.tick = function(n) {
+        const out = tick.apply(this, arguments);
+        counted(sim, n === undefined ? 1 : n);
+        return out;
+      };
+      return sim;
+    };
+  }
+  let d3;
+  Object.defineProperty(window, "d3", {configurable: true, get: () => d3, set(v) {
+    let create;
+    Object.defineProperty(v, "forceSimulation", {configurable: true, enumerable: true,
+      get: () => create, set(f) { create = instrument(f); }});
+    d3 = v;
+  }});
+
+  // Click -> second frame after it, for every click (capture phase, before the page's handlers)
+  document.addEventListener("click", event => {
+    requestAnimationFrame(() => requestAnimationFrame(() => {
+      bench.latencies.push(performance.now() - event.timeStamp);
+    }));
+  }, true);
+})();
+""" % {"alpha": ALPHA_STABLE}
+
+FRAMES = "() => new Promise(r => requestAnimationFrame(() => requestAnimationFrame(() => r(performance.now()))))"
+
+
+# ---------------------------
+# Capturing the pages
+# ---------------------------
+@contextlib.contextmanager
+def captured_pages(csv_path):
+    """Pages emitted by chart scripts run inside the block, loading ``csv_path`` instead of their CSV.
+
+    Yields a list that fills with ``("html", document)`` for ``components.html``
+    calls and ``("component", kwargs)`` for the live component. Fragments
+    only run under ``streamlit run``, so they are called like plain functions.
+    """
+    pages = []
+    saved = graphdata.load_graph, components.html, graphlive._component, st.fragment
+    load = saved[0]
+    graphdata.load_graph = lambda path, **kw: load(csv_path, **kw)
+    components.html = lambda html, **kw: pages.append(("html", html))
+    graphlive._component = lambda **kw: pages.append(("component", kw))
+    st.fragment = lambda func=None, **kw: func if func is not None else (lambda f: f)
+    try:
+        yield pages
+    finally:
+        graphdata.load_graph, components.html, graphlive._component, st.fragment = saved
+
+
+def script_pages(script, csv_path):
+    with captured_pages(csv_path) as pages:
+        runpy.run_path(os.path.join(BASE_DIR, script + ".py"), run_name="__main__")
+    return pages
+
+
+def renderer_of(kind, content):
+    if kind == "component":
+        return "svg-live"
+    if "renderCanvasGraph(" in content:
+        return "canvas"
+    if "renderLodGraph(" in content:
+        return "lod"
+    return "svg"
+
+
+# ---------------------------
+# Local server
+# ---------------------------
+class _Handler(http.server.SimpleHTTPRequestHandler):
+    # Serves /page.html (the captured document), /app/static/ and the component directory
+    page = b""
+
+    def translate_path(self, path):
+        path = path.split("?", 1)[0]
+        if path.startswith("/app/static/"):
+            return os.path.join(STATIC_DIR, path[len("/app/static/"):])
+        if path.startswith(COMPONENT_PATH):
+            return os.path.join(STATIC_DIR, "graph-live", path[len(COMPONENT_PATH):])
+        return os.path.join(STATIC_DIR, "__missing__")
+
+    def do_GET(self):
+        if self.path == "/page.html":
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(self.page)))
+            self.end_headers()
+            self.wfile.write(self.page)
+            return
+        super().do_GET()
+
+    def log_message(self, *args):
+        pass
+
+
+@contextlib.contextmanager
+def local_server():
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server, f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+
+
+# ---------------------------
+# Measuring
+# ---------------------------
+def _settle(page, limit):
+    deadline = time.monotonic() + limit
+    while time.monotonic() < deadline:
+        done = page.evaluate(
+            "([idle]) => { const b = window.__bench; const last = b.lastTick ?? 0;"
+            " return b.stableAt !== null || performance.now() - last > idle; }",
+            [IDLE_SECONDS * 1000],
+        )
+        if done:
+            return
+        page.wait_for_timeout(250)
+
+
+def _click_targets(page):
+    # Centres of the first few attached nodes, or of the canvas
+    return page.evaluate("""(count) => {
+      const els = [...document.querySelectorAll("g.node circle.dot, g.node circle, g.unit circle")].slice(0, count);
+      const boxes = (els.length ? els : [...document.querySelectorAll("canvas")]).map(e => e.getBoundingClientRect());
+      return boxes.filter(b => b.width > 0).map(b => [b.x + b.width / 2, b.y + b.height / 2]);
+    }""", HIGHLIGHT_CLICKS)
+
+
+def measure_page(browser, base_url, kind, content, settle):
+    context = browser.new_context(viewport={"width": 1280, "height": 760})
+    context.route("**/*", lambda route: route.continue_() if route.request.url.startswith(base_url) else route.abort())
+    page = context.new_page()
+    page.add_init_script(INSTRUMENT)
+    cdp = context.new_cdp_session(page)
+    cdp.send("Performance.enable")
+    try:
+        if kind == "html":
+            _Handler.page = content.encode("utf-8")
+            page.goto(base_url + "/page.html", wait_until="load")
+        else:
+            page.goto(base_url + COMPONENT_PATH + "index.html", wait_until="load")
+            args = {k: v for k, v in content.items() if k not in ("key", "default")}
+            page.evaluate("(args) => window.dispatchEvent(new MessageEvent('message', "
+                          "{data: {isStreamlitMessage: true, type: 'streamlit:render', args}}))", args)
+        ready = page.evaluate(FRAMES)
+        _settle(page, settle)
+
+        for x, y in _click_targets(page):
+            page.mouse.click(x, y)
+            page.evaluate(FRAMES)
+        page.wait_for_timeout(100)
+
+        bench = page.evaluate("() => window.__bench")
+        metrics = {m["name"]: m["value"] for m in cdp.send("Performance.getMetrics")["metrics"]}
+    finally:
+        context.close()
+
+    ticks = bench["ticks"]
+    span = (bench["lastTick"] or 0) - (bench["firstTick"] or 0)
+    return {
+        "ready_ms": ready,
+        "ticks": ticks,
+        "ticks_per_sec": ticks / (span / 1000) if ticks > 1 and span > 0 else None,
+        "stable_ms": bench["stableAt"],
+        "long_tasks": bench["longTasks"],
+        "long_task_ms": bench["longTaskMs"],
+        "highlight_ms": statistics.median(bench["latencies"]) if bench["latencies"] else None,
+        "heap_bytes": metrics.get("JSHeapUsedSize"),
+        "dom_nodes": metrics.get("Nodes"),
+    }
+
+
+# ---------------------------
+# Results
+# ---------------------------
+def _fmt(value, scale=1.0, digits=0):
+    return "-" if value is None else f"{value / scale:.{digits}f}"
+
+
+def compare(rows, baseline_path):
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    old = {(r["script"], r["edges"]): r for r in baseline["results"]}
+    print(f"\nvs {baseline_path} (commit {baseline['environment'].get('commit')}): new / old")
+    print(f"{'script':>14} {'edges':>9} " + " ".join(f"{m:>13}" for m in METRICS))
+    for r in rows:
+        o = old.get((r["script"], r["edges"]))
+        if o is None:
+            continue
+        ratios = [r[m] / o[m] if r.get(m) is not None and o.get(m) else None for m in METRICS]
+        print(f"{r['script']:>14} {r['edges']:>9,} " + " ".join(
+            f"{'-':>13}" if v is None else f"{v:>12.2f}x" for v in ratios))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scripts", nargs="+", default=SCRIPTS)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[500, 2_000, 10_000, 50_000])
+    parser.add_argument("--shape", default="scale_free", help="bench_pipeline.synthetic_shape shape")
+    parser.add_argument("--settle", type=float, default=20, help="seconds a page may take to settle")
+    parser.add_argument("--executable", default=None, help="Chromium binary to use instead of Playwright's")
+    parser.add_argument("--out", default=None, help="write the results as JSON")
+    parser.add_argument("--compare", default=None, help="results JSON of an earlier run to compare against")
+    args = parser.parse_args()
+
+    try:
+        from playwright.sync_api import sync_playwright
+    except ImportError:
+        parser.exit(1, "bench_render.py needs Playwright: pip install playwright && playwright install chromium\n")
+
+    rows = []
+    with tempfile.TemporaryDirectory(prefix="bench-render-") as data_dir, \
+            local_server() as (_, base_url), sync_playwright() as p:
+        browser = p.chromium.launch(headless=True, executable_path=args.executable)
+        print(f"{'script':>14} {'edges':>9} {'nodes':>8} {'renderer':>9} {'ready ms':>9} {'ticks/s':>8} "
+              f"{'stable ms':>10} {'long tasks':>14} {'click ms':>9} {'heap MB':>8} {'DOM':>8}")
+        for n in args.sizes:
+            csv_path = synthetic_csv(data_dir, args.shape, n)
+            nodes = len(graphdata.load_graph(csv_path, persist=False).names)
+            for script in args.scripts:
+                for kind, content in script_pages(script, csv_path):
+                    r = measure_page(browser, base_url, kind, content, args.settle)
+                    r = {"script": script, "edges": n, "nodes": nodes,
+                         "renderer": renderer_of(kind, content), **r}
+                    rows.append(r)
+                    print(f"{script:>14} {n:>9,} {nodes:>8,} {r['renderer']:>9} {_fmt(r['ready_ms']):>9} "
+                          f"{_fmt(r['ticks_per_sec']):>8} {_fmt(r['stable_ms']):>10} "
+                          f"{r['long_tasks']:>4} / {_fmt(r['long_task_ms']):>7} {_fmt(r['highlight_ms'], digits=1):>9} "
+                          f"{_fmt(r['heap_bytes'], 2**20, 1):>8} {_fmt(r['dom_nodes']):>8}")
+        environment_info = {**environment(), "browser": browser.version}
+        browser.close()
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"environment": environment_info, "results": rows}, f, indent=1)
+    if args.compare:
+        compare(rows, args.compare)
+
+
+if __name__ == "__main__":
+    main()
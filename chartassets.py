@@ -0,0 +1,56 @@
+"""Static JS assets shared by the chart templates (see ``static/``)."""
+import functools
+import hashlib
+import os
+
+STATIC_DIR = os.path.join(os.path.dirname(__file__), "static")
+
+# Vendored d3 (static/d3.v7.min.js, v7.9.0), so pages render on hosts without
+# internet access. To ship a smaller bundle, build one containing only the
+# modules the templates use (d3-force, d3-selection, d3-zoom, d3-drag,
+# d3-scale, d3-transition, d3-quadtree, d3-ease, d3-array) as a UMD file
+# exposing the global `d3`, drop it into static/ and point D3_ASSET at it.
+D3_ASSET = "d3.v7.min.js"
+
+# "inline" embeds d3 in every page: no request at all, but the library is
+# re-parsed when Streamlit recreates the iframe. "static" references it from
+# Streamlit's static file serving (server.enableStaticServing in
+# .streamlit/config.toml) under a content-hashed URL, so the browser fetches
+# it once and serves reruns from its cache.
+D3_MODE = "inline"
+
+
+@functools.lru_cache(maxsize=None)
+def read_asset(name):
+    with open(os.path.join(STATIC_DIR, name), "r", encoding="utf-8") as f:
+        return f.read()
+
+
+@functools.lru_cache(maxsize=None)
+def asset_hash(name):
+    """Short content hash of a static asset, for cache-busting URLs."""
+    return hashlib.sha1(read_asset(name).encode("utf-8")).hexdigest()[:12]
+
+
+def inline_script(name):
+    """``<script>`` tag with the asset inlined, for f-string HTML templates."""
+    return f"<script>\n{read_asset(name)}\n</script>"
+
+
+def static_url(name):
+    """URL of an asset under Streamlit's static file serving, versioned by content hash."""
+    import streamlit as st
+
+    base = st.get_option("server.baseUrlPath").strip("/")
+    prefix = f"/{base}" if base else ""
+    return f"{prefix}/app/static/{name}?v={asset_hash(name)}"
+
+
+def d3_script(mode=None):
+    """``<script>`` tag loading the vendored d3, inlined or from the static path (see ``D3_MODE``)."""
+    mode = mode or D3_MODE
+    if mode == "static":
+        return f'<script src="{static_url(D3_ASSET)}"></script>'
+    if mode == "inline":
+        return f'<script data-asset="{D3_ASSET}" data-sha1="{asset_hash(D3_ASSET)}">\n{read_asset(D3_ASSET)}\n</script>'
+    raise ValueError(f"unknown d3 mode {mode!r}; expected 'inline' or 'static'")
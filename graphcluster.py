@@ -0,0 +1,143 @@
+"""Community detection on the integer-encoded edge arrays.
+
+Both methods work on a SciPy sparse adjacency matrix and update many nodes
+per step with vectorized sparse products instead of visiting them one by
+one, so a graph with millions of edges clusters in seconds:
+
+- ``label_propagation``: every node adopts the label carrying most of its
+  edge weight; a random half of the nodes update per round so labels do
+  not oscillate.
+- ``louvain``: modularity optimisation. Each round moves a random half of
+  the nodes that gain from joining a neighbouring community, then the
+  communities are collapsed into nodes and the process repeats on the
+  smaller graph.
+
+Labels are numbered by community size, largest first, so the biggest
+clusters get the first palette colours.
+"""
+import numpy as np
+from scipy.sparse import coo_matrix, csr_matrix
+
+MAX_ROUNDS = 50
+MAX_LEVELS = 10
+MOVE_FRACTION = 0.5  # share of improving nodes moved per round
+MIN_IMPROVING = 0.01  # a Louvain level ends once fewer nodes than this still gain
+
+
+def adjacency(n_nodes, src, tgt):
+    """Symmetric CSR adjacency with duplicate edges summed into weights."""
+    src = np.asarray(src, dtype=np.int64)
+    tgt = np.asarray(tgt, dtype=np.int64)
+    w = np.ones(len(src))
+    a = coo_matrix((w, (src, tgt)), shape=(n_nodes, n_nodes))
+    return (a + a.T).tocsr()
+
+
+def _one_hot(labels, n_labels):
+    n = len(labels)
+    return csr_matrix((np.ones(n), labels, np.arange(n + 1)), shape=(n, n_labels))
+
+
+def _best_per_row(m, score):
+    # Column of the highest score in each row of CSR matrix m (-1 for empty rows)
+    n = m.shape[0]
+    best = np.full(n, -1, dtype=np.int64)
+    best_score = np.full(n, -np.inf)
+    filled = np.diff(m.indptr) > 0
+    if not filled.any():
+        return best, best_score
+    rows = np.repeat(np.arange(n), np.diff(m.indptr))
+    top = np.full(n, -np.inf)
+    top[filled] = np.maximum.reduceat(score, m.indptr[:-1][filled])
+    hits = np.flatnonzero(score == top[rows])
+    first = np.r_[True, rows[hits][1:] != rows[hits][:-1]]
+    hits = hits[first]
+    best[rows[hits]] = m.indices[hits]
+    best_score[rows[hits]] = score[hits]
+    return best, best_score
+
+
+def _by_size(labels):
+    # Renumber labels 0..k-1, largest community first
+    _, inverse, counts = np.unique(labels, return_inverse=True, return_counts=True)
+    rank = np.empty(len(counts), dtype=np.int64)
+    rank[np.argsort(-counts, kind="stable")] = np.arange(len(counts))
+    return rank[inverse].astype(np.int32)
+
+
+def label_propagation(n_nodes, src, tgt, seed=0, max_rounds=MAX_ROUNDS):
+    """Community label per node by asynchronous-style label propagation."""
+    rng = np.random.default_rng(seed)
+    a = adjacency(n_nodes, src, tgt)
+    labels = np.arange(n_nodes)
+    for _ in range(max_rounds):
+        votes = (a @ _one_hot(labels, n_nodes)).tocsr()
+        # Tiny noise breaks ties between equally weighted labels at random
+        best, _ = _best_per_row(votes, votes.data + rng.random(votes.nnz) * 1e-6)
+        update = (best >= 0) & (best != labels) & (rng.random(n_nodes) < MOVE_FRACTION)
+        if not update.any():
+            # Only stop once no node at all would change
+            if not ((best >= 0) & (best != labels)).any():
+                break
+            continue
+        labels = np.where(update, best, labels)
+    return _by_size(labels)
+
+
+def _local_moves(a, rng, max_rounds):
+    # One Louvain level: community per node of the (weighted) graph a
+    n = a.shape[0]
+    k = np.asarray(a.sum(axis=1)).ravel()
+    m2 = k.sum()
+    labels = np.arange(n)
+    if m2 == 0:
+        return labels
+    coo = a.tocoo()
+    self_w = a.diagonal()
+    for _ in range(max_rounds):
+        tot = np.bincount(labels, weights=k, minlength=n)
+        same = labels[coo.row] == labels[coo.col]
+        own_w = np.bincount(coo.row[same], weights=coo.data[same], minlength=n)
+        stay = own_w - self_w - k * (tot[labels] - k) / m2
+
+        links = (a @ _one_hot(labels, n)).tocsr()
+        rows = np.repeat(np.arange(n), np.diff(links.indptr))
+        score = links.data - k[rows] * tot[links.indices] / m2
+        score = np.where(links.indices == labels[rows], stay[rows], score)
+        best, best_score = _best_per_row(links, score)
+
+        improving = (best >= 0) & (best != labels) & (best_score > stay + 1e-12)
+        if improving.sum() <= MIN_IMPROVING * n:
+            break
+        move = improving & (rng.random(n) < MOVE_FRACTION)
+        labels = np.where(move, best, labels)
+    return labels
+
+
+def louvain(n_nodes, src, tgt, seed=0, max_rounds=MAX_ROUNDS, max_levels=MAX_LEVELS):
+    """Community label per node maximising modularity (Louvain, batched moves)."""
+    rng = np.random.default_rng(seed)
+    a = adjacency(n_nodes, src, tgt)
+    membership = np.arange(n_nodes)
+    for _ in range(max_levels):
+        labels = _local_moves(a, rng, max_rounds)
+        _, labels = np.unique(labels, return_inverse=True)
+        n_comm = labels.max() + 1 if len(labels) else 0
+        if n_comm == a.shape[0]:
+            break
+        membership = labels[membership]
+        p = _one_hot(labels, n_comm)
+        a = (p.T @ a @ p).tocsr()
+    return _by_size(membership)
+
+
+def modularity(n_nodes, src, tgt, labels):
+    """Newman modularity of ``labels`` on the undirected graph, for comparing clusterings."""
+    a = adjacency(n_nodes, src, tgt).tocoo()
+    k = np.bincount(a.row, weights=a.data, minlength=n_nodes)
+    m2 = k.sum()
+    if m2 == 0:
+        return 0.0
+    inside = a.data[labels[a.row] == labels[a.col]].sum()
+    tot = np.bincount(labels, weights=k)
+    return float(inside / m2 - (tot ** 2).sum() / m2 ** 2)
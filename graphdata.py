@@ -0,0 +1,653 @@
+"""Shared CSV -> graph build stage for the network chart scripts.
+
+Built graphs are cached in-process and keyed on the CSV fingerprint
+(path, size, mtime and content hash), so Streamlit reruns reuse the
+nodes, links and serialized JSON instead of rebuilding them. The cache is
+a ``graphstore.GraphStore``: every session references the graph it shows,
+so all sessions share one read-only copy that is not evicted while in use.
+A compiled copy is also written next to the CSV (``<csv>.graph/``) and
+memory-mapped by later processes, so a cold start does not re-parse the CSV.
+"""
+import base64
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+import graphcluster
+import graphstore
+
+CACHE_SIZE = 8
+DERIVED_CACHE_SIZE = 32
+HASH_BLOCK = 1 << 20
+STREAM_CHUNK_ROWS = 1_000_000
+STREAM_MIN_BYTES = 256 << 20  # load_graph streams CSVs at least this large
+ARTIFACT_SUFFIX = ".graph"
+ARTIFACT_VERSION = 1
+
+
+# ---------------------------
+# Fingerprint
+# ---------------------------
+# Content digests are memoized on (path, size, mtime) so the file is only
+# re-hashed when its stat changes, not on every rerun.
+_digest_memo = {}
+_digest_lock = threading.Lock()
+
+
+def _content_digest(path, size, mtime_ns):
+    key = (path, size, mtime_ns)
+    with _digest_lock:
+        digest = _digest_memo.get(key)
+    if digest is not None:
+        return digest
+
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK), b""):
+            h.update(block)
+    digest = h.hexdigest()
+
+    with _digest_lock:
+        for stale in [k for k in _digest_memo if k[0] == path]:
+            del _digest_memo[stale]
+        _digest_memo[key] = digest
+    return digest
+
+
+def csv_fingerprint(csv_path):
+    """Return a hex key for the CSV built from its path, size, mtime and content hash."""
+    path = os.path.abspath(csv_path)
+    st = os.stat(path)
+    digest = _content_digest(path, st.st_size, st.st_mtime_ns)
+    raw = f"{path}|{st.st_size}|{st.st_mtime_ns}|{digest}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+# ---------------------------
+# Bounded LRU cache
+# ---------------------------
+class GraphCache:
+    """Thread-safe LRU cache with hit/miss/eviction counters."""
+
+    def __init__(self, maxsize=CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+            }
+
+
+# Built graphs, shared by all sessions (graphstore.py)
+_cache = graphstore.GraphStore(max_idle=CACHE_SIZE)
+
+
+def cache_stats():
+    """Counters and bytes held of the shared graph store, e.g. for a debug panel."""
+    return _cache.stats()
+
+
+def invalidate_graphs(fingerprint=None):
+    """Drop the stored builds of one CSV version (all without ``fingerprint``).
+
+    Sessions keep the graph they show; the next load rebuilds it.
+    """
+    return _cache.invalidate(None if fingerprint is None else lambda key: key[0] == fingerprint)
+
+
+# ---------------------------
+# Graph build
+# ---------------------------
+def _letter_groups(names, src, tgt):
+    first = pd.Series(names, dtype=object).str[0].str.upper()
+    return (first.map(ord).to_numpy() % 10).astype(np.int32)  # gives 0-9
+
+
+# grouping name -> fn(names, src, tgt) returning one int32 group per node.
+# "louvain" and "label_propagation" detect communities from the edges
+# (graphcluster.py); like every grouping they are cached with the graph and
+# in the artifact, so the clustering runs once per CSV version.
+GROUPINGS = {
+    "letter": _letter_groups,
+    "flat": lambda names, src, tgt: np.ones(len(names), dtype=np.int32),
+    "louvain": lambda names, src, tgt: graphcluster.louvain(len(names), src, tgt),
+    "label_propagation": lambda names, src, tgt: graphcluster.label_propagation(len(names), src, tgt),
+}
+
+
+def encode_edges(source, target):
+    """Integer-encode the endpoint columns.
+
+    Returns ``(names, src, tgt)`` where ``names`` is the node table in
+    first-appearance order and ``src``/``tgt`` index into it.
+    """
+    m = len(source)
+    codes, uniques = pd.factorize(pd.concat([pd.Series(source), pd.Series(target)], ignore_index=True))
+    names = np.asarray(uniques, dtype=object)
+    codes = codes.astype(np.int32, copy=False)
+    return names, codes[:m], codes[m:]
+
+
+def graph_json_from_arrays(names, groups, src, tgt):
+    """Serialize the ``{"nodes": [...], "links": [...]}`` payload without per-row dicts."""
+    enc = np.array([json.dumps(n) for n in names.tolist()], dtype=object)
+    nodes_json = ",".join(
+        '{"id":%s,"group":%d}' % pair for pair in zip(enc.tolist(), groups.tolist())
+    )
+    # One string concatenation per edge: node-level prefixes + suffixes.
+    heads = '{"source":' + enc + ',"target":'
+    tails = enc + "}"
+    links_json = ",".join((heads[src] + tails[tgt]).tolist())
+    return '{"nodes":[' + nodes_json + '],"links":[' + links_json + "]}"
+
+
+def b64_array(values, dtype):
+    """Base64 of the little-endian bytes of ``values``, for typed arrays in the browser."""
+    return base64.b64encode(np.ascontiguousarray(values, dtype=dtype).tobytes()).decode("ascii")
+
+
+def compact_json_from_arrays(names, groups, src, tgt, x=None, y=None, importance=None):
+    """Serialize the compact wire format decoded by ``static/graph-decode.js``.
+
+    Node names are sent once; groups and link endpoints travel as base64
+    Uint32 buffers indexing into the name table. Optional precomputed
+    positions and node importance (0-1, ``graphmetrics.importance``) travel
+    as Float32 buffers.
+    """
+    payload = {
+        "format": "compact",
+        "names": names.tolist(),
+        "groups": b64_array(groups, "<u4"),
+        "source": b64_array(src, "<u4"),
+        "target": b64_array(tgt, "<u4"),
+    }
+    if x is not None:
+        payload["x"] = b64_array(x, "<f4")
+        payload["y"] = b64_array(y, "<f4")
+    if importance is not None:
+        payload["importance"] = b64_array(importance, "<f4")
+    return json.dumps(payload, separators=(",", ":"))
+
+
+def csr_index(keys, n_keys):
+    """Group positions by key: the positions holding key ``k`` are ``ids[offsets[k]:offsets[k + 1]]``."""
+    keys = np.asarray(keys)
+    ids = np.argsort(keys, kind="stable")
+    offsets = np.zeros(n_keys + 1, dtype=np.int64)
+    np.cumsum(np.bincount(keys, minlength=n_keys), out=offsets[1:])
+    return offsets, ids
+
+
+def adjacency_json_from_arrays(groups, src, tgt):
+    """Serialize the highlight index decoded by ``static/graph-adjacency.js``.
+
+    Two CSR tables as base64 Uint32 buffers: node -> incident link ids
+    (a self-loop is listed once) and group -> member node ids, with the
+    distinct group values in ``groupValues``.
+    """
+    m = len(src)
+    loop_free = src != tgt
+    ends = np.concatenate([src, tgt[loop_free]])
+    link_of_end = np.concatenate([np.arange(m), np.flatnonzero(loop_free)])
+    link_offsets, order = csr_index(ends, len(groups))
+
+    values, member_of = np.unique(groups, return_inverse=True)
+    group_offsets, group_nodes = csr_index(member_of, len(values))
+
+    payload = {
+        "linkOffsets": b64_array(link_offsets, "<u4"),
+        "linkIds": b64_array(link_of_end[order], "<u4"),
+        "groupValues": values.tolist(),
+        "groupOffsets": b64_array(group_offsets, "<u4"),
+        "groupNodes": b64_array(group_nodes, "<u4"),
+    }
+    return json.dumps(payload, separators=(",", ":"))
+
+
+class BuiltGraph:
+    """Integer-encoded graph of one CSV plus its serialized payloads. Read-only once stored."""
+
+    __slots__ = ("fingerprint", "names", "groups", "source", "target", "artifact",
+                 "_graph_json", "_compact_json", "_adjacency_json", "_memo", "_names_bytes")
+
+    def __init__(self, fingerprint, names, groups, source, target):
+        self.fingerprint = fingerprint
+        self.names = names
+        self.groups = groups
+        self.source = source
+        self.target = target
+        self.artifact = None  # directory of the on-disk copy, if any
+        self._graph_json = None
+        self._compact_json = None
+        self._adjacency_json = None
+        self._memo = {}
+        self._names_bytes = None
+
+    @property
+    def graph_json(self):
+        if self._graph_json is None:
+            self._graph_json = graph_json_from_arrays(self.names, self.groups, self.source, self.target)
+        return self._graph_json
+
+    @property
+    def compact_json(self):
+        if self._compact_json is None:
+            self._compact_json = compact_json_from_arrays(self.names, self.groups, self.source, self.target)
+        return self._compact_json
+
+    @property
+    def adjacency_json(self):
+        if self._adjacency_json is None:
+            self._adjacency_json = adjacency_json_from_arrays(self.groups, self.source, self.target)
+        return self._adjacency_json
+
+    def memo(self, key, build):
+        """Payload derived from this graph, built once and shared with every holder of it."""
+        value = self._memo.get(key)
+        if value is None:
+            value = self._memo.setdefault(key, build())
+        return value
+
+    def freeze(self):
+        for values in (self.names, self.groups, self.source, self.target):
+            values.flags.writeable = False
+
+    def footprint(self):
+        """``(heap_bytes, mapped_bytes)``: arrays, name strings and cached payloads."""
+        if self._names_bytes is None:
+            self._names_bytes = sum(sys.getsizeof(n) for n in self.names.tolist())
+        heap, mapped = self._names_bytes, 0
+        for values in (self.names, self.groups, self.source, self.target):
+            if isinstance(values, np.memmap):
+                mapped += values.nbytes
+            else:
+                heap += values.nbytes
+        payloads = [self._graph_json, self._compact_json, self._adjacency_json, *self._memo.values()]
+        for p in payloads:
+            if p is not None:
+                h, m = graphstore.footprint(p)
+                heap += h
+                mapped += m
+        return heap, mapped
+
+    @property
+    def nodes(self):
+        return [{"id": n, "group": g} for n, g in zip(self.names.tolist(), self.groups.tolist())]
+
+    @property
+    def links(self):
+        names = self.names
+        return [
+            {"source": s, "target": t}
+            for s, t in zip(names[self.source].tolist(), names[self.target].tolist())
+        ]
+
+
+def read_edges(source, **kwargs):
+    """``pandas.read_csv`` of the edge columns, names as strings.
+
+    Both builds read through here, so a CSV gives the same node names (and
+    the same artifact, which stores names as text) whether it is loaded at
+    once or streamed; numeric ids stay ``"7"``, not ``7``.
+    """
+    return pd.read_csv(source, usecols=["source", "target"], dtype=str, **kwargs)
+
+
+def build_graph(df, grouping="letter", fingerprint=None):
+    df = df.dropna(subset=["source", "target"])
+    names, src, tgt = encode_edges(df["source"], df["target"])
+    groups = GROUPINGS[grouping](names, src, tgt)
+    return BuiltGraph(fingerprint, names, groups, src, tgt)
+
+
+# ---------------------------
+# Streaming build
+# ---------------------------
+def _map_edges(path, count):
+    if count == 0:
+        return np.zeros(0, dtype=np.int32)
+    return np.memmap(path, dtype=np.int32, mode="r", shape=(count,))
+
+
+def stream_graph(csv_path, grouping="letter", fingerprint=None, chunksize=STREAM_CHUNK_ROWS,
+                 spill_dir=None, progress=None):
+    """Build the graph of a CSV too large to load at once.
+
+    Reads ``chunksize`` rows at a time, growing the node table as new names
+    appear and appending the integer-encoded endpoints to int32 files in
+    ``spill_dir``; ``source``/``target`` come back memory-mapped, so peak
+    memory is the node table plus one chunk. Without ``spill_dir`` the
+    files go to a temporary directory that is unlinked once mapped.
+    Names are read as strings (:func:`read_edges`) and numbered in order of
+    first appearance chunk by chunk. ``progress(bytes_read, total_bytes, edges)`` is called
+    after every chunk.
+    """
+    total = os.path.getsize(csv_path)
+    temporary = spill_dir is None
+    if temporary:
+        spill_dir = tempfile.mkdtemp(prefix="graphedges-")
+    os.makedirs(spill_dir, exist_ok=True)
+    src_path = os.path.join(spill_dir, "source.i4")
+    tgt_path = os.path.join(spill_dir, "target.i4")
+
+    lookup = {}
+    m = 0
+    with open(csv_path, "rb") as f, open(src_path, "wb") as fs, open(tgt_path, "wb") as ft:
+        for chunk in read_edges(f, chunksize=chunksize):
+            chunk = chunk.dropna(subset=["source", "target"])
+            local, src, tgt = encode_edges(chunk["source"], chunk["target"])
+            # setdefault numbers unseen names len(lookup), len(lookup) + 1, ...
+            remap = np.fromiter(
+                (lookup.setdefault(n, len(lookup)) for n in local.tolist()),
+                dtype=np.int32, count=len(local),
+            )
+            remap[src].tofile(fs)
+            remap[tgt].tofile(ft)
+            m += len(src)
+            if progress is not None:
+                progress(f.tell(), total, m)
+
+    names = np.array(list(lookup), dtype=object)
+    del lookup
+    src = _map_edges(src_path, m)
+    tgt = _map_edges(tgt_path, m)
+    if temporary:
+        # The mappings keep the data alive on POSIX; elsewhere the files stay behind.
+        try:
+            os.remove(src_path)
+            os.remove(tgt_path)
+            os.rmdir(spill_dir)
+        except OSError:
+            pass
+
+    groups = GROUPINGS[grouping](names, src, tgt)
+    return BuiltGraph(fingerprint, names, groups, src, tgt)
+
+
+# ---------------------------
+# On-disk artifact
+# ---------------------------
+# <csv>.graph/ holds the compiled graph of one CSV:
+#   meta.json              fingerprint, source stat and digest, node/edge counts
+#   names.bin              UTF-8 node names separated by NUL
+#   source.i4, target.i4   raw little-endian int32 endpoints (memory-mapped)
+#   groups.<grouping>.npy  one file per grouping used so far
+#   <name>.npy             extras such as layouts (save_artifact_array)
+# It is written to a staging directory and renamed into place, and ignored
+# when its fingerprint no longer matches the CSV.
+def artifact_dir(csv_path):
+    return os.path.abspath(csv_path) + ARTIFACT_SUFFIX
+
+
+def _read_meta(directory):
+    try:
+        with open(os.path.join(directory, "meta.json"), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return meta if meta.get("version") == ARTIFACT_VERSION else None
+
+
+def _seed_digest(csv_path):
+    # Trust the digest recorded by an earlier process while size and mtime
+    # still match, so a cold start does not re-hash the whole CSV.
+    path = os.path.abspath(csv_path)
+    meta = _read_meta(artifact_dir(path))
+    if meta is None:
+        return
+    st = os.stat(path)
+    if meta["source"] == [path, st.st_size, st.st_mtime_ns]:
+        with _digest_lock:
+            _digest_memo.setdefault((path, st.st_size, st.st_mtime_ns), meta["digest"])
+
+
+def _save_array(path, values):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "wb") as f:
+            np.save(f, np.asarray(values))
+        os.replace(tmp, path)
+    except OSError:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def load_artifact_array(built, name):
+    """Memory-map ``<name>.npy`` from the artifact of ``built``, or ``None``."""
+    if built.artifact is None:
+        return None
+    try:
+        return np.load(os.path.join(built.artifact, f"{name}.npy"), mmap_mode="r")
+    except (OSError, ValueError):
+        return None
+
+
+def save_artifact_array(built, name, values):
+    """Store ``values`` as ``<name>.npy`` in the artifact of ``built``; a no-op without one."""
+    if built.artifact is not None:
+        _save_array(os.path.join(built.artifact, f"{name}.npy"), values)
+
+
+def open_artifact(csv_path, fingerprint, grouping="letter"):
+    """Memory-map the compiled graph of ``csv_path``, or ``None`` if missing or stale."""
+    directory = artifact_dir(csv_path)
+    meta = _read_meta(directory)
+    if meta is None or meta["fingerprint"] != fingerprint:
+        return None
+    try:
+        with open(os.path.join(directory, "names.bin"), "rb") as f:
+            blob = f.read().decode("utf-8")
+        src = _map_edges(os.path.join(directory, "source.i4"), meta["edges"])
+        tgt = _map_edges(os.path.join(directory, "target.i4"), meta["edges"])
+    except (OSError, ValueError):
+        return None
+    names = np.array(blob.split("\0") if meta["nodes"] else [], dtype=object)
+
+    groups_path = os.path.join(directory, f"groups.{grouping}.npy")
+    try:
+        groups = np.load(groups_path, mmap_mode="r")
+    except (OSError, ValueError):
+        groups = GROUPINGS[grouping](names, src, tgt)
+        _save_array(groups_path, groups)
+
+    built = BuiltGraph(fingerprint, names, groups, src, tgt)
+    built.artifact = directory
+    return built
+
+
+def _publish_artifact(csv_path, built, grouping, staging):
+    # staging already holds source.i4/target.i4; add the rest and swap it in.
+    names = built.names.tolist()
+    if not all(isinstance(n, str) and "\0" not in n for n in names):
+        shutil.rmtree(staging, ignore_errors=True)
+        return
+    path = os.path.abspath(csv_path)
+    st = os.stat(path)
+    meta = {
+        "version": ARTIFACT_VERSION,
+        "fingerprint": built.fingerprint,
+        "source": [path, st.st_size, st.st_mtime_ns],
+        "digest": _content_digest(path, st.st_size, st.st_mtime_ns),
+        "nodes": len(names),
+        "edges": len(built.source),
+    }
+    directory = artifact_dir(path)
+    try:
+        with open(os.path.join(staging, "names.bin"), "wb") as f:
+            f.write("\0".join(names).encode("utf-8"))
+        _save_array(os.path.join(staging, f"groups.{grouping}.npy"), built.groups)
+        with open(os.path.join(staging, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        if os.path.isdir(directory):
+            shutil.rmtree(directory)
+        os.replace(staging, directory)
+    except OSError:
+        shutil.rmtree(staging, ignore_errors=True)
+        return
+    built.artifact = directory
+
+
+def compile_graph(csv_path, grouping="letter", fingerprint=None, progress=None, persist=True):
+    """Build the graph of ``csv_path`` and, with ``persist``, write its artifact.
+
+    CSVs of ``STREAM_MIN_BYTES`` or more go through :func:`stream_graph`,
+    which reports to ``progress`` while it reads.
+    """
+    staging = None
+    if persist:
+        directory = artifact_dir(csv_path)
+        try:
+            staging = tempfile.mkdtemp(prefix=os.path.basename(directory) + ".",
+                                       dir=os.path.dirname(directory))
+        except OSError:
+            staging = None  # read-only location: keep the build in memory only
+
+    if os.path.getsize(csv_path) >= STREAM_MIN_BYTES:
+        built = stream_graph(csv_path, grouping, fingerprint, spill_dir=staging, progress=progress)
+    else:
+        built = build_graph(read_edges(csv_path), grouping, fingerprint)
+        if staging is not None:
+            built.source.astype("<i4").tofile(os.path.join(staging, "source.i4"))
+            built.target.astype("<i4").tofile(os.path.join(staging, "target.i4"))
+
+    if staging is not None:
+        _publish_artifact(csv_path, built, grouping, staging)
+    return built
+
+
+def load_graph(csv_path, grouping="letter", progress=None, persist=True):
+    """Load the graph for ``csv_path``, reusing the cached build or artifact if unchanged.
+
+    The first process to see a CSV compiles it (see :func:`compile_graph`);
+    later ones memory-map ``<csv>.graph/`` instead of parsing the CSV.
+    ``persist=False`` neither reads nor writes the artifact.
+    """
+    if persist:
+        _seed_digest(csv_path)
+    fingerprint = csv_fingerprint(csv_path)
+    key = (fingerprint, grouping)
+
+    def build():
+        built = open_artifact(csv_path, fingerprint, grouping) if persist else None
+        if built is None:
+            built = compile_graph(csv_path, grouping, fingerprint, progress, persist)
+        return built
+
+    # Sessions that ask for the same version together wait for one build
+    ref = _cache.acquire(key, build)
+    # The session references the version it loaded until it loads another
+    graphstore.hold(("graph", os.path.abspath(csv_path), grouping), ref)
+    return ref.value
+
+
+# ---------------------------
+# Graph diff
+# ---------------------------
+def cached_graph(fingerprint, grouping="letter"):
+    """The in-process build of an earlier graph version, or ``None`` once evicted.
+
+    Graphs derived from a loaded one (:func:`derived_graph`) are found by
+    their own fingerprint.
+    """
+    return _cache.get((fingerprint, grouping)) or _derived.get(fingerprint)
+
+
+# Subgraphs cut from loaded graphs (top-K, focus views), by their own fingerprint
+_derived = GraphCache(maxsize=DERIVED_CACHE_SIZE)
+
+
+def derived_graph(fingerprint, build):
+    """The graph ``build()`` derives from a loaded one, built once per ``fingerprint``.
+
+    ``fingerprint`` must identify the source version and the derivation.
+    Kept in a small LRU of its own, so the pages can diff the next derived
+    view against it. ``build`` may return ``None``, which is not cached.
+    """
+    graph = _derived.get(fingerprint)
+    if graph is None:
+        graph = build()
+        if graph is not None:
+            graph.freeze()
+            _derived.put(fingerprint, graph)
+    return graph
+
+
+def diff_graphs(old, new):
+    """Changes turning built graph ``old`` into ``new``, by node name.
+
+    ``addNodes`` and ``regroup`` hold ``[name, group]`` pairs,
+    ``removeNodes`` names, and ``addLinks``/``removeLinks`` ``[source,
+    target]`` name pairs; an edge listed k times more (or fewer) in
+    ``new`` appears k times.
+    """
+    old_names = np.asarray(old.names, dtype=object)
+    new_names = np.asarray(new.names, dtype=object)
+    old_to_new = pd.Index(new_names).get_indexer(old_names)
+    new_to_old = pd.Index(old_names).get_indexer(new_names)
+
+    # Nodes that are gone get ids after the new ones, so every old endpoint has an id
+    gone = np.flatnonzero(old_to_new < 0)
+    old_to_new[gone] = len(new_names) + np.arange(len(gone))
+    all_names = np.concatenate([new_names, old_names[gone]])
+    span = np.int64(len(all_names))
+
+    new_keys = np.asarray(new.source, dtype=np.int64) * span + np.asarray(new.target)
+    old_keys = old_to_new[np.asarray(old.source)].astype(np.int64) * span + old_to_new[np.asarray(old.target)]
+    keys, inverse = np.unique(np.concatenate([new_keys, old_keys]), return_inverse=True)
+    weights = np.concatenate([np.ones(len(new_keys)), -np.ones(len(old_keys))])
+    delta = np.rint(np.bincount(inverse, weights=weights, minlength=len(keys))).astype(np.int64)
+
+    def pairs(counts):
+        picked = np.repeat(keys, counts)
+        return np.stack([all_names[picked // span], all_names[picked % span]], axis=1).tolist()
+
+    added = np.flatnonzero(new_to_old < 0)
+    kept = np.flatnonzero(new_to_old >= 0)
+    new_groups = np.asarray(new.groups)
+    regrouped = kept[new_groups[kept] != np.asarray(old.groups)[new_to_old[kept]]]
+    return {
+        "addNodes": [[n, int(g)] for n, g in zip(new_names[added].tolist(), new_groups[added].tolist())],
+        "removeNodes": old_names[gone].tolist(),
+        "regroup": [[n, int(g)] for n, g in zip(new_names[regrouped].tolist(), new_groups[regrouped].tolist())],
+        "addLinks": pairs(np.maximum(delta, 0)),
+        "removeLinks": pairs(np.maximum(-delta, 0)),
+    }
@@ -0,0 +1,322 @@
+"""Static SVG/PNG snapshots of a graph for reports, without a browser.
+
+Draws a ``graphdata.BuiltGraph`` at the positions it is given, or else at
+its server-side layout (``graphlayout.layout_positions`` with
+NetworkCharts.py's parameters, cached and stored in the graph's artifact),
+with the look of
+NetworkCharts.py: black background, links #888 at 0.4 opacity, pastel
+nodes of radius 20 with a white outline, bold 19 px labels 26 px right of
+the node. The image shows the whole graph, as if
+zoomed out to fit it. Labels are placed like static/label-layer.js places
+them: only when at least MIN_LABEL_PX tall on the image, most important node
+first (``graphmetrics.node_metric``, LABEL_METRIC), each only where it
+overlaps no label placed before it, MAX_LABELS at most. Nodes stay at least
+MIN_NODE_PX wide, so 100k-node graphs remain visible.
+
+SVG is assembled with vectorized string operations (one path for all links,
+one group per colour), PNG is rasterized with Pillow (optional dependency,
+imported on use). ``export_many`` runs many exports in a process pool.
+
+    python graphexport.py networkdata.csv graph.svg graph.png
+"""
+import html
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from graphdata import load_graph
+from graphlayout import layout_positions
+from graphmetrics import node_metric
+
+PASTEL_COLORS = ["#A8D5BA", "#FFD6A5", "#FFAAA6", "#A0CED9", "#FFC3A0",
+                 "#D5AAFF", "#B5EAD7", "#FFDAC1", "#E2F0CB", "#C7CEEA"]
+BACKGROUND = "#000000"
+LINK_COLOR = "#888888"
+LINK_OPACITY = 0.4
+LINK_WIDTH = 3
+NODE_RADIUS = 20
+NODE_STROKE = 1.5
+FONT_PX = 19
+LABEL_DX, LABEL_DY = 26, 6
+MIN_LABEL_PX = 9
+MAX_LABELS = 1500
+LABEL_METRIC = "pagerank"
+# Label boxes as static/label-layer.js measures them
+LABEL_CELL = 8          # px per occupancy-grid cell
+LABEL_CHAR_WIDTH = 0.6  # mean glyph width / font size, bold Arial
+LABEL_ASCENT = 0.8      # cap height above the baseline / font size
+LABEL_BATCH = 1024      # candidates checked against the grid at once
+LABEL_HALO = 3          # label outline width, graph units, as in the pages
+LABEL_HALO_COLOR = "#000000aa"
+MIN_NODE_PX = 1.0
+PADDING = 20  # px around the graph
+# NetworkCharts.py's layout parameters, so its stored positions are reused
+LAYOUT = {"charge": -200}
+
+
+# ---------------------------
+# Geometry
+# ---------------------------
+def palette_index(groups, n_colors):
+    """Colour slot per node as d3.scaleOrdinal assigns them: by first appearance of the group."""
+    values, first, inverse = np.unique(groups, return_index=True, return_inverse=True)
+    rank = np.empty(len(values), dtype=np.int64)
+    rank[np.argsort(first, kind="stable")] = np.arange(len(values))
+    return rank[inverse] % n_colors
+
+
+def place_labels(x, y, names, font, k, score, width, height, max_labels=MAX_LABELS):
+    """Indices of the nodes to label, highest ``score`` first, without overlaps.
+
+    A label goes where its box covers no LABEL_CELL grid cell that an
+    earlier label covers, as in static/label-layer.js.
+    """
+    if font < MIN_LABEL_PX or not len(x):
+        return np.arange(0)
+    x0 = x + LABEL_DX * k
+    x1 = x0 + np.array([len(str(n)) for n in names.tolist()]) * LABEL_CHAR_WIDTH * font
+    y1 = y + LABEL_DY * k
+    y0 = y1 - LABEL_ASCENT * font
+    visible = (x1 >= 0) & (x0 < width) & (y1 >= 0) & (y0 < height)
+    cols, rows = -(-width // LABEL_CELL), -(-height // LABEL_CELL)
+    c0 = np.clip(np.floor(x0 / LABEL_CELL), 0, cols - 1).astype(np.int64)
+    c1 = np.clip(np.floor(x1 / LABEL_CELL), 0, cols - 1).astype(np.int64)
+    r0 = np.clip(np.floor(y0 / LABEL_CELL), 0, rows - 1).astype(np.int64)
+    r1 = np.clip(np.floor(y1 / LABEL_CELL), 0, rows - 1).astype(np.int64)
+
+    order = np.flatnonzero(visible)
+    order = order[np.argsort(-np.asarray(score)[order], kind="stable")]
+    grid = np.zeros((rows, cols), dtype=bool)
+    covered = np.zeros((rows + 1, cols + 1), dtype=np.int32)
+    placed = []
+    for start in range(0, len(order), LABEL_BATCH):
+        if len(placed) >= max_labels:
+            break
+        # Drop the batch's labels that already overlap one (summed-area table
+        # of the grid), then place the rest one by one
+        covered[1:, 1:] = grid.cumsum(0).cumsum(1)
+        b = order[start:start + LABEL_BATCH]
+        used = (covered[r1[b] + 1, c1[b] + 1] - covered[r0[b], c1[b] + 1]
+                - covered[r1[b] + 1, c0[b]] + covered[r0[b], c0[b]])
+        for i in b[used == 0].tolist():
+            cells = grid[r0[i]:r1[i] + 1, c0[i]:c1[i] + 1]
+            if cells.any():
+                continue
+            cells[:] = True
+            placed.append(i)
+            if len(placed) >= max_labels:
+                break
+    return np.array(placed, dtype=np.int64)
+
+
+def snapshot(built, width=1200, height=700, metric=LABEL_METRIC, positions=None, **layout):
+    """Pixel geometry of ``built`` fitted into a ``width`` x ``height`` image.
+
+    ``positions`` is an ``(x, y)`` pair of node coordinates, e.g. a layout
+    computed elsewhere; without it the graph is laid out with
+    ``graphlayout.layout_positions`` and the parameters in ``layout``. Returns a
+    dict with the node centres ``x``/``y`` (px), the zoom ``k``, node
+    ``radius``, ``link_width``, ``stroke``, label ``font`` size and the
+    indices of the labelled nodes in ``labels`` (:func:`place_labels`,
+    ranked by ``metric``).
+    """
+    if positions is None:
+        positions = layout_positions(built, **{**LAYOUT, **layout})
+    x, y = positions
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    if len(x):
+        x0, x1, y0, y1 = x.min(), x.max(), y.min(), y.max()
+    else:
+        x0 = x1 = y0 = y1 = 0.0
+    # Node discs reach NODE_RADIUS beyond the centres
+    span_x = x1 - x0 + 2 * NODE_RADIUS
+    span_y = y1 - y0 + 2 * NODE_RADIUS
+    k = min((width - 2 * PADDING) / span_x, (height - 2 * PADDING) / span_y)
+    ox = (width - (x1 - x0) * k) / 2
+    oy = (height - (y1 - y0) * k) / 2
+
+    font = FONT_PX * k
+    px = (x - x0) * k + ox
+    py = (y - y0) * k + oy
+    labels = np.arange(0)
+    if font >= MIN_LABEL_PX and len(x):
+        labels = place_labels(px, py, built.names, font, k, node_metric(built, metric), width, height)
+    return {
+        "x": px,
+        "y": py,
+        "k": k,
+        "radius": max(NODE_RADIUS * k, MIN_NODE_PX / 2),
+        "link_width": LINK_WIDTH * k,
+        "stroke": NODE_STROKE * k,
+        "font": font,
+        "halo": LABEL_HALO * k,
+        "labels": labels,
+    }
+
+
+def _num(values):
+    # Pixel coordinates at 0.1 px, as strings, one per element (object array)
+    tenths = np.rint(np.asarray(values) * 10).astype(np.int64)
+    whole, frac = np.divmod(tenths, 10)
+    out = whole.astype(str).astype(object)
+    has_frac = frac != 0
+    out[has_frac] = out[has_frac] + "." + frac[has_frac].astype(str).astype(object)
+    return out
+
+
+# ---------------------------
+# SVG
+# ---------------------------
+def to_svg(built, width=1200, height=700, palette=PASTEL_COLORS, positions=None, **layout):
+    """The snapshot as an SVG document string."""
+    g = snapshot(built, width, height, positions=positions, **layout)
+    xs, ys = _num(g["x"]), _num(g["y"])
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+        f'viewBox="0 0 {width} {height}">',
+        f'<rect width="100%" height="100%" fill="{BACKGROUND}"/>',
+    ]
+
+    if len(built.source):
+        # One path for all links: "M x1 y1L x2 y2" per link
+        heads = "M" + xs + " " + ys
+        tails = "L" + xs + " " + ys
+        d = "".join((heads[built.source] + tails[built.target]).tolist())
+        parts.append(f'<path d="{d}" fill="none" stroke="{LINK_COLOR}" stroke-opacity="{LINK_OPACITY}" '
+                     f'stroke-width="{g["link_width"]:.3g}"/>')
+
+    r = f'{g["radius"]:.3g}'
+    circles = '<circle cx="' + xs + '" cy="' + ys + '" r="' + r + '"/>'
+    slot = palette_index(built.groups, len(palette))
+    parts.append(f'<g stroke="#fff" stroke-width="{g["stroke"]:.3g}">')
+    for i, colour in enumerate(palette):
+        members = circles[slot == i]
+        if len(members):
+            parts.append(f'<g fill="{colour}">' + "".join(members.tolist()) + "</g>")
+    parts.append("</g>")
+
+    if len(g["labels"]):
+        k = g["k"]
+        idx = g["labels"]
+        lx, ly = _num(g["x"][idx] + LABEL_DX * k), _num(g["y"][idx] + LABEL_DY * k)
+        names = np.array([html.escape(str(n)) for n in built.names[idx].tolist()], dtype=object)
+        texts = '<text x="' + lx + '" y="' + ly + '">' + names + "</text>"
+        parts.append(f'<g font-family="Arial, sans-serif" font-size="{g["font"]:.3g}" font-weight="600" '
+                     f'fill="#fff" stroke="{LABEL_HALO_COLOR}" stroke-width="{g["halo"]:.3g}" paint-order="stroke">'
+                     + "".join(texts.tolist()) + "</g>")
+
+    parts.append("</svg>")
+    return "\n".join(parts)
+
+
+# ---------------------------
+# PNG
+# ---------------------------
+def _font(size):
+    from PIL import ImageFont
+
+    for name in ("arialbd.ttf", "Arial Bold.ttf", "DejaVuSans-Bold.ttf"):
+        try:
+            return ImageFont.truetype(name, size)
+        except OSError:
+            continue
+    return ImageFont.load_default(size)
+
+
+def to_png(built, width=1200, height=700, palette=PASTEL_COLORS, positions=None, **layout):
+    """The snapshot as PNG bytes (needs Pillow)."""
+    try:
+        from PIL import Image, ImageDraw
+    except ImportError as exc:
+        raise ImportError("PNG export needs Pillow: pip install pillow") from exc
+
+    g = snapshot(built, width, height, positions=positions, **layout)
+    x, y = g["x"], g["y"]
+    image = Image.new("RGBA", (width, height), BACKGROUND)
+
+    if len(built.source):
+        # Links on their own layer, composited at LINK_OPACITY
+        links = Image.new("RGBA", (width, height), (0, 0, 0, 0))
+        draw = ImageDraw.Draw(links)
+        line_width = max(1, round(g["link_width"]))
+        alpha = round(255 * LINK_OPACITY)
+        fill = LINK_COLOR + f"{alpha:02x}"
+        ends = np.stack([x[built.source], y[built.source], x[built.target], y[built.target]], axis=1)
+        for x1, y1, x2, y2 in ends.tolist():
+            draw.line((x1, y1, x2, y2), fill=fill, width=line_width)
+        image = Image.alpha_composite(image, links)
+
+    draw = ImageDraw.Draw(image)
+    r = g["radius"]
+    outline_width = round(g["stroke"])
+    outline = "#ffffff" if outline_width else None
+    slot = palette_index(built.groups, len(palette))
+    for cx, cy, s in zip(x.tolist(), y.tolist(), slot.tolist()):
+        draw.ellipse((cx - r, cy - r, cx + r, cy + r), fill=palette[s], outline=outline, width=outline_width)
+
+    if len(g["labels"]):
+        font = _font(round(g["font"]))
+        k = g["k"]
+        names = built.names
+        # Pillow strokes outside the glyphs only, SVG half outside; blend the translucent outline
+        halo = max(1, round(g["halo"] / 2))
+        draw = ImageDraw.Draw(image, "RGBA")
+        for i in g["labels"].tolist():
+            # Anchor "ls": x/y is the left end of the baseline, as in SVG
+            draw.text((x[i] + LABEL_DX * k, y[i] + LABEL_DY * k), str(names[i]), font=font, anchor="ls",
+                      fill="#ffffff", stroke_width=halo, stroke_fill=LABEL_HALO_COLOR)
+
+    out = io.BytesIO()
+    image.convert("RGB").save(out, format="PNG", optimize=False)
+    return out.getvalue()
+
+
+# ---------------------------
+# Files and batches
+# ---------------------------
+def export_graph(built, path, width=1200, height=700, palette=PASTEL_COLORS, positions=None, **layout):
+    """Write the snapshot to ``path``; the format follows its suffix (.svg or .png)."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".svg":
+        data = to_svg(built, width, height, palette, positions, **layout).encode("utf-8")
+    elif ext == ".png":
+        data = to_png(built, width, height, palette, positions, **layout)
+    else:
+        raise ValueError(f"unknown export format {ext!r}; expected '.svg' or '.png'")
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+    return path
+
+
+def export_csv(csv_path, path, grouping="louvain", **options):
+    """Load (or reuse the artifact of) ``csv_path`` and export it to ``path``."""
+    return export_graph(load_graph(csv_path, grouping=grouping), path, **options)
+
+
+def _export_job(job):
+    return export_csv(**job)
+
+
+def export_many(jobs, processes=None):
+    """Run ``export_csv(**job)`` for every job dict in a process pool; returns the paths written.
+
+    ``processes=1`` exports in-process.
+    """
+    jobs = list(jobs)
+    if processes == 1 or len(jobs) <= 1:
+        return [_export_job(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        return list(pool.map(_export_job, jobs))
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) < 3:
+        sys.exit("usage: python graphexport.py EDGES.csv OUT.svg|OUT.png [...]")
+    export_many([{"csv_path": sys.argv[1], "path": p} for p in sys.argv[2:]])
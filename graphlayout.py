@@ -0,0 +1,605 @@
+"""Server-side force layout matching the templates' d3.forceSimulation setup.
+
+Reproduces forceLink(distance, strength), forceManyBody(strength),
+forceCenter and forceCollide(radius) with d3's alpha schedule, so the page
+can render precomputed positions instead of simulating in every browser.
+Many-body repulsion uses a level-by-level quadtree: at each level a cell
+interacts with the centres of mass of the 27 well-separated cells of its
+parent's neighbourhood (Barnes-Hut style, with a short local expansion so
+the cost is per cell rather than per node), and only leaf neighbours are
+summed exactly.
+"""
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+
+import graphmetrics
+from graphdata import (
+    GraphCache, b64_array, compact_json_from_arrays, load_artifact_array, save_artifact_array,
+)
+
+LAYOUT_CACHE_SIZE = 16
+BRUTE_FORCE_MAX = 1500   # below this many nodes charge is summed exactly
+LEAF_OCCUPANCY = 2       # target nodes per leaf cell of the quadtree
+CHUNK = 65536            # cells per far-field block, bounds temporary memory
+EXPANSION_TERMS = 6      # terms of the far-field local expansion
+OUTLIER_QUANTILES = (0.005, 0.995)
+POOL_MIN_NODES = 5000    # smaller graphs are laid out in-process
+BATCH_NODES = 2000       # small components are shipped to workers in batches
+COMPONENT_GAP = 90       # spacing between packed components
+
+DEFAULTS = {
+    "width": 1200,
+    "height": 700,
+    "link_distance": 120,
+    "link_strength": 0.8,
+    "charge": -600,
+    "collide_radius": 45,
+    "velocity_decay": 0.4,
+    "iterations": None,  # None: run d3's schedule until alpha < alphaMin
+    "seed": 0,
+}
+
+_NEIGHBOURS = [(dx, dy) for dy in (-1, 0, 1) for dx in (-1, 0, 1)]
+_CHILD_OFFSETS = np.arange(6) - 2
+
+
+# ---------------------------
+# Spatial helpers
+# ---------------------------
+def _expand_ranges(starts, counts):
+    """For ranges ``[starts[k], starts[k] + counts[k])`` return (owner k, position) pairs."""
+    total = int(counts.sum())
+    if total == 0:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty
+    owner = np.repeat(np.arange(len(counts)), counts)
+    offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+    return owner, np.repeat(starts, counts) + offsets
+
+
+def _grid_pairs(cx, cy, group=None):
+    """Unordered index pairs (i < j) of points in the same or adjacent grid cells.
+
+    With ``group``, each group has a grid of its own: points of different
+    groups are never paired, however close.
+    """
+    width = int(max(cx.max(), cy.max())) + 3
+    key = (cy + 1) * width + (cx + 1)
+    if group is not None:
+        key = key + np.asarray(group, dtype=np.int64) * (width * width)
+    order = np.argsort(key, kind="stable")
+    sorted_key = key[order]
+
+    # Query in sorted order: sorted needles make searchsorted cache-friendly.
+    ii, jj = [], []
+    for dx, dy in _NEIGHBOURS:
+        nkey = sorted_key + (dy * width + dx)
+        start = np.searchsorted(sorted_key, nkey, "left")
+        end = np.searchsorted(sorted_key, nkey, "right")
+        owner, pos = _expand_ranges(start, end - start)
+        i = order[owner]
+        j = order[pos]
+        keep = i < j
+        ii.append(i[keep])
+        jj.append(j[keep])
+    return np.concatenate(ii), np.concatenate(jj)
+
+
+def _far_cells(tx, ty, g, cells_here, count):
+    """Well-separated cells of each cell (tx, ty) on a g x g level.
+
+    Returns indices into the occupied ``cells_here`` and their node counts
+    (zero where the candidate is a neighbour, off-grid or empty), shape (m, 36).
+    """
+    m = len(tx)
+    tx = tx[:, None]
+    ty = ty[:, None]
+    qx = ((tx >> 1) * 2 + _CHILD_OFFSETS)[:, None, :]
+    qy = ((ty >> 1) * 2 + _CHILD_OFFSETS)[:, :, None]
+    qx, qy = np.broadcast_arrays(qx, qy)
+    qx = qx.reshape(m, 36)
+    qy = qy.reshape(m, 36)
+    far = (qx >= 0) & (qx < g) & (qy >= 0) & (qy < g)
+    far &= (np.abs(qx - tx) > 1) | (np.abs(qy - ty) > 1)
+    q = np.where(far, qy * g + qx, 0)
+    # column-wise the needles follow the (sorted) cell order
+    pos = np.searchsorted(cells_here, q.T).T
+    pos = np.minimum(pos, len(cells_here) - 1)
+    far &= cells_here[pos] == q
+    return pos, np.where(far, count[pos], 0.0)
+
+
+def _jiggle(values, rng, where=None):
+    """Replace exact zeros (or the ``where`` mask) with tiny random offsets, like d3's jiggle."""
+    mask = values == 0 if where is None else where
+    count = int(mask.sum())
+    if count:
+        values = values.copy()
+        values[mask] = (rng.random(count) - 0.5) * 1e-6
+    return values
+
+
+# ---------------------------
+# Forces
+# ---------------------------
+def _apply_links(x, y, vx, vy, dvx, dvy, src, tgt, bias, alpha, distance, strength, rng):
+    dx = x[tgt] + vx[tgt] - x[src] - vx[src]
+    dy = y[tgt] + vy[tgt] - y[src] - vy[src]
+    dx = _jiggle(dx, rng)
+    dy = _jiggle(dy, rng)
+    l = np.sqrt(dx * dx + dy * dy)
+    l = (l - distance) / l * alpha * strength
+    dx *= l
+    dy *= l
+    n = len(x)
+    dvx -= np.bincount(tgt, dx * bias, minlength=n)
+    dvy -= np.bincount(tgt, dy * bias, minlength=n)
+    dvx += np.bincount(src, dx * (1 - bias), minlength=n)
+    dvy += np.bincount(src, dy * (1 - bias), minlength=n)
+
+
+def _pair_charge(dx, dy, k):
+    """Force factor for displacement (dx, dy) with d3's distanceMin2 = 1."""
+    l2 = dx * dx + dy * dy
+    l2 = np.maximum(np.where(l2 < 1, np.sqrt(l2), l2), 1e-12)
+    return dx * k / l2, dy * k / l2
+
+
+def _apply_charge_exact(x, y, vx, vy, k, rng):
+    dx = x[None, :] - x[:, None]
+    dy = y[None, :] - y[:, None]
+    coincident = (dx == 0) & (dy == 0)
+    np.fill_diagonal(coincident, False)
+    dx = _jiggle(dx, rng, coincident)
+    fx, fy = _pair_charge(dx, dy, k)
+    np.fill_diagonal(fx, 0)
+    np.fill_diagonal(fy, 0)
+    vx += fx.sum(axis=1)
+    vy += fy.sum(axis=1)
+
+
+def _apply_charge_pairs(x, y, vx, vy, i, j, k, rng):
+    """Exact many-body term for the unordered pairs (i, j)."""
+    n = len(x)
+    dx = x[j] - x[i]
+    dy = y[j] - y[i]
+    dx = _jiggle(dx, rng, (dx == 0) & (dy == 0))
+    fx, fy = _pair_charge(dx, dy, k)
+    vx += np.bincount(i, fx, minlength=n) - np.bincount(j, fx, minlength=n)
+    vy += np.bincount(i, fy, minlength=n) - np.bincount(j, fy, minlength=n)
+
+
+def _apply_charge_quadtree(x, y, vx, vy, k, rng):
+    n = len(x)
+    depth = int(np.clip(np.ceil(np.log(max(n / LEAF_OCCUPANCY, 1)) / np.log(4)), 2, 11))
+    cells = 1 << depth
+    # Bound the grid by robust quantiles: early ticks fling a few nodes far
+    # out, and sizing cells to them would pile the dense core into a handful
+    # of leaves. Outliers are clamped into the border cells.
+    (x0, x1), (y0, y1) = np.quantile(x, OUTLIER_QUANTILES), np.quantile(y, OUTLIER_QUANTILES)
+    span = max(x1 - x0, y1 - y0) * (1 + 1e-9) + 1e-9
+    leaf_x = np.clip(((x - x0) / span * cells).astype(np.int64), 0, cells - 1)
+    leaf_y = np.clip(((y - y0) / span * cells).astype(np.int64), 0, cells - 1)
+
+    # Far field, per level: each occupied cell gathers the 27 well-separated
+    # cells of its parent's neighbourhood (as centres of mass) into a local
+    # expansion sum_p a_p (z - c)^p around its centre c, evaluated per node.
+    # With complex z = x + iy the d3 many-body term k*m*(zs - z)/|zs - z|^2
+    # is conj(k*m / (zs - z)). Clamped outliers sit outside their cell, where
+    # the expansion does not converge, so they sum the same cells directly.
+    z = x + 1j * y
+    outside = (x < x0) | (x > x0 + span) | (y < y0) | (y > y0 + span)
+    inside = ~outside
+    field = np.zeros(n, dtype=np.complex128)
+    for level in range(2, depth + 1):
+        g = 1 << level
+        width = span / g
+        shift = depth - level
+        cx = leaf_x >> shift
+        cy = leaf_y >> shift
+        cells_here, node_cell = np.unique(cy * g + cx, return_inverse=True)
+        count = np.bincount(node_cell).astype(np.float64)
+        com = (np.bincount(node_cell, x) + 1j * np.bincount(node_cell, y)) / count
+        tx = cells_here % g
+        ty = cells_here // g
+        centre = (x0 + (tx + 0.5) * width) + 1j * (y0 + (ty + 0.5) * width)
+
+        coeffs = np.zeros((len(cells_here), EXPANSION_TERMS), dtype=np.complex128)
+        for lo in range(0, len(cells_here), CHUNK):
+            hi = min(lo + CHUNK, len(cells_here))
+            pos, weight = _far_cells(tx[lo:hi], ty[lo:hi], g, cells_here, count)
+            inv = 1 / np.where(weight != 0, com[pos] - centre[lo:hi, None], 1)
+            weight = weight * k
+            power = inv
+            for p in range(EXPANSION_TERMS):
+                coeffs[lo:hi, p] = (weight * power).sum(axis=1)
+                power = power * inv
+
+        cell = node_cell[inside]
+        local = coeffs[cell]
+        dz = z[inside] - centre[cell]
+        acc = local[:, -1]
+        for p in range(EXPANSION_TERMS - 2, -1, -1):
+            acc = acc * dz + local[:, p]
+        field[inside] += acc
+
+        if outside.any():
+            cell = node_cell[outside]
+            pos, weight = _far_cells(tx[cell], ty[cell], g, cells_here, count)
+            diff = np.where(weight != 0, com[pos] - z[outside, None], 1)
+            field[outside] += (weight * k / diff).sum(axis=1)
+
+    vx += field.real
+    vy -= field.imag
+
+    # Near field: exact pairs within adjacent leaf cells.
+    i, j = _grid_pairs(leaf_x, leaf_y)
+    _apply_charge_pairs(x, y, vx, vy, i, j, k, rng)
+
+
+def _apply_collide(x, y, vx, vy, radius, rng, component=None):
+    px = x + vx
+    py = y + vy
+    diameter = 2 * radius
+    # Components simulated side by side overlap; their own grids keep the
+    # pair list linear in the batch size
+    i, j = _grid_pairs(np.floor(px / diameter).astype(np.int64) - int(np.floor(px.min() / diameter)),
+                       np.floor(py / diameter).astype(np.int64) - int(np.floor(py.min() / diameter)),
+                       component)
+    dx = px[i] - px[j]
+    dy = py[i] - py[j]
+    l2 = dx * dx + dy * dy
+    hit = l2 < diameter * diameter
+    i, j, dx, dy = i[hit], j[hit], dx[hit], dy[hit]
+    dx = _jiggle(dx, rng)
+    dy = _jiggle(dy, rng)
+    l = np.sqrt(dx * dx + dy * dy)
+    l = (diameter - l) / l
+    dx *= l * 0.5  # equal radii split the push evenly
+    dy *= l * 0.5
+    n = len(x)
+    vx += np.bincount(i, dx, minlength=n) - np.bincount(j, dx, minlength=n)
+    vy += np.bincount(i, dy, minlength=n) - np.bincount(j, dy, minlength=n)
+
+
+# ---------------------------
+# Simulation
+# ---------------------------
+def force_layout(n_nodes, src, tgt, component=None, **params):
+    """Run the force simulation for ``n_nodes`` nodes and the given edge arrays.
+
+    Keyword arguments override ``DEFAULTS``. ``component`` optionally labels
+    nodes (contiguous, in increasing order) of several small graphs that are
+    simulated side by side without interacting; each is centred on its own.
+    Returns float32 ``(x, y)``.
+    """
+    p = {**DEFAULTS, **params}
+    rng = np.random.default_rng(p["seed"])
+    n = n_nodes
+    if n == 0:
+        return np.empty(0, np.float32), np.empty(0, np.float32)
+
+    idx = np.arange(n)
+    if component is not None:
+        comp_size = np.bincount(component).astype(np.float64)
+        comp_end = np.cumsum(comp_size).astype(np.int64)
+        comp_start = comp_end - comp_size.astype(np.int64)
+        # all within-component pairs (i < j), summed exactly every tick
+        pair_i, pair_j = _expand_ranges(idx + 1, comp_end[component] - idx - 1)
+        idx = idx - comp_start[component]
+
+    # d3's phyllotaxis initial placement
+    radius = 10 * np.sqrt(0.5 + idx)
+    angle = idx * np.pi * (3 - np.sqrt(5))
+    x = radius * np.cos(angle)
+    y = radius * np.sin(angle)
+    vx = np.zeros(n)
+    vy = np.zeros(n)
+
+    src = np.asarray(src, dtype=np.int64)
+    tgt = np.asarray(tgt, dtype=np.int64)
+    degree = np.bincount(src, minlength=n) + np.bincount(tgt, minlength=n)
+    bias = degree[src] / (degree[src] + degree[tgt])
+
+    alpha, alpha_min = 1.0, 0.001
+    alpha_decay = 1 - alpha_min ** (1 / 300)
+    iterations = p["iterations"]
+    if iterations is None:
+        iterations = int(np.ceil(np.log(alpha_min) / np.log(1 - alpha_decay)))
+    cx, cy = p["width"] / 2, p["height"] / 2
+
+    # d3 applies link corrections one link at a time, so a hub sees each
+    # pull after the previous one moved it. All links here update at once;
+    # giving hubs a proportional mass keeps that from overshooting without
+    # moving the equilibrium (every force on the node is scaled alike).
+    mass = np.maximum(1.0, p["link_strength"] * (
+        np.bincount(src, 1 - bias, minlength=n) + np.bincount(tgt, bias, minlength=n)))
+
+    for _ in range(iterations):
+        alpha += (0 - alpha) * alpha_decay
+        dvx = np.zeros(n)
+        dvy = np.zeros(n)
+        if len(src):
+            _apply_links(x, y, vx, vy, dvx, dvy, src, tgt, bias, alpha,
+                         p["link_distance"], p["link_strength"], rng)
+        k = p["charge"] * alpha
+        if component is not None:
+            _apply_charge_pairs(x, y, dvx, dvy, pair_i, pair_j, k, rng)
+        elif n <= BRUTE_FORCE_MAX:
+            _apply_charge_exact(x, y, dvx, dvy, k, rng)
+        else:
+            _apply_charge_quadtree(x, y, dvx, dvy, k, rng)
+        vx += dvx / mass
+        vy += dvy / mass
+        if component is not None:
+            x -= (np.bincount(component, x) / comp_size)[component] - cx
+            y -= (np.bincount(component, y) / comp_size)[component] - cy
+        else:
+            x -= x.mean() - cx
+            y -= y.mean() - cy
+        if p["collide_radius"]:
+            _apply_collide(x, y, vx, vy, p["collide_radius"], rng, component)
+        vx *= 1 - p["velocity_decay"]
+        vy *= 1 - p["velocity_decay"]
+        x += vx
+        y += vy
+
+    return x.astype(np.float32), y.astype(np.float32)
+
+
+# ---------------------------
+# Per-component layout
+# ---------------------------
+def _layout_batch(jobs, params):
+    """Worker entry point: lay out several components, each centred on the origin.
+
+    A batch of small components runs as one vectorized simulation with
+    forces masked to within each component.
+    """
+    params = {**params, "width": 0, "height": 0}
+    if len(jobs) == 1:
+        return [force_layout(*jobs[0], **params)]
+
+    sizes = np.array([n for n, _, _ in jobs])
+    offsets = np.concatenate([[0], np.cumsum(sizes)])
+    src = np.concatenate([s + offsets[c] for c, (_, s, _) in enumerate(jobs)])
+    tgt = np.concatenate([t + offsets[c] for c, (_, _, t) in enumerate(jobs)])
+    component = np.repeat(np.arange(len(jobs)), sizes)
+    x, y = force_layout(int(offsets[-1]), src, tgt, component=component, **params)
+    return [(x[offsets[c]:offsets[c + 1]], y[offsets[c]:offsets[c + 1]]) for c in range(len(jobs))]
+
+
+def _component_jobs(n_nodes, src, tgt):
+    """Split the edge list into weakly connected components with local indices."""
+    adj = coo_matrix((np.ones(len(src), dtype=np.int8), (src, tgt)), shape=(n_nodes, n_nodes))
+    n_comp, labels = connected_components(adj, directed=True, connection="weak")
+
+    node_order = np.argsort(labels, kind="stable")
+    sizes = np.bincount(labels, minlength=n_comp)
+    node_starts = np.concatenate([[0], np.cumsum(sizes)])
+    local = np.empty(n_nodes, dtype=np.int64)
+    local[node_order] = np.arange(n_nodes) - np.repeat(node_starts[:-1], sizes)
+
+    edge_label = labels[src]
+    edge_order = np.argsort(edge_label, kind="stable")
+    edge_starts = np.concatenate([[0], np.cumsum(np.bincount(edge_label, minlength=n_comp))])
+
+    members = []
+    jobs = []
+    for c in range(n_comp):
+        nodes = node_order[node_starts[c]:node_starts[c + 1]]
+        edges = edge_order[edge_starts[c]:edge_starts[c + 1]]
+        members.append(nodes)
+        jobs.append((len(nodes), local[src[edges]], local[tgt[edges]]))
+    return members, jobs
+
+
+def _shelf_pack(widths, heights, aspect, gap):
+    """Shelf-pack boxes tallest first into rows sized for the page aspect ratio."""
+    area = float(((widths + gap) * (heights + gap)).sum())
+    row_width = max(np.sqrt(area * aspect), widths.max())
+    ox = np.zeros(len(widths))
+    oy = np.zeros(len(widths))
+    x = y = shelf = 0.0
+    for i in np.argsort(-heights, kind="stable"):
+        if x > 0 and x + widths[i] > row_width:
+            y += shelf + gap
+            x = shelf = 0.0
+        ox[i] = x
+        oy[i] = y
+        x += widths[i] + gap
+        shelf = max(shelf, heights[i])
+    return ox, oy
+
+
+def component_layout(n_nodes, src, tgt, processes=None, **params):
+    """Lay out each connected component independently and shelf-pack them.
+
+    Components run in a process pool (largest first), so wall time follows
+    the largest component and the core count rather than the total size.
+    ``processes=1`` forces in-process layout.
+    """
+    p = {**DEFAULTS, **params}
+    if n_nodes == 0:
+        return np.zeros(0, dtype=np.float32), np.zeros(0, dtype=np.float32)
+    members, jobs = _component_jobs(n_nodes, np.asarray(src), np.asarray(tgt))
+    order = sorted(range(len(jobs)), key=lambda c: -jobs[c][0])
+
+    # Largest components get a task each; the tail is batched.
+    batches, current, current_nodes = [], [], 0
+    for c in order:
+        current.append(c)
+        current_nodes += jobs[c][0]
+        if current_nodes >= BATCH_NODES:
+            batches.append(current)
+            current, current_nodes = [], 0
+    if current:
+        batches.append(current)
+
+    if processes is None:
+        processes = os.cpu_count() or 1
+    processes = min(processes, len(batches))
+    results = [None] * len(jobs)
+    if processes > 1 and n_nodes >= POOL_MIN_NODES:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            futures = [pool.submit(_layout_batch, [jobs[c] for c in b], params) for b in batches]
+            for batch, future in zip(batches, futures):
+                for c, xy in zip(batch, future.result()):
+                    results[c] = xy
+    else:
+        for batch in batches:
+            for c, xy in zip(batch, _layout_batch([jobs[c] for c in batch], params)):
+                results[c] = xy
+
+    pad = p["collide_radius"] or 0
+    lo = np.array([[xy[0].min() - pad, xy[1].min() - pad] for xy in results])
+    hi = np.array([[xy[0].max() + pad, xy[1].max() + pad] for xy in results])
+    size = hi - lo
+    aspect = p["width"] / p["height"] if p["width"] and p["height"] else 1.0
+    ox, oy = _shelf_pack(size[:, 0], size[:, 1], aspect, COMPONENT_GAP)
+    total_w = (ox + size[:, 0]).max()
+    total_h = (oy + size[:, 1]).max()
+
+    x = np.empty(n_nodes, dtype=np.float32)
+    y = np.empty(n_nodes, dtype=np.float32)
+    for c, (cx, cy) in enumerate(results):
+        x[members[c]] = cx - lo[c, 0] + ox[c] + (p["width"] - total_w) / 2
+        y[members[c]] = cy - lo[c, 1] + oy[c] + (p["height"] - total_h) / 2
+    return x, y
+
+
+# ---------------------------
+# Cached positions per graph fingerprint
+# ---------------------------
+_cache = GraphCache(maxsize=LAYOUT_CACHE_SIZE)
+
+
+def cache_stats():
+    return _cache.stats()
+
+
+def _artifact_name(params):
+    merged = json.dumps({**DEFAULTS, **params}, sort_keys=True)
+    return "layout-" + hashlib.sha1(merged.encode("utf-8")).hexdigest()[:12]
+
+
+def layout_positions(built, **params):
+    """Cached ``component_layout`` of a ``graphdata.BuiltGraph``.
+
+    Positions are also stored in the graph's on-disk artifact, so other
+    processes reuse them instead of re-running the layout.
+    """
+    key = (built.fingerprint, tuple(sorted(params.items())))
+    xy = _cache.get(key) if built.fingerprint else None
+    if xy is None:
+        stored = load_artifact_array(built, _artifact_name(params))
+        if stored is not None and stored.shape == (2, len(built.names)):
+            xy = (stored[0], stored[1])
+        else:
+            xy = component_layout(len(built.names), built.source, built.target, **params)
+            save_artifact_array(built, _artifact_name(params), np.stack(xy))
+        if built.fingerprint:
+            _cache.put(key, xy)
+    return xy
+
+
+def positioned_json(built, metric=None, **params):
+    """Compact payload of ``built`` with precomputed x/y (Float32) positions.
+
+    With ``metric`` (a ``graphmetrics.METRICS`` name) the nodes also carry
+    their importance, which the pages size them by. Kept on the graph
+    (``BuiltGraph.memo``), so sessions share one copy.
+    """
+    def build():
+        x, y = layout_positions(built, **params)
+        weight = graphmetrics.importance(built, metric) if metric else None
+        return compact_json_from_arrays(built.names, built.groups, built.source, built.target, x, y, weight)
+
+    return built.memo(("positioned", metric, tuple(sorted(params.items()))), build)
+
+
+# ---------------------------
+# Level of detail
+# ---------------------------
+# A cluster hierarchy over the laid-out graph for zoomed-out views. Level 0
+# has one aggregate per group; each following level splits the aggregates
+# that still hold more than LOD_LEAF_SIZE nodes along a grid twice as fine,
+# so the page can expand a cluster into smaller pieces as it grows on screen.
+LOD_LEAF_SIZE = 64
+LOD_MAX_LEVELS = 12
+
+
+def lod_hierarchy(groups, x, y, leaf_size=LOD_LEAF_SIZE, max_levels=LOD_MAX_LEVELS):
+    """Aggregate nodes into nested clusters.
+
+    Returns ``(parent, count, cx, cy, radius, group, leaf)``: per aggregate
+    its parent (-1 at level 0; parents always precede children), member
+    count, centroid, distance to the farthest member and group value, and
+    per node the deepest aggregate containing it.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    lo_x = x.min() if n else 0.0
+    lo_y = y.min() if n else 0.0
+    span = max(np.ptp(x) if n else 0.0, np.ptp(y) if n else 0.0, 1e-9)
+
+    values, local = np.unique(groups, return_inverse=True)
+    idx = np.arange(n)
+    k = len(values)
+    parent = np.full(k, -1, dtype=np.int64)
+    group = values.astype(np.int64)
+    leaf = np.zeros(n, dtype=np.int64)
+    blocks = []
+    offset = 0
+    for level in range(max_levels + 1):
+        ids = offset + local
+        leaf[idx] = ids
+        count = np.bincount(local, minlength=k)
+        cx = np.bincount(local, x[idx], k) / count
+        cy = np.bincount(local, y[idx], k) / count
+        radius = np.zeros(k)
+        np.maximum.at(radius, local, np.hypot(x[idx] - cx[local], y[idx] - cy[local]))
+        blocks.append((parent, count, cx, cy, radius, group))
+
+        split = count[local] > leaf_size
+        if level == max_levels or not split.any():
+            break
+        idx = idx[split]
+        res = 2 ** (level + 1)
+        gx = np.clip(((x[idx] - lo_x) / span * res).astype(np.int64), 0, res - 1)
+        gy = np.clip(((y[idx] - lo_y) / span * res).astype(np.int64), 0, res - 1)
+        keys, local = np.unique(ids[split] * (res * res) + gx * res + gy, return_inverse=True)
+        offset += k
+        k = len(keys)
+        parent = keys // (res * res)
+        group = np.concatenate([b[5] for b in blocks])[parent]
+
+    return tuple(np.concatenate([b[i] for b in blocks]) for i in range(6)) + (leaf,)
+
+
+def lod_json(built, **params):
+    """Cluster hierarchy of ``built`` for ``static/lod-view.js``, over its cached layout."""
+    return built.memo(("lod", tuple(sorted(params.items()))), lambda: _lod_payload(built, params))
+
+
+def _lod_payload(built, params):
+    x, y = layout_positions(built, **params)
+    parent, count, cx, cy, radius, group, leaf = lod_hierarchy(built.groups, x, y)
+    payload = {
+        "format": "lod",
+        "parent": b64_array(np.where(parent < 0, 0xFFFFFFFF, parent), "<u4"),
+        "count": b64_array(count, "<u4"),
+        "x": b64_array(cx, "<f4"),
+        "y": b64_array(cy, "<f4"),
+        "radius": b64_array(radius, "<f4"),
+        "group": b64_array(group, "<u4"),
+        "leaf": b64_array(leaf, "<u4"),
+    }
+    return json.dumps(payload, separators=(",", ":"))
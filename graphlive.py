@@ -0,0 +1,90 @@
+"""Live graph view: a declared Streamlit component edited in place.
+
+``components.html`` replaces its iframe whenever the document changes, so
+every new CSV version or selection restarts the page and its layout. This
+component is mounted once per key instead, with a fixed frontend
+(``static/graph-live/``) that receives the graph as args. The page reports
+which graph version it shows and the node/cluster picked in it; later
+reruns send only the nodes and edges that changed since
+(``graphdata.diff_graphs``), which the page applies to its running
+simulation (``static/graph-live.js``), and a new selection is a message
+of a few bytes.
+"""
+import os
+
+import streamlit as st
+import streamlit.components.v1 as components
+
+from chartassets import STATIC_DIR
+from graphdata import cached_graph, diff_graphs
+from graphlayout import positioned_json
+from graphmetrics import importance_changes
+
+# Frontend: static/graph-live/index.html
+_component = components.declare_component("graph_live", path=os.path.join(STATIC_DIR, "graph-live"))
+
+# Above this many changed edges the page reloads the whole graph instead
+MAX_DELTA_LINKS = 20000
+
+LIVE_OPTIONS = {
+    "width": 1200, "height": 700,
+    "linkDistance": 120, "linkStrength": 0.8, "charge": -200, "collideRadius": 45,
+    "velocityDecay": 0.07,
+    # After a change only nodes within reheatHops links of it move
+    "reheatHops": 1, "reheatAlpha": 0.5,
+    # "static" draws the precomputed layout as-is, "warm" refines it briefly
+    "layoutMode": "static",
+    # Above this many nodes the glow halos and label outlines are dropped
+    "glowMaxNodes": 1500,
+    # static/label-layer.js: labels at least minLabelPx tall, for nodes of
+    # degree >= labelDegree / zoom, without overlaps, maxLabels at most
+    "minLabelPx": 9, "labelDegree": 1, "maxLabels": 1500,
+    # static/ambient-motion.js; burstInterval 0 disables the periodic kicks
+    "motion": {"maxFps": 30, "energyThreshold": 0.02, "burstInterval": 0, "burstNodes": 150, "burstStrength": 55},
+}
+
+
+def live_args(built, grouping, shown, layout=None, metric=None):
+    """Component args moving the page from version ``shown`` to ``built``.
+
+    Nothing beyond the version when the page is current, a delta when the
+    version it shows is still in the graph cache and the change is small,
+    the whole positioned graph otherwise. With ``metric`` nodes carry their
+    importance, and deltas the nodes whose importance changed (``resize``).
+    """
+    version = {"fingerprint": built.fingerprint, "grouping": grouping}
+    args = {"version": version}
+    if shown == version:
+        return args
+    old = cached_graph(shown["fingerprint"], shown["grouping"]) if shown else None
+    if old is not None:
+        delta = diff_graphs(old, built)
+        if len(delta["addLinks"]) + len(delta["removeLinks"]) <= MAX_DELTA_LINKS:
+            if metric:
+                delta["resize"] = importance_changes(old, built, metric)
+            args["base"] = shown
+            args["delta"] = delta
+            return args
+    args["graph"] = positioned_json(built, metric=metric, **(layout or {}))
+    return args
+
+
+def live_graph(built, grouping, palette, options=None, layout=None, metric=None, selection=None, key="graph_live"):
+    """Draw ``built`` in the live component; returns the selection made in the page.
+
+    ``grouping`` must be the one ``built`` was loaded with, so the previous
+    version can be found in the cache. ``layout`` holds the
+    ``graphlayout.positioned_json`` parameters used for full loads, and
+    ``metric`` (a ``graphmetrics.METRICS`` name) sizes the nodes.
+    ``selection`` (``{"node": name, "group": cluster}``, either may be
+    ``None``) highlights from Python; the page applies it whenever it
+    changes. The return value has the same shape, or is ``None`` until the
+    page has reported.
+    """
+    options = {**LIVE_OPTIONS, **(options or {}), "palette": palette}
+    reported = st.session_state.get(key) or {}
+    args = live_args(built, grouping, reported.get("version"), layout, metric)
+    if selection is not None:
+        args["selection"] = selection
+    value = _component(options=options, key=key, default=None, height=options["height"], **args)
+    return value["selection"] if value else None
@@ -0,0 +1,302 @@
+"""Node-importance metrics on the integer-encoded edge arrays.
+
+- ``degree``: incident links per node (a self-loop counts once, duplicate
+  edges count each time), as the pages count them for highlighting.
+- ``pagerank``: power iteration over a SciPy sparse transition matrix of the
+  directed edges (source -> target, duplicates add weight), damping 0.85,
+  with the rank of nodes without out-links spread over all nodes.
+- ``betweenness``: Brandes' shortest-path dependencies from a random sample
+  of source nodes (all of them on small graphs) over the undirected,
+  unweighted graph, scaled up to the full count and normalized to [0, 1].
+  Batches of sources are searched side by side; a BFS level is one sparse
+  product when it is wide and a gather over its frontier's links otherwise.
+
+Values are cached per graph fingerprint and stored in the graph's on-disk
+artifact like the layouts, so each CSV version is measured once.
+:func:`importance` rescales a metric to [0, 1] for the payloads
+(``compact_json_from_arrays(..., importance=...)``), where the pages size
+nodes by it, and :func:`top_subgraph` keeps only the ``k`` most important
+nodes of a large graph.
+"""
+import hashlib
+import json
+
+import numpy as np
+import pandas as pd
+from scipy.sparse import coo_matrix, csr_matrix
+
+from graphdata import BuiltGraph, GraphCache, derived_graph, load_artifact_array, save_artifact_array
+
+METRIC_CACHE_SIZE = 32
+DAMPING = 0.85
+PAGERANK_TOL = 1e-9       # L1 change per node at which the iteration stops
+PAGERANK_MAX_ITER = 100
+BETWEENNESS_SAMPLES = 64  # BFS sources; graphs with fewer nodes are measured exactly
+BATCH_ENTRIES = 1 << 22   # (source, node) states per batch of simultaneous searches
+DENSE_RATIO = 64          # a BFS level with links > 1/DENSE_RATIO of a full product uses the product
+
+
+# ---------------------------
+# Metrics
+# ---------------------------
+def degree(n_nodes, src, tgt):
+    src = np.asarray(src, dtype=np.int64)
+    tgt = np.asarray(tgt, dtype=np.int64)
+    loop_free = src != tgt
+    return np.bincount(np.concatenate([src, tgt[loop_free]]), minlength=n_nodes).astype(np.float64)
+
+
+def pagerank(n_nodes, src, tgt, damping=DAMPING, tol=PAGERANK_TOL, max_iter=PAGERANK_MAX_ITER):
+    """PageRank of the directed edges ``src -> tgt``; sums to 1."""
+    if n_nodes == 0:
+        return np.zeros(0)
+    src = np.asarray(src, dtype=np.int64)
+    tgt = np.asarray(tgt, dtype=np.int64)
+    out = np.bincount(src, minlength=n_nodes).astype(np.float64)
+    # Column-stochastic transpose: rank flows from source to target
+    flow = csr_matrix(coo_matrix((1.0 / out[src], (tgt, src)), shape=(n_nodes, n_nodes)))
+    dangling = out == 0
+
+    rank = np.full(n_nodes, 1.0 / n_nodes)
+    for _ in range(max_iter):
+        spread = (damping * rank[dangling].sum() + 1.0 - damping) / n_nodes
+        nxt = damping * (flow @ rank) + spread
+        done = np.abs(nxt - rank).sum() < n_nodes * tol
+        rank = nxt
+        if done:
+            break
+    return rank / rank.sum()
+
+
+def _neighbours(indptr, indices, frontier):
+    # (position in frontier, neighbour) for every link leaving the frontier nodes
+    starts = indptr[frontier]
+    counts = indptr[frontier + 1] - starts
+    owner = np.repeat(np.arange(len(frontier)), counts)
+    first = np.cumsum(counts) - counts
+    return owner, indices[starts[owner] + np.arange(len(owner)) - first[owner]]
+
+
+def _accumulate(values, keys, weights):
+    # values[keys] += weights with repeated keys summed; returns the distinct keys.
+    # Large updates go through a dense bincount instead of a sort.
+    if len(keys) * 16 >= len(values):
+        hit = np.flatnonzero(np.bincount(keys, minlength=len(values)))
+        values[hit] += np.bincount(keys, weights=weights, minlength=len(values))[hit]
+    else:
+        hit, slot = np.unique(keys, return_inverse=True)
+        values[hit] += np.bincount(slot, weights=weights, minlength=len(hit))
+    return hit
+
+
+def _dependencies(a, sources, dist, sigma, delta):
+    """Summed Brandes dependencies of every node on the shortest paths from ``sources``.
+
+    The sources are searched side by side: state is kept per (source, node)
+    key ``column * n + node`` in the flat scratch arrays, which are reset
+    before returning. A level whose links are a large share of the graph is
+    one sparse product ``a @ state``, a narrow one visits its links only.
+    """
+    n = a.shape[0]
+    b = len(sources)
+    indptr, indices = a.indptr, a.indices
+    dense_cost = (a.nnz + 2 * n) * b
+
+    def spread(keys, weights):
+        # Sum weights[k] into every neighbour of keys[k], in the same column:
+        # returns (neighbour keys, sums) or, dense, the whole flat result
+        nodes = keys % n
+        if (indptr[nodes + 1] - indptr[nodes]).sum() * DENSE_RATIO > dense_cost:
+            state = np.zeros(b * n)
+            state[keys] = weights
+            return None, (a @ state.reshape(b, n).T).T.ravel()
+        owner, nb = _neighbours(indptr, indices, nodes)
+        nb = nb + (keys[owner] - nodes[owner])
+        return nb, weights[owner]
+
+    levels = [np.arange(b) * n + sources]
+    dist[levels[0]] = 0
+    sigma[levels[0]] = 1.0
+    while True:
+        frontier = levels[-1]
+        d = len(levels) - 1
+        nb, paths = spread(frontier, sigma[frontier])
+        if nb is None:
+            nxt = np.flatnonzero(paths)
+            nxt = nxt[dist[nxt] < 0]
+            sigma[nxt] = paths[nxt]
+        else:
+            dist[nb[dist[nb] < 0]] = d + 1
+            on_path = dist[nb] == d + 1
+            nxt = _accumulate(sigma, nb[on_path], paths[on_path])
+        if not len(nxt):
+            break
+        dist[nxt] = d + 1
+        levels.append(nxt)
+
+    # Deepest level first: each node passes (1 + delta) / sigma back to its predecessors
+    for d in range(len(levels) - 1, 0, -1):
+        level = levels[d]
+        nb, share = spread(level, (1.0 + delta[level]) / sigma[level])
+        if nb is None:
+            prev = levels[d - 1]
+            delta[prev] += sigma[prev] * share[prev]
+        else:
+            back = dist[nb] == d - 1
+            prev = nb[back]
+            _accumulate(delta, prev, share[back] * sigma[prev])
+
+    visited = np.concatenate(levels[1:]) if len(levels) > 1 else levels[0][:0]
+    total = np.bincount(visited % n, weights=delta[visited], minlength=n)
+    everything = np.concatenate(levels)
+    dist[everything] = -1
+    sigma[everything] = 0.0
+    delta[everything] = 0.0
+    return total
+
+
+def betweenness(n_nodes, src, tgt, samples=BETWEENNESS_SAMPLES, seed=0):
+    """Approximate normalized betweenness centrality of the undirected graph."""
+    if n_nodes < 3:
+        return np.zeros(n_nodes)
+    src = np.asarray(src, dtype=np.int64)
+    tgt = np.asarray(tgt, dtype=np.int64)
+    loop_free = src != tgt
+    # Unweighted: duplicate links are one path
+    keys = np.unique(np.concatenate([src[loop_free] * n_nodes + tgt[loop_free],
+                                     tgt[loop_free] * n_nodes + src[loop_free]]))
+    a = csr_matrix((np.ones(len(keys)), keys % n_nodes, np.searchsorted(keys // n_nodes, np.arange(n_nodes + 1))),
+                   shape=(n_nodes, n_nodes))
+
+    if n_nodes <= samples:
+        sources = np.arange(n_nodes)
+    else:
+        sources = np.random.default_rng(seed).choice(n_nodes, samples, replace=False)
+    batch = max(1, min(len(sources), BATCH_ENTRIES // n_nodes))
+    dist = np.full(batch * n_nodes, -1, dtype=np.int32)
+    sigma = np.zeros(batch * n_nodes)
+    delta = np.zeros(batch * n_nodes)
+    total = np.zeros(n_nodes)
+    for lo in range(0, len(sources), batch):
+        total += _dependencies(a, sources[lo:lo + batch], dist, sigma, delta)
+
+    # Each undirected path is counted from both ends; scale the sample to all sources
+    scale = n_nodes / len(sources) / 2
+    return total * scale / ((n_nodes - 1) * (n_nodes - 2) / 2)
+
+
+# metric name -> fn(n_nodes, src, tgt, **params) returning one float per node
+METRICS = {
+    "degree": degree,
+    "pagerank": pagerank,
+    "betweenness": betweenness,
+}
+
+
+# ---------------------------
+# Cached values per graph fingerprint
+# ---------------------------
+_cache = GraphCache(maxsize=METRIC_CACHE_SIZE)
+
+
+def cache_stats():
+    return _cache.stats()
+
+
+def _artifact_name(metric, params):
+    merged = json.dumps(params, sort_keys=True)
+    return f"metric-{metric}-" + hashlib.sha1(merged.encode("utf-8")).hexdigest()[:12]
+
+
+def node_metric(built, metric="pagerank", **params):
+    """Cached ``METRICS[metric]`` of a ``graphdata.BuiltGraph``, one float64 per node.
+
+    Values are also stored in the graph's on-disk artifact, so other
+    processes reuse them instead of measuring again.
+    """
+    key = (built.fingerprint, metric, tuple(sorted(params.items())))
+    values = _cache.get(key) if built.fingerprint else None
+    if values is None:
+        stored = load_artifact_array(built, _artifact_name(metric, params))
+        if stored is not None and stored.shape == (len(built.names),):
+            values = stored
+        else:
+            values = METRICS[metric](len(built.names), built.source, built.target, **params)
+            save_artifact_array(built, _artifact_name(metric, params), values)
+        if built.fingerprint:
+            _cache.put(key, values)
+    return values
+
+
+def importance(built, metric="pagerank", **params):
+    """``metric`` rescaled to [0, 1] (the most important node is 1), as float32."""
+    values = np.asarray(node_metric(built, metric, **params), dtype=np.float64)
+    top = values.max() if len(values) else 0.0
+    return (values / top if top > 0 else np.zeros(len(values))).astype(np.float32)
+
+
+def top_nodes(built, k, metric="pagerank", **params):
+    """Indices of the ``k`` most important nodes, most important first (ties by index)."""
+    values = np.asarray(node_metric(built, metric, **params))
+    order = np.lexsort((np.arange(len(values)), -values))
+    return order[:k]
+
+
+# ---------------------------
+# Top-K subgraph
+# ---------------------------
+def subgraph(built, keep, fingerprint=None, links=None):
+    """``BuiltGraph`` of the nodes ``keep`` (indices, in that order) and the links among them.
+
+    ``links`` (link ids) limits the links looked at, e.g. to those
+    ``graphquery.QueryIndex.links_among`` found, instead of scanning all.
+    """
+    keep = np.asarray(keep, dtype=np.int64)
+    new_id = np.full(len(built.names), -1, dtype=np.int64)
+    new_id[keep] = np.arange(len(keep))
+    src, tgt = np.asarray(built.source), np.asarray(built.target)
+    if links is not None:
+        src, tgt = src[links], tgt[links]
+    src, tgt = new_id[src], new_id[tgt]
+    inside = (src >= 0) & (tgt >= 0)
+    return BuiltGraph(fingerprint, built.names[keep], np.asarray(built.groups)[keep],
+                      src[inside].astype(np.int32), tgt[inside].astype(np.int32))
+
+
+def top_subgraph(built, k, metric="pagerank", **params):
+    """The ``k`` most important nodes of ``built`` and their links; ``built`` itself if it is no larger.
+
+    Cached under a fingerprint derived from the full graph's
+    (``graphdata.derived_graph``), so sessions share one copy, layouts and
+    metrics of the subgraph are cached too, and the live view can diff the
+    next version against it; it has no on-disk artifact.
+    """
+    if len(built.names) <= k:
+        return built
+
+    def build():
+        return subgraph(built, np.sort(top_nodes(built, k, metric, **params)), fingerprint)
+
+    fingerprint = None
+    if not built.fingerprint:
+        return build()
+    raw = f"{built.fingerprint}|top|{k}|{metric}|{sorted(params.items())}"
+    fingerprint = hashlib.sha1(raw.encode("utf-8")).hexdigest()
+    return derived_graph(fingerprint, build)
+
+
+# ---------------------------
+# Changes between versions
+# ---------------------------
+def importance_changes(old, new, metric="pagerank", precision=0.01, **params):
+    """``[name, importance]`` of the nodes of ``new`` that are not in ``old`` or whose
+    importance moved by ``precision`` or more, for the live view's deltas.
+    """
+    now = importance(new, metric, **params)
+    before = importance(old, metric, **params)
+    new_to_old = pd.Index(np.asarray(old.names, dtype=object)).get_indexer(np.asarray(new.names, dtype=object))
+    kept = new_to_old >= 0
+    changed = ~kept
+    changed[kept] = np.abs(now[kept] - before[new_to_old[kept]]) >= precision
+    picked = np.flatnonzero(changed)
+    return [[n, round(v, 4)] for n, v in zip(np.asarray(new.names)[picked].tolist(), now[picked].tolist())]
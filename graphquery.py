@@ -0,0 +1,171 @@
+"""Neighbourhood queries for "focus on this node" views.
+
+A :class:`QueryIndex` holds CSR tables of one built graph: node -> incident
+links and their other ends, cluster -> member nodes, and the name lookup.
+It is built once per graph (``BuiltGraph.memo``) and shared by every
+session; a query then touches only the links of the nodes it visits, so
+the neighbourhood of a node in a graph of millions of edges comes back in
+milliseconds.
+
+:func:`focus_graph` cuts a ``graphdata.BuiltGraph`` down to the nodes within
+``hops`` links of a node or cluster and the links among them. ``limit``
+caps its size: the farthest ring and, if need be, the seeds themselves are
+cut to their most important nodes (``graphmetrics.node_metric``). The
+result is cached under its own fingerprint (``graphdata.derived_graph``),
+so the pages can draw it like any loaded graph and a wider view can be
+sent as a delta against a narrower one.
+"""
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+from graphdata import csr_index, derived_graph
+from graphmetrics import node_metric, subgraph
+
+FOCUS_HOPS = 1
+FOCUS_LIMIT = 500
+
+
+# ---------------------------
+# Index
+# ---------------------------
+def _gather(offsets, values, rows):
+    # values[offsets[r]:offsets[r + 1]] for every r in rows, concatenated
+    starts = offsets[rows]
+    counts = offsets[rows + 1] - starts
+    first = np.cumsum(counts) - counts
+    return values[np.repeat(starts - first, counts) + np.arange(counts.sum())]
+
+
+class QueryIndex:
+    """CSR tables of one graph for neighbourhood queries. Read-only."""
+
+    __slots__ = ("n_nodes", "link_offsets", "link_ids", "neighbours",
+                 "group_values", "group_offsets", "group_nodes", "_names", "_lookup")
+
+    def __init__(self, built):
+        src = np.asarray(built.source, dtype=np.int64)
+        tgt = np.asarray(built.target, dtype=np.int64)
+        n, m = len(built.names), len(src)
+        id_type = np.int32 if max(n, m) < 2**31 else np.int64
+        # A self-loop is listed once, as in graphdata.adjacency_json_from_arrays
+        loop_free = src != tgt
+        ends = np.concatenate([src, tgt[loop_free]])
+        others = np.concatenate([tgt, src[loop_free]])
+        link_of_end = np.concatenate([np.arange(m), np.flatnonzero(loop_free)])
+        self.n_nodes = n
+        self.link_offsets, order = csr_index(ends, n)
+        self.link_ids = link_of_end[order].astype(id_type)
+        self.neighbours = others[order].astype(id_type)
+
+        self.group_values, member_of = np.unique(np.asarray(built.groups), return_inverse=True)
+        self.group_offsets, group_nodes = csr_index(member_of, len(self.group_values))
+        self.group_nodes = group_nodes.astype(id_type)
+        self._names = built.names
+        self._lookup = None
+
+    def node(self, name):
+        """Index of the node called ``name``, or ``None``."""
+        if self._lookup is None:
+            self._lookup = pd.Index(np.asarray(self._names, dtype=object))
+        hit = self._lookup.get_indexer([name])[0]
+        return None if hit < 0 else int(hit)
+
+    def members(self, group):
+        """Nodes of cluster ``group`` (empty when there is none)."""
+        k = np.searchsorted(self.group_values, group)
+        if k >= len(self.group_values) or self.group_values[k] != group:
+            return np.zeros(0, dtype=np.int64)
+        return self.group_nodes[self.group_offsets[k]:self.group_offsets[k + 1]].astype(np.int64)
+
+    def neighbourhood(self, seeds, hops, limit=None, score=None):
+        """Nodes within ``hops`` links of ``seeds``: seeds first, then ring by ring.
+
+        With ``limit``, a ring that would overflow it is cut to its
+        highest-``score`` nodes (first found without a score) and the search
+        stops there. Returns ``(nodes, truncated)``.
+        """
+        def best(candidates, room):
+            if score is None:
+                return candidates[:room]
+            return candidates[np.argsort(-np.asarray(score)[candidates], kind="stable")[:room]]
+
+        ring = np.unique(np.asarray(seeds, dtype=np.int64))
+        truncated = limit is not None and len(ring) > limit
+        if truncated:
+            ring = best(ring, limit)
+        seen = np.zeros(self.n_nodes, dtype=bool)
+        seen[ring] = True
+        rings = [ring]
+        total = len(ring)
+        for _ in range(hops):
+            if truncated:
+                break
+            found = _gather(self.link_offsets, self.neighbours, ring)
+            ring = np.unique(found[~seen[found]]).astype(np.int64)
+            if not len(ring):
+                break
+            if limit is not None and total + len(ring) > limit:
+                ring = best(ring, limit - total)
+                truncated = True
+            seen[ring] = True
+            rings.append(ring)
+            total += len(ring)
+        return np.concatenate(rings), truncated
+
+    def links_among(self, nodes):
+        """Ids of the links with both ends in ``nodes``, ascending."""
+        nodes = np.asarray(nodes, dtype=np.int64)
+        inside = np.zeros(self.n_nodes, dtype=bool)
+        inside[nodes] = True
+        ends = _gather(self.link_offsets, self.neighbours, nodes)
+        ids = _gather(self.link_offsets, self.link_ids, nodes)
+        return np.unique(ids[inside[ends]]).astype(np.int64)
+
+    def footprint(self):
+        arrays = (self.link_offsets, self.link_ids, self.neighbours,
+                  self.group_values, self.group_offsets, self.group_nodes)
+        return sum(a.nbytes for a in arrays), 0
+
+
+def query_index(built):
+    """The :class:`QueryIndex` of ``built``, built once and shared with every holder of it."""
+    return built.memo(("query-index",), lambda: QueryIndex(built))
+
+
+# ---------------------------
+# Focus views
+# ---------------------------
+def focus_graph(built, node=None, group=None, hops=FOCUS_HOPS, limit=FOCUS_LIMIT, metric="pagerank"):
+    """Subgraph around node ``node`` (a name) and/or cluster ``group``.
+
+    Holds the nodes within ``hops`` links of them, at most ``limit`` (the
+    most important by ``metric`` when some must go; ``None`` = no limit),
+    and the links among them, seeds first. Returns ``(subgraph,
+    truncated)``, or ``(None, False)`` when neither the node nor the
+    cluster exists.
+    """
+    raw = f"{built.fingerprint}|focus|{node}|{group}|{hops}|{limit}|{metric}"
+    fingerprint = hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def build():
+        index = query_index(built)
+        seeds = [index.members(group)] if group is not None else []
+        if node is not None:
+            i = index.node(node)
+            if i is not None:
+                seeds.append(np.array([i]))
+        seeds = np.concatenate(seeds) if seeds else np.zeros(0, dtype=np.int64)
+        if not len(seeds):
+            return None
+        score = node_metric(built, metric) if metric and limit is not None else None
+        keep, truncated = index.neighbourhood(seeds, hops, limit, score)
+        view = subgraph(built, keep, fingerprint, links=index.links_among(keep))
+        view.memo(("truncated",), lambda: truncated)
+        return view
+
+    view = derived_graph(fingerprint, build) if built.fingerprint else build()
+    if view is None:
+        return None, False
+    return view, view.memo(("truncated",), lambda: False)
@@ -0,0 +1,256 @@
+"""Process-wide, reference-counted store of read-only graph data.
+
+Every Streamlit session runs the chart script in the same process, so one
+copy of a built graph and its serialized payloads can serve all of them.
+The store hands out references (:meth:`GraphStore.acquire`); a session keeps
+its references in its session state (:func:`hold`), and a reference is
+released when it is dropped, i.e. when the session moves to a newer graph
+or ends. Entries still referenced are never evicted; released ones stay
+cached for later sessions up to ``max_idle`` entries / ``max_idle_bytes``.
+:meth:`GraphStore.invalidate` removes entries explicitly: holders keep the
+value they have, new requests rebuild it.
+
+Stored values are frozen (numpy arrays made read-only), and
+:meth:`GraphStore.stats` reports how many bytes the store holds, split into
+heap memory and memory-mapped files, which are shared between processes
+through the page cache.
+"""
+import sys
+import threading
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+
+MAX_IDLE = 8                # released entries kept for reuse
+MAX_IDLE_BYTES = 2 << 30    # ... and their total heap size
+
+
+# ---------------------------
+# Memory accounting
+# ---------------------------
+def footprint(value):
+    """``(heap_bytes, mapped_bytes)`` of a stored value.
+
+    Objects can report their own size with a ``footprint()`` method
+    (``graphdata.BuiltGraph`` does); arrays, strings and containers are
+    measured directly.
+    """
+    if hasattr(value, "footprint") and not isinstance(value, type):
+        return value.footprint()
+    if isinstance(value, np.memmap):
+        return 0, value.nbytes
+    if isinstance(value, np.ndarray):
+        heap = value.nbytes
+        if value.dtype == object:
+            heap += sum(sys.getsizeof(v) for v in value.ravel().tolist())
+        return heap, 0
+    if isinstance(value, (str, bytes)):
+        return sys.getsizeof(value), 0
+    if isinstance(value, dict):
+        items = list(value.keys()) + list(value.values())
+    elif isinstance(value, (list, tuple)):
+        items = value
+    else:
+        return sys.getsizeof(value), 0
+    heap, mapped = sys.getsizeof(value), 0
+    for v in items:
+        h, m = footprint(v)
+        heap += h
+        mapped += m
+    return heap, mapped
+
+
+def freeze(value):
+    """Make the numpy arrays in ``value`` read-only (in place) and return it.
+
+    Objects can freeze themselves with a ``freeze()`` method.
+    """
+    if hasattr(value, "freeze") and not isinstance(value, type):
+        value.freeze()
+    elif isinstance(value, np.ndarray):
+        value.flags.writeable = False
+    elif isinstance(value, dict):
+        for v in value.values():
+            freeze(v)
+    elif isinstance(value, (list, tuple)):
+        for v in value:
+            freeze(v)
+    return value
+
+
+# ---------------------------
+# Store
+# ---------------------------
+class _Entry:
+    __slots__ = ("value", "refs", "heap", "mapped")
+
+    def __init__(self, value):
+        self.value = value
+        self.refs = 0
+        self.heap, self.mapped = footprint(value)
+
+
+class Ref:
+    """A reference to a stored value; the store counts it until it is garbage collected."""
+
+    __slots__ = ("key", "value", "__weakref__")
+
+    def __init__(self, key, value):
+        self.key = key
+        self.value = value
+
+
+class GraphStore:
+    """Thread-safe keyed store: referenced entries stay, released ones are LRU-evicted.
+
+    ``get``/``put``/``clear``/``stats`` behave like ``graphdata.GraphCache``.
+    """
+
+    def __init__(self, max_idle=MAX_IDLE, max_idle_bytes=MAX_IDLE_BYTES):
+        self.max_idle = max_idle
+        self.max_idle_bytes = max_idle_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = {}
+        self._idle = OrderedDict()   # key -> None, least recently used first
+        self._building = {}          # key -> lock, so a value is built once
+        # Re-entrant: a Ref can be collected, and release itself, while the
+        # same thread holds the lock
+        self._lock = threading.RLock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            if key in self._idle:
+                self._idle.move_to_end(key)
+            return entry.value
+
+    def put(self, key, value):
+        entry = _Entry(freeze(value))
+        with self._lock:
+            # Holders of a replaced value keep it and release the old entry
+            self._entries[key] = entry
+            self._idle[key] = None
+            self._idle.move_to_end(key)
+            self._trim()
+        return value
+
+    def acquire(self, key, build=None):
+        """A :class:`Ref` to the value under ``key``, built with ``build()`` if missing.
+
+        Returns ``None`` when the key is missing and there is no ``build``.
+        Concurrent callers of a missing key wait for a single build.
+        """
+        ref = self._ref(key)
+        with self._lock:
+            if ref is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        if ref is not None or build is None:
+            return ref
+        with self._lock:
+            lock = self._building.setdefault(key, threading.Lock())
+        with lock:
+            ref = self._ref(key)
+            if ref is None:
+                self.put(key, build())
+                ref = self._ref(key)
+        with self._lock:
+            self._building.pop(key, None)
+        return ref
+
+    def _ref(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            entry.refs += 1
+            self._idle.pop(key, None)
+            ref = Ref(key, entry.value)
+        weakref.finalize(ref, self._release, key, entry)
+        return ref
+
+    def _release(self, key, entry):
+        with self._lock:
+            entry.refs -= 1
+            if entry.refs == 0 and self._entries.get(key) is entry:
+                # Lazily filled caches (BuiltGraph payloads) may have grown
+                entry.heap, entry.mapped = footprint(entry.value)
+                self._idle[key] = None
+                self._trim()
+
+    def _trim(self):
+        idle_bytes = sum(self._entries[k].heap for k in self._idle)
+        while self._idle and (len(self._idle) > self.max_idle or idle_bytes > self.max_idle_bytes):
+            key, _ = self._idle.popitem(last=False)
+            idle_bytes -= self._entries.pop(key).heap
+            self.evictions += 1
+
+    def invalidate(self, match=None):
+        """Drop the entries whose key satisfies ``match`` (all without one); returns how many.
+
+        Sessions holding a dropped value keep it until they release it; the
+        next request for the key builds it again.
+        """
+        with self._lock:
+            keys = [k for k in self._entries if match is None or match(k)]
+            for key in keys:
+                del self._entries[key]
+                self._idle.pop(key, None)
+            return len(keys)
+
+    def clear(self):
+        self.invalidate()
+
+    def stats(self):
+        with self._lock:
+            entries = list(self._entries.values())
+            sizes = [footprint(e.value) for e in entries]
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(entries),
+                "maxsize": self.max_idle,
+                "held": sum(1 for e in entries if e.refs),
+                "refs": sum(e.refs for e in entries),
+                "bytes": sum(h for h, _ in sizes),
+                "mapped_bytes": sum(m for _, m in sizes),
+            }
+
+
+# ---------------------------
+# Per-session references
+# ---------------------------
+_HOLDS = "_graphstore_holds"
+
+
+def hold(name, ref):
+    """Keep the :class:`Ref` ``ref`` in the current Streamlit session under ``name``.
+
+    Replaces (and so releases) what the session held under ``name`` before;
+    everything is released when the session ends. Does nothing outside a
+    Streamlit script run or when ``ref`` is ``None``.
+    """
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    if get_script_run_ctx(suppress_warning=True) is None:
+        return None
+    import streamlit as st
+
+    holds = st.session_state.setdefault(_HOLDS, {})
+    current = holds.get(name)
+    if current is not None and ref is not None and current.key == ref.key:
+        return current
+    if ref is None:
+        holds.pop(name, None)
+    else:
+        holds[name] = ref
+    return ref
@@ -1,51 +1,89 @@
 import streamlit as st
 import streamlit.components.v1 as components
 from d3graph import d3graph, vec2adjmat
+import d3graph as d3graph_package
+import hashlib
+import inspect
 import os
-import time
+import tempfile
+
+import pandas as pd
 
 st.title("D3 Network Graph")
 
-# Initialize
-d3 = d3graph()
+# show(return_html=True, overwrite=False) hands the page back without writing
+# it; older d3graph releases can only write a file
+if not {"return_html", "overwrite"} <= set(inspect.signature(d3graph.show).parameters):
+    st.error(f"d3graph {getattr(d3graph_package, '__version__', '?')} cannot render in memory; "
+             "upgrade it with `pip install -U d3graph` (3.2 or newer).")
+    st.stop()
+
+# Exports go here, and only when asked for; rendering never touches the file
+EXPORT_PATH = os.path.join(os.getcwd(), 'network_graph.html')
+
+
+# ---------------------------
+# Load data
+# ---------------------------
+@st.cache_data(show_spinner=False)
+def load_example(name):
+    return d3graph().import_example(name)
+
+
+def adjmat_fingerprint(adjmat):
+    """Content hash of the adjacency matrix: labels, order and weights."""
+    h = hashlib.sha1()
+    h.update(pd.util.hash_pandas_object(adjmat, index=True).to_numpy().tobytes())
+    h.update("\0".join(map(str, adjmat.columns)).encode("utf-8"))
+    return h.hexdigest()
+
 
 # Load energy example
-df = d3.import_example('energy')
+df = load_example('energy')
 adjmat = vec2adjmat(source=df['source'], target=df['target'], weight=df['weight'])
 
-# Process adjmat
-d3.graph(adjmat)
-
-# Change node properties
-d3.set_node_properties(scaler='minmax', color=None)
-d3.node_properties['Solar']['size'] = 30
-d3.node_properties['Solar']['color'] = '#FF0000'
-d3.node_properties['Solar']['edge_color'] = '#000000'
-d3.node_properties['Solar']['edge_size'] = 5
-
-# Save to absolute path in current directory
-current_dir = os.getcwd()
-html_path = os.path.join(current_dir, 'network_graph.html')
-
-st.write(f"Saving to: {html_path}")
-
-# Show and save
-d3.show(filepath=html_path, showfig=False)
-
-# Wait for file to be written
-time.sleep(1)
-
-# Check if file exists
-if os.path.exists(html_path):
-    st.success("File created successfully!")
-    
-    # Read and display the HTML
-    with open(html_path, 'r', encoding='utf-8') as file:
-        html_content = file.read()
-    
-    # Display in Streamlit
-    components.html(html_content, height=800, scrolling=True)
-else:
-    st.error(f"File not found at: {html_path}")
-    st.write(f"Current directory: {current_dir}")
-    st.write(f"Files in directory: {os.listdir(current_dir)}")
\ No newline at end of file
+
+# ---------------------------
+# Render in memory
+# ---------------------------
+# d3graph.show(return_html=True, overwrite=False) returns the page as a
+# string instead of writing it, so there is no file to wait for and nothing
+# shared between sessions. The HTML is cached per adjacency-matrix
+# fingerprint; the matrix itself (underscore argument) is not hashed again
+# by Streamlit.
+@st.cache_data(max_entries=16, show_spinner=False)
+def render_html(fingerprint, _adjmat):
+    d3 = d3graph()
+    d3.graph(_adjmat)
+
+    # Change node properties
+    d3.set_node_properties(scaler='minmax', color=None)
+    d3.node_properties['Solar']['size'] = 30
+    d3.node_properties['Solar']['color'] = '#FF0000'
+    d3.node_properties['Solar']['edge_color'] = '#000000'
+    d3.node_properties['Solar']['edge_size'] = 5
+
+    return d3.show(filepath=None, showfig=False, overwrite=False, return_html=True)
+
+
+html_content = render_html(adjmat_fingerprint(adjmat), adjmat)
+components.html(html_content, height=800, scrolling=True)
+
+
+# ---------------------------
+# Export (on request only)
+# ---------------------------
+def export_html(html, path):
+    # Write to a temporary file next to the target and rename it into place,
+    # so concurrent sessions never read a half-written page
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(html)
+    os.replace(tmp, path)
+
+
+col_download, col_save = st.columns(2)
+col_download.download_button("Download HTML", html_content, file_name="network_graph.html", mime="text/html")
+if col_save.button(f"Save to {EXPORT_PATH}"):
+    export_html(html_content, EXPORT_PATH)
+    st.success(f"Saved {EXPORT_PATH}")
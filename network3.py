@@ -1,8 +1,9 @@
 import streamlit as st
 import streamlit.components.v1 as components
-import os
 import json
 
+from chartassets import d3_script
+
 st.set_page_config(layout="wide")
 st.title("D3 Network Graph – Single File Streamlit App")
 
@@ -36,7 +37,7 @@ html_content = f"""
 <html>
 <head>
 <meta charset="utf-8">
-<script src="https://d3js.org/d3.v7.min.js"></script>
+{d3_script()}
 <style>
   .link {{ stroke: #999; stroke-opacity: 0.6; }}
   text {{ font-family: Arial; font-size: 12px; }}
@@ -120,11 +121,7 @@ function dragended(event, d) {{
 # --------------------------------
 # (Optional) Save HTML locally
 # --------------------------------
-BASE_DIR = os.path.dirname(__file__)
-html_path = os.path.join(BASE_DIR, "network_graph.html")
-
-with open(html_path, "w", encoding="utf-8") as f:
-    f.write(html_content)
+st.download_button("Download HTML", html_content, file_name="network_graph.html", mime="text/html")
 
 # --------------------------------
 # Render in Streamlit
@@ -1,9 +1,10 @@
 import streamlit as st
 import streamlit.components.v1 as components
-import pandas as pd
-import json
 import os
 
+from chartassets import d3_script
+from graphdata import load_graph
+
 st.set_page_config(layout="wide")
 st.title("Network Diagram from CSV (Source → Target)")
 
@@ -13,19 +14,7 @@ st.title("Network Diagram from CSV (Source → Target)")
 BASE_DIR = os.path.dirname(__file__)
 csv_path = os.path.join(BASE_DIR, "networkdata.csv")
 
-df = pd.read_csv(csv_path)
-
-# ---------------------------
-# Build nodes and links
-# ---------------------------
-nodes = set(df["source"]).union(set(df["target"]))
-
-graph = {
-    "nodes": [{"id": n, "group": 1} for n in nodes],
-    "links": [{"source": r["source"], "target": r["target"]} for _, r in df.iterrows()]
-}
-
-graph_json = json.dumps(graph)
+graph_json = load_graph(csv_path, grouping="flat").graph_json
 
 # ---------------------------
 # D3 HTML
@@ -35,7 +24,7 @@ html_content = f"""
 <html>
 <head>
 <meta charset="utf-8">
-<script src="https://d3js.org/d3.v7.min.js"></script>
+{d3_script()}
 <style>
   body {{ margin: 0; }}
   .link {{ stroke: #999; stroke-opacity: 0.6; }}
@@ -1,9 +1,11 @@
 import streamlit as st
 import streamlit.components.v1 as components
-import pandas as pd
-import json
 import os
 
+from chartassets import d3_script, inline_script
+from graphdata import load_graph
+from graphlayout import positioned_json
+
 st.set_page_config(layout="wide")
 st.title("Network Graph from CSV with Zoom & Labels")
 
@@ -13,19 +15,12 @@ st.title("Network Graph from CSV with Zoom & Labels")
 BASE_DIR = os.path.dirname(__file__)
 csv_path = os.path.join(BASE_DIR, "networkdata.csv")
 
-df = pd.read_csv(csv_path)
-
-# ---------------------------
-# Build nodes and links
-# ---------------------------
-nodes = set(df["source"]).union(set(df["target"]))
-graph = {
-    "nodes": [{"id": n, "group": 1} for n in nodes],
-    "links": [{"source": r["source"], "target": r["target"]} for _, r in df.iterrows()]
-}
+built = load_graph(csv_path, grouping="flat")
 
-# Convert to JSON string for JS
-graph_json = json.dumps(graph)
+# Positions are precomputed server-side (cached per CSV fingerprint);
+# LAYOUT_MODE "static" draws them as-is, "warm" lets the browser refine them.
+LAYOUT_MODE = "static"
+graph_json = positioned_json(built, width=1100)
 
 
 
@@ -37,7 +32,8 @@ html_content = f"""
 <html>
 <head>
 <meta charset="utf-8">
-<script src="https://d3js.org/d3.v7.min.js"></script>
+{d3_script()}
+{inline_script("graph-decode.js")}
 <style>
   body {{ margin: 0; }}
   .link {{ stroke: #999; stroke-opacity: 0.6; stroke-width: 1.5px; }}
@@ -50,7 +46,7 @@ html_content = f"""
 <svg width="1100" height="700"></svg>
 
 <script>
-const graph = {graph_json};   // <-- Injected correctly from Python
+const graph = decodeGraph({graph_json});   // <-- Injected correctly from Python
 
 const width = 1100;
 const height = 700;
@@ -101,7 +97,7 @@ node.append("text")
   .text(d => d.id);
 
 // Tick
-simulation.on("tick", () => {{
+function ticked() {{
   link
     .attr("x1", d => d.source.x)
     .attr("y1", d => d.source.y)
@@ -109,7 +105,15 @@ simulation.on("tick", () => {{
     .attr("y2", d => d.target.y);
   
   node.attr("transform", d => `translate(${{d.x}},${{d.y}})`);
-}});
+}}
+simulation.on("tick", ticked);
+
+// Precomputed layout: render it directly instead of simulating from scratch
+if (graph.positioned) {{
+  if ("{LAYOUT_MODE}" === "static") simulation.stop();
+  else simulation.alpha(0.1);
+  ticked();
+}}
 
 // Drag functions
 function dragstarted(event, d) {{
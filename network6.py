@@ -1,9 +1,11 @@
 import streamlit as st
 import streamlit.components.v1 as components
-import pandas as pd
-import json
 import os
 
+from chartassets import d3_script, inline_script
+from graphdata import load_graph
+from graphlayout import positioned_json
+
 st.set_page_config(layout="wide")
 st.title("Clustered Network Graph from CSV")
 
@@ -13,24 +15,12 @@ st.title("Clustered Network Graph from CSV")
 BASE_DIR = os.path.dirname(__file__)
 csv_path = os.path.join(BASE_DIR, "networkdata.csv")
 
-df = pd.read_csv(csv_path)
-
-# ---------------------------
-# Build nodes with group (cluster)
-# ---------------------------
-# Assign clusters based on first letter or manually
-node_ids = list(set(df["source"]).union(set(df["target"])))
-nodes = []
-
-for n in node_ids:
-    # Example grouping: first letter (A/B/C...) for cluster
-    cluster = ord(n[0].upper()) % 10  # gives 0-9
-    nodes.append({"id": n, "group": cluster})
+built = load_graph(csv_path, grouping="louvain")
 
-links = [{"source": r["source"], "target": r["target"]} for _, r in df.iterrows()]
-
-graph = {"nodes": nodes, "links": links}
-graph_json = json.dumps(graph)
+# Positions are precomputed server-side (cached per CSV fingerprint);
+# LAYOUT_MODE "static" draws them as-is, "warm" lets the browser refine them.
+LAYOUT_MODE = "static"
+graph_json = positioned_json(built)
 
 # ---------------------------
 # D3 HTML with cluster colors & white labels
@@ -40,7 +30,8 @@ html_content = f"""
 <html>
 <head>
 <meta charset="utf-8">
-<script src="https://d3js.org/d3.v7.min.js"></script>
+{d3_script()}
+{inline_script("graph-decode.js")}
 <style>
   body {{ margin: 0; }}
   .link {{ stroke: #999; stroke-opacity: 0.6; stroke-width: 1.5px; }}
@@ -60,7 +51,7 @@ html_content = f"""
 <svg width="1200" height="700"></svg>
 
 <script>
-const graph = {graph_json};
+const graph = decodeGraph({graph_json});
 const width = 1200;
 const height = 700;
 
@@ -125,7 +116,7 @@ node.append("text")
 // -------------------------------
 // Tick
 // -------------------------------
-simulation.on("tick", () => {{
+function ticked() {{
   link
     .attr("x1", d => d.source.x)
     .attr("y1", d => d.source.y)
@@ -133,7 +124,15 @@ simulation.on("tick", () => {{
     .attr("y2", d => d.target.y);
   
   node.attr("transform", d => `translate(${{d.x}},${{d.y}})`);
-}});
+}}
+simulation.on("tick", ticked);
+
+// Precomputed layout: render it directly instead of simulating from scratch
+if (graph.positioned) {{
+  if ("{LAYOUT_MODE}" === "static") simulation.stop();
+  else simulation.alpha(0.1);
+  ticked();
+}}
 
 // -------------------------------
 // Drag functions
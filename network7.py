@@ -1,9 +1,11 @@
 import streamlit as st
 import streamlit.components.v1 as components
-import pandas as pd
-import json
 import os
 
+from chartassets import d3_script, inline_script
+from graphdata import load_graph
+from graphlayout import positioned_json
+
 st.set_page_config(layout="wide")
 st.title("Glossy Light Clustered Network Graph")
 
@@ -13,22 +15,14 @@ st.title("Glossy Light Clustered Network Graph")
 BASE_DIR = os.path.dirname(__file__)
 csv_path = os.path.join(BASE_DIR, "networkdata.csv")
 
-df = pd.read_csv(csv_path)
-
-# ---------------------------
-# Build nodes with group
-# ---------------------------
-node_ids = list(set(df["source"]).union(set(df["target"])))
-nodes = []
-
-# Assign clusters based on first letter for demo
-for n in node_ids:
-    cluster = ord(n[0].upper()) % 10
-    nodes.append({"id": n, "group": cluster})
+built = load_graph(csv_path, grouping="louvain")
 
-links = [{"source": r["source"], "target": r["target"]} for _, r in df.iterrows()]
-graph = {"nodes": nodes, "links": links}
-graph_json = json.dumps(graph)
+# Positions are precomputed server-side (cached per CSV fingerprint);
+# LAYOUT_MODE "static" draws them as-is, "warm" lets the browser refine them.
+LAYOUT_MODE = "static"
+# Above this many nodes the glow halos and label outlines are dropped
+GLOW_MAX_NODES = 1500
+graph_json = positioned_json(built)
 
 # ---------------------------
 # D3 HTML with pastel glossy nodes
@@ -38,14 +32,15 @@ html_content = f"""
 <html>
 <head>
 <meta charset="utf-8">
-<script src="https://d3js.org/d3.v7.min.js"></script>
+{d3_script()}
+{inline_script("graph-decode.js")}
+{inline_script("node-glow.js")}
 <style>
   body {{ margin: 0; background: #000000; }}
   .link {{ stroke: #999; stroke-opacity: 0.4; stroke-width: 1.5px; }}
   .node circle {{
     stroke: #fff;
     stroke-width: 1.5px;
-    filter: url(#glow);  /* glow effect */
   }}
   .node text {{
     font-family: Arial, sans-serif;
@@ -53,26 +48,22 @@ html_content = f"""
     font-weight: 600;
     fill: #ffffff;
     pointer-events: none;
-    text-shadow: 1px 1px 2px #00000066;
+    paint-order: stroke;
+    stroke: #00000066;
+    stroke-width: 3px;
+    stroke-linejoin: round;
   }}
+  .node circle.halo {{ stroke: none; pointer-events: none; }}
+  .no-glow .node circle.halo {{ display: none; }}
+  .no-glow .node text {{ stroke: none; }}
 </style>
 </head>
 
 <body>
-<svg width="1200" height="700">
-  <defs>
-    <filter id="glow" x="-50%" y="-50%" width="200%" height="200%">
-      <feGaussianBlur stdDeviation="3" result="blur"/>
-      <feMerge>
-        <feMergeNode in="blur"/>
-        <feMergeNode in="SourceGraphic"/>
-      </feMerge>
-    </filter>
-  </defs>
-</svg>
+<svg width="1200" height="700"></svg>
 
 <script>
-const graph = {graph_json};
+const graph = decodeGraph({graph_json});
 const width = 1200;
 const height = 700;
 
@@ -129,7 +120,16 @@ const node = zoomLayer.append("g")
     .on("end", dragended)
   );
 
+// Glow: a shared gradient halo under each circle (static/node-glow.js)
+const glow = createGlow(svg, {GLOW_MAX_NODES});
+glow.update(graph.nodes.length);
 node.append("circle")
+  .attr("class", "halo")
+  .attr("r", 20 * GLOW_SPREAD)
+  .attr("fill", d => glow.fill(color(d.group)));
+
+node.append("circle")
+  .attr("class", "dot")
   .attr("r", 20)
   .attr("fill", d => color(d.group));
 
@@ -141,7 +141,7 @@ node.append("text")
 // -------------------------------
 // Tick
 // -------------------------------
-simulation.on("tick", () => {{
+function ticked() {{
   link
     .attr("x1", d => d.source.x)
     .attr("y1", d => d.source.y)
@@ -149,7 +149,15 @@ simulation.on("tick", () => {{
     .attr("y2", d => d.target.y);
 
   node.attr("transform", d => `translate(${{d.x}},${{d.y}})`);
-}});
+}}
+simulation.on("tick", ticked);
+
+// Precomputed layout: render it directly instead of simulating from scratch
+if (graph.positioned) {{
+  if ("{LAYOUT_MODE}" === "static") simulation.stop();
+  else simulation.alpha(0.1);
+  ticked();
+}}
 
 // -------------------------------
 // Drag functions
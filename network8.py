@@ -2,10 +2,12 @@
 
 import streamlit as st
 import streamlit.components.v1 as components
-import pandas as pd
-import json
 import os
 
+from chartassets import d3_script, inline_script
+from graphdata import load_graph
+from graphlayout import positioned_json
+
 st.set_page_config(layout="wide")
 st.title("Cohort Network")
 
@@ -14,18 +16,15 @@ st.title("Cohort Network")
 # ---------------------------
 BASE_DIR = os.path.dirname(__file__)
 csv_path = os.path.join(BASE_DIR, "networkdata.csv")
-df = pd.read_csv(csv_path)
-
-# Build nodes and clusters
-node_ids = list(set(df["source"]).union(set(df["target"])))
-nodes = []
-for n in node_ids:
-    cluster = ord(n[0].upper()) % 10
-    nodes.append({"id": n, "group": cluster})
+built = load_graph(csv_path, grouping="louvain")
 
-links = [{"source": r["source"], "target": r["target"]} for _, r in df.iterrows()]
-graph = {"nodes": nodes, "links": links}
-graph_json = json.dumps(graph)
+# Positions are precomputed server-side (cached per CSV fingerprint);
+# LAYOUT_MODE "static" draws them as-is, "warm" lets the browser refine them.
+LAYOUT_MODE = "static"
+# Above this many nodes the glow halos and label outlines are dropped
+GLOW_MAX_NODES = 1500
+graph_json = positioned_json(built)
+adjacency_json = built.adjacency_json
 
 # ---------------------------
 # HTML content with JS selection inside HTML
@@ -35,14 +34,16 @@ html_content = f"""
 <html>
 <head>
 <meta charset="utf-8">
-<script src="https://d3js.org/d3.v7.min.js"></script>
+{d3_script()}
+{inline_script("graph-decode.js")}
+{inline_script("graph-adjacency.js")}
+{inline_script("node-glow.js")}
 <style>
   body {{ margin: 0; background: #000; }}
   .link {{ stroke: #888; stroke-opacity: 0.4; stroke-width: 1.5px; }}
   .node circle {{
     stroke: #fff;
     stroke-width: 1.5px;
-    filter: url(#glow);
     cursor: pointer;
   }}
   .node text {{
@@ -51,26 +52,22 @@ html_content = f"""
     font-weight: 600;
     fill: #fff;
     pointer-events: none;
-    text-shadow: 1px 1px 2px #000000aa;
+    paint-order: stroke;
+    stroke: #000000aa;
+    stroke-width: 3px;
+    stroke-linejoin: round;
   }}
+  .node circle.halo {{ stroke: none; pointer-events: none; }}
+  .no-glow .node circle.halo {{ display: none; }}
+  .no-glow .node text {{ stroke: none; }}
 </style>
 </head>
 
 <body>
-<svg width="1200" height="700">
-  <defs>
-    <filter id="glow" x="-50%" y="-50%" width="200%" height="200%">
-      <feGaussianBlur stdDeviation="3" result="blur"/>
-      <feMerge>
-        <feMergeNode in="blur"/>
-        <feMergeNode in="SourceGraphic"/>
-      </feMerge>
-    </filter>
-  </defs>
-</svg>
+<svg width="1200" height="700"></svg>
 
 <script>
-const graph = {graph_json};
+const graph = decodeGraph({graph_json});
 const width = 1200;
 const height = 700;
 const svg = d3.select("svg");
@@ -115,7 +112,16 @@ const node = zoomLayer.append("g")
   .attr("class","node")
   .call(d3.drag().on("start", dragstarted).on("drag", dragged).on("end", dragended));
 
+// Glow: a shared gradient halo under each circle (static/node-glow.js)
+const glow = createGlow(svg, {GLOW_MAX_NODES});
+glow.update(graph.nodes.length);
 node.append("circle")
+  .attr("class", "halo")
+  .attr("r", 20 * GLOW_SPREAD)
+  .attr("fill", d => glow.fill(color(d.group)));
+
+node.append("circle")
+  .attr("class", "dot")
   .attr("r", 20)
   .attr("fill", d => color(d.group));
 
@@ -126,43 +132,41 @@ node.append("text")
 
 
 // Highlight function
-function highlight(selectionNode, selectionGroup) {{{{
-    // Nodes
-    node.select("circle")
-        .transition().duration(300)  // smooth animation
-        .attr("r", d => (!selectionNode || d.id === selectionNode || d.group === selectionGroup ? 30 : 15))
-        .attr("fill", d => {{{{
-            if(!selectionNode || d.id === selectionNode || d.group === selectionGroup) {{{{
-                return color(d.group);
-            }}}} else {{{{
-                return "#555";
-            }}}}
-        }}}})
-        .attr("opacity", d => (!selectionNode || d.id === selectionNode || d.group === selectionGroup ? 1 : 0.2));
-
-    node.select("text")
+// Only the elements whose on/off state flips get a transition; the
+// neighbourhoods come from the precomputed index (graph-adjacency.js)
+const nodeEls = node.nodes();
+const linkEls = link.nodes();
+const selection = createSelection(graph, decodeAdjacency({adjacency_json}));
+
+function highlight(selectionNode, selectionGroup) {{
+    const change = selection.select(selectionNode, selectionGroup);
+    const nodeOn = d => selection.nodeOn[d.index];
+    const linkOn = d => selection.linkOn[d.index];
+    const changedNodes = change.all ? node : d3.selectAll(change.nodes.map(i => nodeEls[i]));
+    const changedLinks = change.all ? link : d3.selectAll(change.links.map(i => linkEls[i]));
+
+    const radius = d => nodeOn(d) ? 30 : 15;
+    const fill = d => nodeOn(d) ? color(d.group) : "#555";
+    changedNodes.select("circle.dot")
         .transition().duration(300)
-        .attr("opacity", d => (!selectionNode || d.id === selectionNode || d.group === selectionGroup ? 1 : 0.2));
-
-    // Links
-    link.transition().duration(300)
-        .attr("stroke-width", d => {{
-            if(!selectionNode || d.source.id === selectionNode || d.source.group === selectionGroup || 
-               d.target.id === selectionNode || d.target.group === selectionGroup) {{{{
-                return 6;  // thicker for highlighted links
-            }}}} else {{{{
-                return 1;  // thin for dimmed links
-            }}}}
-        }})
-        .attr("opacity", d => {{
-            if(!selectionNode || d.source.id === selectionNode || d.source.group === selectionGroup || 
-               d.target.id === selectionNode || d.target.group === selectionGroup) {{{{
-                return 0.8;
-            }}}} else {{{{
-                return 0.05;
-            }}}}
-        }});
-}}}}
+        .attr("r", radius)
+        .attr("fill", fill)
+        .attr("opacity", d => nodeOn(d) ? 1 : 0.2);
+
+    changedNodes.select("circle.halo")
+        .attr("fill", d => glow.fill(fill(d)))
+        .transition().duration(300)
+        .attr("r", d => radius(d) * GLOW_SPREAD)
+        .attr("opacity", d => nodeOn(d) ? 1 : 0.2);
+
+    changedNodes.select("text")
+        .transition().duration(300)
+        .attr("opacity", d => nodeOn(d) ? 1 : 0.2);
+
+    changedLinks.transition().duration(300)
+        .attr("stroke-width", d => linkOn(d) ? 6 : 1)
+        .attr("opacity", d => linkOn(d) ? 0.8 : 0.05);
+}}
 
 
 
@@ -182,11 +186,19 @@ node.on("click", function(event, d) {{{{
 }}}});
 
 // Tick
-simulation.on("tick", () => {{
+function ticked() {{
     link.attr("x1", d=>d.source.x).attr("y1", d=>d.source.y)
         .attr("x2", d=>d.target.x).attr("y2", d=>d.target.y);
     node.attr("transform", d => `translate(${{d.x}},${{d.y}})`);
-}});
+}}
+simulation.on("tick", ticked);
+
+// Precomputed layout: render it directly instead of simulating from scratch
+if (graph.positioned) {{
+    if ("{LAYOUT_MODE}" === "static") simulation.stop();
+    else simulation.alpha(0.1);
+    ticked();
+}}
 
 // Drag functions
 function dragstarted(event,d){{ if(!event.active) simulation.alphaTarget(0.3).restart(); d.fx=d.x; d.fy=d.y; }}
@@ -0,0 +1,128 @@
+// Ambient motion for the force-directed pages. Replaces a permanently hot
+// simulation (alphaTarget > 0 plus a periodic burst over every node) with a
+// frame-capped loop that only runs while something is actually moving:
+//   - the simulation cools to alphaTarget 0 and goes to sleep once the mean
+//     kinetic energy per moving node drops below opts.energyThreshold;
+//   - nothing runs while the document is hidden or the iframe is scrolled
+//     out of view;
+//   - every opts.burstInterval ms at most opts.burstNodes random nodes are
+//     kicked, the rest stay pinned until the burst settles, and render() is
+//     told which nodes moved so it can skip the others;
+//   - opts.maxFps caps ticks + renders per second (0 = display rate);
+//   - settled(), when given, is called each time the layout cools to sleep.
+// d3's own timer is stopped; callers must use wake() or focus() instead of
+// restart(). The node array is read from the simulation on use, so pages may
+// replace it with simulation.nodes(...).
+function ambientMotion(simulation, opts, render, settled) {
+  const frameMs = opts.maxFps > 0 ? 1000 / opts.maxFps : 0;
+  const MIN_TICKS = 10;  // give freshly woken nodes time to pick up speed
+
+  let awake = false;
+  let visible = !document.hidden;
+  let onScreen = true;
+  let handle = null;
+  let last = -Infinity;
+  let ticks = 0;
+  let active = null;  // nodes moved by the current burst, null = all of them
+  let pinned = [];
+
+  simulation.stop().alphaTarget(0);
+
+  function energy(moving) {
+    let e = 0;
+    for (const d of moving) e += d.vx * d.vx + d.vy * d.vy;
+    return moving.length ? e / moving.length : 0;
+  }
+
+  function schedule() {
+    if (handle === null && awake && visible && onScreen) handle = requestAnimationFrame(frame);
+  }
+
+  function frame(now) {
+    handle = null;
+    if (!awake || !visible || !onScreen) return;
+    if (now - last >= frameMs - 1) {
+      last = now;
+      simulation.tick();
+      ticks++;
+      render(active);
+      const cooled = simulation.alpha() < simulation.alphaMin()
+        || (ticks >= MIN_TICKS && energy(active || simulation.nodes()) < opts.energyThreshold);
+      if (simulation.alphaTarget() === 0 && cooled) {
+        sleep();
+        if (settled) settled();
+        return;
+      }
+    }
+    schedule();
+  }
+
+  function release() {
+    pinned.forEach(d => { d.fx = null; d.fy = null; });
+    pinned = [];
+    active = null;
+  }
+
+  function start(alpha) {
+    simulation.alpha(Math.max(simulation.alpha(), alpha));
+    awake = true;
+    ticks = 0;
+    schedule();
+  }
+
+  function wake(alpha) {
+    release();
+    start(alpha);
+  }
+
+  function sleep() {
+    awake = false;
+    if (handle !== null) cancelAnimationFrame(handle);
+    handle = null;
+    release();
+  }
+
+  // Move only `moving` and keep every other node pinned until it settles
+  function focus(moving, alpha) {
+    release();
+    const nodes = simulation.nodes();
+    if (moving.length < nodes.length) {
+      const set = new Set(moving);
+      nodes.forEach(d => {
+        if (!set.has(d) && d.fx == null) {
+          d.fx = d.x;
+          d.fy = d.y;
+          pinned.push(d);
+        }
+      });
+      active = moving;
+    }
+    start(alpha);
+  }
+
+  function burst() {
+    const nodes = simulation.nodes();
+    if (awake || !visible || !onScreen || !nodes.length) return;
+    const k = Math.min(opts.burstNodes, nodes.length);
+    const chosen = d3.shuffle(nodes.slice()).slice(0, k);
+    chosen.forEach(d => {
+      d.vx += (Math.random() - 0.5) * opts.burstStrength;
+      d.vy += (Math.random() - 0.5) * opts.burstStrength;
+    });
+    focus(chosen, 0.3);
+  }
+
+  document.addEventListener("visibilitychange", () => {
+    visible = !document.hidden;
+    schedule();
+  });
+  if (window.IntersectionObserver) {
+    new IntersectionObserver(entries => {
+      onScreen = entries[entries.length - 1].isIntersecting;
+      schedule();
+    }).observe(document.body);
+  }
+  if (opts.burstInterval > 0) setInterval(burst, opts.burstInterval);
+
+  return {wake, sleep, burst, focus, isAwake: () => awake};
+}
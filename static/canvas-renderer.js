@@ -0,0 +1,308 @@
+// Canvas renderer for the NetworkCharts page, used above a node-count
+// threshold where one SVG element per node and link stalls the browser.
+// Same forces, palette, dropdowns and click/drag/zoom as the SVG template,
+// and the same highlight styling (highlightStyle in graph-adjacency.js).
+// Drawing and hit-testing go through a quadtree of node positions
+// (viewport-index.js): a frame draws the nodes in view and their links, so
+// zoomed-in frames cost what is visible rather than graph size.
+// adjacency is the decodeAdjacency() index used by highlight() and culling.
+// Labels are drawn for the nodes label-layer.js places, chosen again when
+// the zoom ends, the selection or hovered node changes and the layout sleeps.
+function renderCanvasGraph(graph, adjacency, opts) {
+  const width = opts.width;
+  const height = opts.height;
+  const nodes = graph.nodes;
+  const links = graph.links;
+  const color = d3.scaleOrdinal(opts.palette);
+
+  const canvas = document.getElementById("graphCanvas");
+  const dpr = window.devicePixelRatio || 1;
+  canvas.width = width * dpr;
+  canvas.height = height * dpr;
+  canvas.style.width = width + "px";
+  canvas.style.height = height + "px";
+  const ctx = canvas.getContext("2d");
+
+  let transform = d3.zoomIdentity;
+  const index = createViewportIndex();
+  const linkMark = new Uint8Array(links.length);
+  const labels = createLabelLayer(opts);
+  let labelled = [];
+  let hovered = null;
+
+  // ------------------- Visual state -------------------
+  // from/to values and start time per element, interpolated over 300 ms like
+  // the SVG transitions; only elements touched by highlight() restart
+  // Rest radius per node, NODE_RADIUS or by importance (graph-decode.js)
+  const baseR = Float32Array.from(nodes, nodeRadius);
+  const maxR = SELECTED_SCALE * (d3.max(baseR) || NODE_RADIUS);
+  const nodeR = [baseR.slice(), baseR.slice()];
+  const nodeA = [new Float32Array(nodes.length).fill(1), new Float32Array(nodes.length).fill(1)];
+  const nodeT0 = new Float64Array(nodes.length).fill(-Infinity);
+  const linkW = [new Float32Array(links.length).fill(3), new Float32Array(links.length).fill(3)];
+  const linkA = [new Float32Array(links.length).fill(1), new Float32Array(links.length).fill(1)];
+  const linkT0 = new Float64Array(links.length).fill(-Infinity);
+  let animEnd = -Infinity;
+
+  function progress(t0, now) {
+    return d3.easeCubic(Math.min(1, (now - t0) / 300));
+  }
+
+  function lerp(pair, i, t) {
+    return pair[0][i] + (pair[1][i] - pair[0][i]) * t;
+  }
+
+  // ------------------- Highlight -------------------
+  const selection = createSelection(graph, adjacency);
+  const nodeOn = selection.nodeOn;
+  let selected = false;  // anything selected
+
+  function highlight(nodeId, group) {
+    const now = performance.now();
+    const change = selection.select(nodeId, group);
+    selected = nodeId !== null || group !== null;
+    const style = highlightStyle(selected);
+
+    (change.all ? d3.range(nodes.length) : change.nodes).forEach(i => {
+      const t = progress(nodeT0[i], now);
+      nodeR[0][i] = lerp(nodeR, i, t);
+      nodeA[0][i] = lerp(nodeA, i, t);
+      nodeR[1][i] = baseR[i] * style.nodeScale(nodeOn[i]);
+      nodeA[1][i] = style.nodeOpacity(nodeOn[i]);
+      nodeT0[i] = now;
+    });
+    (change.all ? d3.range(links.length) : change.links).forEach(i => {
+      const t = progress(linkT0[i], now);
+      linkW[0][i] = lerp(linkW, i, t);
+      linkA[0][i] = lerp(linkA, i, t);
+      linkW[1][i] = style.linkWidth(selection.linkOn[i]);
+      linkA[1][i] = style.linkOpacity(selection.linkOn[i]);
+      linkT0[i] = now;
+    });
+    animEnd = now + 300;
+    relabel();
+  }
+
+  // ------------------- Labels -------------------
+  function importance(i) {
+    if (nodes[i] === hovered) return LABEL_HOVERED;
+    const degree = adjacency.nodeLinks(i).length;
+    return selected && nodeOn[i] ? LABEL_SELECTED + degree : degree;
+  }
+
+  function relabel() {
+    const [x0, y0] = transform.invert([-200, -50]);
+    const [x1, y1] = transform.invert([width + 50, height + 50]);
+    const candidates = index.query(nodes, x0, y0, x1, y1).map(d => d.index);
+    labelled = labels.place(candidates, nodes, importance, transform);
+    requestDraw();
+  }
+
+  // ------------------- Drawing -------------------
+  let drawPending = false;
+  function requestDraw() {
+    if (drawPending) return;
+    drawPending = true;
+    requestAnimationFrame(() => { drawPending = false; draw(); });
+  }
+
+  function draw() {
+    const now = performance.now();
+    const settled = now >= animEnd;
+    if (!settled) requestDraw();
+
+    ctx.setTransform(dpr, 0, 0, dpr, 0, 0);
+    ctx.fillStyle = "#000";
+    ctx.fillRect(0, 0, width, height);
+    ctx.translate(transform.x, transform.y);
+    ctx.scale(transform.k, transform.k);
+
+    // Visible area in graph coordinates, with a margin for radii and labels
+    const [x0, y0] = transform.invert([-200, -50]);
+    const [x1, y1] = transform.invert([width + 50, height + 50]);
+    const visibleNodes = index.query(nodes, x0, y0, x1, y1);
+    const visibleLinks = incidentLinks(visibleNodes, adjacency.nodeLinks, linkMark);
+
+    // Links: one path per style once transitions have settled (stroke-opacity 0.4)
+    ctx.strokeStyle = "#888";
+    if (settled) {
+      const buckets = new Map();
+      visibleLinks.forEach(i => {
+        const l = links[i];
+        const key = linkW[1][i] + "|" + linkA[1][i];
+        if (!buckets.has(key)) buckets.set(key, {width: linkW[1][i], alpha: linkA[1][i], items: []});
+        buckets.get(key).items.push(l);
+      });
+      buckets.forEach(b => {
+        ctx.beginPath();
+        b.items.forEach(l => {
+          ctx.moveTo(l.source.x, l.source.y);
+          ctx.lineTo(l.target.x, l.target.y);
+        });
+        ctx.lineWidth = b.width;
+        ctx.globalAlpha = 0.4 * b.alpha;
+        ctx.stroke();
+      });
+    } else {
+      visibleLinks.forEach(i => {
+        const l = links[i];
+        ctx.beginPath();
+        ctx.moveTo(l.source.x, l.source.y);
+        ctx.lineTo(l.target.x, l.target.y);
+        const t = progress(linkT0[i], now);
+        ctx.lineWidth = lerp(linkW, i, t);
+        ctx.globalAlpha = 0.4 * lerp(linkA, i, t);
+        ctx.stroke();
+      });
+    }
+
+    // Nodes: batched per fill colour when settled
+    ctx.strokeStyle = "#fff";
+    ctx.lineWidth = 1.5;
+    if (settled) {
+      const buckets = new Map();
+      visibleNodes.forEach(d => {
+        const i = d.index;
+        const fill = nodeOn[i] ? color(d.group) : "#555";
+        const key = fill + "|" + nodeA[1][i];
+        if (!buckets.has(key)) buckets.set(key, {fill, alpha: nodeA[1][i], items: []});
+        buckets.get(key).items.push(i);
+      });
+      buckets.forEach(b => {
+        ctx.beginPath();
+        b.items.forEach(i => {
+          const d = nodes[i];
+          ctx.moveTo(d.x + nodeR[1][i], d.y);
+          ctx.arc(d.x, d.y, nodeR[1][i], 0, 2 * Math.PI);
+        });
+        ctx.globalAlpha = b.alpha;
+        ctx.fillStyle = b.fill;
+        ctx.fill();
+        ctx.stroke();
+      });
+    } else {
+      visibleNodes.forEach(d => {
+        const i = d.index;
+        const t = progress(nodeT0[i], now);
+        ctx.beginPath();
+        ctx.arc(d.x, d.y, lerp(nodeR, i, t), 0, 2 * Math.PI);
+        ctx.globalAlpha = lerp(nodeA, i, t);
+        ctx.fillStyle = nodeOn[i] ? color(d.group) : "#555";
+        ctx.fill();
+        ctx.stroke();
+      });
+    }
+
+    // Labels placed at the last settled view; none mid-zoom once too small
+    if (LABEL_FONT_PX * transform.k >= opts.minLabelPx) {
+      ctx.font = `600 ${LABEL_FONT_PX}px Arial, sans-serif`;
+      ctx.fillStyle = "#fff";
+      ctx.strokeStyle = "#000000aa";
+      ctx.lineWidth = 3;
+      labelled.forEach(i => {
+        const d = nodes[i];
+        ctx.globalAlpha = lerp(nodeA, i, progress(nodeT0[i], now));
+        ctx.strokeText(d.id, d.x + LABEL_DX, d.y + LABEL_DY);
+        ctx.fillText(d.id, d.x + LABEL_DX, d.y + LABEL_DY);
+      });
+    }
+    ctx.globalAlpha = 1;
+  }
+
+  // ------------------- Hit testing -------------------
+  function findNode(px, py) {
+    const [x, y] = transform.invert([px, py]);
+    const d = index.find(nodes, x, y, maxR);
+    if (!d) return undefined;
+    return Math.hypot(d.x - x, d.y - y) <= nodeR[1][d.index] ? d : undefined;
+  }
+
+  // ------------------- Simulation -------------------
+  const simulation = d3.forceSimulation(nodes)
+    .force("link", d3.forceLink(links).id(d => d.id).distance(opts.linkDistance).strength(opts.linkStrength))
+    .force("charge", d3.forceManyBody().strength(opts.charge))
+    .force("center", d3.forceCenter(width / 2, height / 2))
+    .force("collision", d3.forceCollide().radius(opts.collideRadius))
+    .velocityDecay(opts.velocityDecay);
+
+  // Ticks are driven by ambientMotion (static/ambient-motion.js); a burst
+  // only re-files the nodes it moves in the index.
+  const ambient = ambientMotion(simulation, opts.motion, active => {
+    if (active) index.move(active);
+    else index.invalidate();
+    draw();
+  }, relabel);
+  if (!graph.positioned) ambient.wake(1);
+  else if (opts.layoutMode !== "static") ambient.wake(0.1);
+  relabel();
+
+  // ------------------- Zoom, drag, click -------------------
+  function dragsubject(event) {
+    return findNode(event.x, event.y);
+  }
+  function dragstarted(event) {
+    if (!event.active) {
+      simulation.alphaTarget(0.3);
+      ambient.wake(0.3);
+    }
+    event.subject.fx = event.subject.x;
+    event.subject.fy = event.subject.y;
+  }
+  function dragged(event) {
+    const [x, y] = transform.invert(d3.pointer(event.sourceEvent, canvas));
+    event.subject.fx = x;
+    event.subject.fy = y;
+  }
+  function dragended(event) {
+    if (!event.active) simulation.alphaTarget(0);
+    event.subject.fx = null;
+    event.subject.fy = null;
+  }
+
+  d3.select(canvas)
+    .call(d3.drag().subject(dragsubject).on("start", dragstarted).on("drag", dragged).on("end", dragended))
+    .call(d3.zoom().scaleExtent([0.2, 5]).on("zoom", event => {
+      transform = event.transform;
+      requestDraw();
+    }).on("end", relabel));
+
+  const nodeSelect = document.getElementById("nodeSelect");
+  const clusterSelect = document.getElementById("clusterSelect");
+
+  canvas.addEventListener("click", event => {
+    const d = findNode(...d3.pointer(event, canvas));
+    if (d) {
+      highlight(d.id, d.group);
+    } else {
+      highlight(null, null);
+      nodeSelect.value = "";
+      clusterSelect.value = "";
+    }
+  });
+
+  canvas.addEventListener("mousemove", event => {
+    const d = findNode(...d3.pointer(event, canvas)) || null;
+    if (d !== hovered) {
+      hovered = d;
+      relabel();
+    }
+  });
+
+  // ------------------- Dropdowns -------------------
+  nodes.forEach(d => {
+    const opt = document.createElement("option");
+    opt.value = d.id;
+    opt.text = d.id;
+    nodeSelect.appendChild(opt);
+  });
+  [...new Set(nodes.map(d => d.group))].sort((a, b) => a - b).forEach(g => {
+    const opt = document.createElement("option");
+    opt.value = g;
+    opt.text = "Cluster " + g;
+    clusterSelect.appendChild(opt);
+  });
+  nodeSelect.addEventListener("change", function() { highlight(this.value || null, null); });
+  clusterSelect.addEventListener("change", function() { highlight(null, this.value || null); });
+
+  return {simulation, highlight, ambient};
+}
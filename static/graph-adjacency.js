@@ -0,0 +1,150 @@
+// Highlight index produced by graphdata.adjacency_json_from_arrays: node ->
+// incident link ids and group -> member node ids, as CSR Uint32 tables.
+// Needs decodeUint32 from graph-decode.js.
+function decodeAdjacency(payload) {
+  const linkOffsets = decodeUint32(payload.linkOffsets);
+  const linkIds = decodeUint32(payload.linkIds);
+  const groupOffsets = decodeUint32(payload.groupOffsets);
+  const groupNodes = decodeUint32(payload.groupNodes);
+  const groupSlot = new Map(payload.groupValues.map((g, k) => [String(g), k]));
+  const empty = new Uint32Array(0);
+
+  return {
+    nodeLinks: i => linkIds.subarray(linkOffsets[i], linkOffsets[i + 1]),
+    groupNodes: g => {
+      const k = groupSlot.get(String(g));
+      return k === undefined ? empty : groupNodes.subarray(groupOffsets[k], groupOffsets[k + 1]);
+    },
+  };
+}
+
+// Same index built in the page from graph.links, for graphs edited in place
+// (graph-live.js) where no precomputed payload matches the current arrays.
+function buildAdjacency(graph) {
+  const n = graph.nodes.length;
+  const links = graph.links;
+  const linkOffsets = new Uint32Array(n + 1);
+  links.forEach(l => {
+    linkOffsets[l.source.index + 1]++;
+    if (l.target !== l.source) linkOffsets[l.target.index + 1]++;
+  });
+  for (let i = 0; i < n; i++) linkOffsets[i + 1] += linkOffsets[i];
+  const linkIds = new Uint32Array(linkOffsets[n]);
+  const cursor = linkOffsets.slice(0, n);
+  links.forEach((l, k) => {
+    linkIds[cursor[l.source.index]++] = k;
+    if (l.target !== l.source) linkIds[cursor[l.target.index]++] = k;
+  });
+  const groups = new Map();
+  graph.nodes.forEach((d, i) => {
+    const key = String(d.group);
+    if (!groups.has(key)) groups.set(key, []);
+    groups.get(key).push(i);
+  });
+  const empty = new Uint32Array(0);
+
+  return {
+    nodeLinks: i => linkIds.subarray(linkOffsets[i], linkOffsets[i + 1]),
+    groupNodes: g => groups.get(String(g)) || empty,
+  };
+}
+
+// On/off state behind highlight(nodeId, group). Nothing selected means every
+// element is on; otherwise a node is on when it is the selected node or in
+// the selected group, and a link is on when either end is. select() returns
+// only the node and link indices whose state flipped, so a change between
+// two selections costs their neighbourhoods, not the whole graph. `all` is
+// set when entering or leaving "nothing selected", where pages restyle
+// every element anyway.
+function createSelection(graph, adjacency) {
+  const nodes = graph.nodes;
+  const links = graph.links;
+  const nodeOn = new Uint8Array(nodes.length).fill(1);
+  const linkOn = new Uint8Array(links.length).fill(1);
+  const marked = new Uint8Array(nodes.length);
+  const seenNode = new Uint8Array(nodes.length);
+  const seenLink = new Uint8Array(links.length);
+  let nodeIndex = null;  // id -> index, built on the first selection by id
+  let members = null;    // node indices currently selected, null = nothing
+
+  function resolve(nodeId, group) {
+    const picked = [];
+    if (nodeId !== null) {
+      if (!nodeIndex) nodeIndex = new Map(nodes.map((d, i) => [String(d.id), i]));
+      const i = nodeIndex.get(String(nodeId));
+      if (i !== undefined) picked.push(i);
+    }
+    if (group !== null) {
+      const ids = adjacency.groupNodes(group);
+      for (let k = 0; k < ids.length; k++) picked.push(ids[k]);
+    }
+    return picked;
+  }
+
+  function select(nodeId, group) {
+    const next = nodeId === null && group === null ? null : resolve(nodeId, group);
+    const changedNodes = [];
+    const changedLinks = [];
+    if (next) next.forEach(i => { marked[i] = 1; });
+
+    const nodeState = i => (next ? marked[i] : 1);
+    const linkState = l => (next ? marked[links[l].source.index] | marked[links[l].target.index] : 1);
+    function visitNode(i) {
+      const on = nodeState(i);
+      if (nodeOn[i] !== on) { nodeOn[i] = on; changedNodes.push(i); }
+    }
+    function visitLink(l) {
+      const on = linkState(l);
+      if (linkOn[l] !== on) { linkOn[l] = on; changedLinks.push(l); }
+    }
+
+    if (!members || !next) {
+      // Entering or leaving "nothing selected" flips everything outside the selection
+      for (let i = 0; i < nodes.length; i++) visitNode(i);
+      for (let l = 0; l < links.length; l++) visitLink(l);
+    } else {
+      const candidates = members.concat(next);
+      candidates.forEach(i => {
+        if (seenNode[i]) return;
+        seenNode[i] = 1;
+        visitNode(i);
+        const incident = adjacency.nodeLinks(i);
+        for (let k = 0; k < incident.length; k++) {
+          const l = incident[k];
+          if (seenLink[l]) continue;
+          seenLink[l] = 1;
+          visitLink(l);
+        }
+      });
+      candidates.forEach(i => {
+        seenNode[i] = 0;
+        const incident = adjacency.nodeLinks(i);
+        for (let k = 0; k < incident.length; k++) seenLink[incident[k]] = 0;
+      });
+    }
+
+    if (next) next.forEach(i => { marked[i] = 0; });
+    const all = !members || !next;
+    members = next;
+    return {nodes: changedNodes, links: changedLinks, all};
+  }
+
+  return {select, nodeOn, linkOn};
+}
+
+// How highlight() styles an element, shared by the SVG (graph-live.js) and
+// canvas (canvas-renderer.js) renderers. `any` is whether anything is
+// selected: with nothing selected every element looks as first drawn;
+// otherwise the selection grows and its links widen while the rest shrinks
+// and fades. Node scales multiply the rest radius (nodeRadius).
+const SELECTED_SCALE = 1.5;
+const FADED_SCALE = 0.75;
+
+function highlightStyle(any) {
+  return {
+    nodeScale: on => (!any ? 1 : on ? SELECTED_SCALE : FADED_SCALE),
+    nodeOpacity: on => (on ? 1 : 0.2),
+    linkWidth: on => (any && on ? 6 : 3),
+    linkOpacity: on => (!any ? 1 : on ? 0.8 : 0.05),
+  };
+}
@@ -0,0 +1,54 @@
+// Decodes the compact graph payload produced by graphdata.compact_json_from_arrays.
+// Links come back holding node objects, so d3.forceLink never has to
+// resolve them through string ids. Plain {nodes, links} payloads pass through.
+const NODE_RADIUS = 20;
+
+// Radius of a node at rest: NODE_RADIUS, or 0.6-1.4 times it by the node's
+// importance (graphmetrics.importance, 0-1) when the payload carries one
+function nodeRadius(d) {
+  return d.importance === undefined ? NODE_RADIUS : NODE_RADIUS * (0.6 + 0.8 * Math.sqrt(d.importance));
+}
+
+function decodeBuffer(b64) {
+  const bin = atob(b64);
+  const bytes = new Uint8Array(bin.length);
+  for (let i = 0; i < bin.length; i++) bytes[i] = bin.charCodeAt(i);
+  return bytes.buffer;
+}
+
+function decodeUint32(b64) { return new Uint32Array(decodeBuffer(b64)); }
+function decodeFloat32(b64) { return new Float32Array(decodeBuffer(b64)); }
+
+function decodeGraph(payload) {
+  if (payload.format !== "compact") return payload;
+
+  const names = payload.names;
+  const groups = decodeUint32(payload.groups);
+  const src = decodeUint32(payload.source);
+  const tgt = decodeUint32(payload.target);
+
+  const nodes = new Array(names.length);
+  for (let i = 0; i < names.length; i++) {
+    nodes[i] = {id: names[i], group: groups[i], index: i};
+  }
+  // Precomputed layout (graphlayout.positioned_json)
+  const positioned = payload.x !== undefined;
+  if (positioned) {
+    const x = decodeFloat32(payload.x);
+    const y = decodeFloat32(payload.y);
+    for (let i = 0; i < nodes.length; i++) {
+      nodes[i].x = x[i];
+      nodes[i].y = y[i];
+    }
+  }
+  // Node importance (graphmetrics.importance)
+  if (payload.importance !== undefined) {
+    const importance = decodeFloat32(payload.importance);
+    for (let i = 0; i < nodes.length; i++) nodes[i].importance = importance[i];
+  }
+  const links = new Array(src.length);
+  for (let i = 0; i < src.length; i++) {
+    links[i] = {source: nodes[src[i]], target: nodes[tgt[i]], index: i};
+  }
+  return {nodes, links, positioned};
+}
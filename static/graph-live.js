@@ -0,0 +1,403 @@
+// Force-directed SVG view behind the graphlive.py component, edited in
+// place instead of rebuilt. load(graph) draws a decoded graph; apply(delta)
+// adds and removes nodes and links by name (graphdata.diff_graphs) on the
+// running simulation: surviving nodes keep their positions, new nodes start
+// next to their placed neighbours, and only the changed nodes and their
+// neighbours within opts.reheatHops links move while the rest stay pinned.
+// select(nodeId, group) sets the highlight; clicks and dropdown changes are
+// reported to onSelect({node, group}). Elements outside the viewport (plus
+// a margin for radii and labels) are detached and not updated on ticks.
+// Nodes are sized by their importance when the graph carries one
+// (nodeRadius in graph-decode.js); delta.resize updates it by name.
+// Only the labels chosen by label-layer.js are displayed, re-chosen when the
+// zoom ends, the selection or hovered node changes and the layout sleeps.
+// Needs graph-adjacency.js, ambient-motion.js, viewport-index.js,
+// node-glow.js and label-layer.js.
+const LIVE_SEP = "\u0000";
+const CULL_LEFT = 200;   // px left of the view kept attached: labels run rightwards
+const CULL_MARGIN = 50;  // px kept on the other sides
+
+function createLiveGraph(opts, onSelect) {
+  const width = opts.width;
+  const height = opts.height;
+  const svg = d3.select("svg").attr("width", width).attr("height", height);
+  const color = d3.scaleOrdinal(opts.palette);
+  const glow = createGlow(svg, opts.glowMaxNodes);
+  const labels = createLabelLayer(opts);
+
+  let transform = d3.zoomIdentity;
+  const zoomLayer = svg.append("g");
+  svg.call(d3.zoom().scaleExtent([0.2, 5]).on("zoom", event => {
+    transform = event.transform;
+    zoomLayer.attr("transform", transform);
+    refresh(undefined);
+  }).on("end", relabel));
+  const linkLayer = zoomLayer.append("g");
+  const nodeLayer = zoomLayer.append("g");
+
+  let nodes = [];
+  let links = [];
+  const byId = new Map();   // name -> node
+  const pairs = new Map();  // "source\0target" -> links between them
+  let nextUid = 0;
+  let link = linkLayer.selectAll("line");
+  let node = nodeLayer.selectAll("g.node");
+  let nodeEls = [];
+  let linkEls = [];
+  let textEls = [];
+  let nodeLinks = [];       // node index -> incident link indices
+
+  // Viewport culling: attached elements and scratch marks, per index
+  const index = createViewportIndex();
+  let shownNodes = [];
+  let shownLinks = [];
+  let nodeShown = new Uint8Array(0);
+  let linkShown = new Uint8Array(0);
+  let nodeMark = new Uint8Array(0);
+  let linkMark = new Uint8Array(0);
+  let movedMark = new Uint8Array(0);
+  let selection = null;
+  let current = {node: null, group: null};
+  let labelled = [];        // node indices whose label is displayed
+  let labelMark = new Uint8Array(0);
+  let hovered = null;
+
+  const simulation = d3.forceSimulation()
+    .force("link", d3.forceLink().distance(opts.linkDistance).strength(opts.linkStrength))
+    .force("charge", d3.forceManyBody().strength(opts.charge))
+    .force("center", d3.forceCenter(width / 2, height / 2))
+    .force("collision", d3.forceCollide().radius(opts.collideRadius))
+    .velocityDecay(opts.velocityDecay);
+
+  // Ambient motion: cools and sleeps when still, pauses while hidden, and
+  // moves only the nodes it was focused on (bursts, local reheats)
+  const ambient = ambientMotion(simulation, opts.motion, ticked, relabel);
+
+  const drag = d3.drag()
+    .on("start", (event, d) => { if (!event.active) { simulation.alphaTarget(0.3); ambient.wake(0.3); } d.fx = d.x; d.fy = d.y; })
+    .on("drag", (event, d) => { d.fx = event.x; d.fy = event.y; })
+    .on("end", (event, d) => { if (!event.active) simulation.alphaTarget(0); d.fx = null; d.fy = null; });
+
+  // ------------------- Graph state -------------------
+  function addLink(source, target) {
+    const l = {source, target, uid: nextUid++};
+    const key = source.id + LIVE_SEP + target.id;
+    if (!pairs.has(key)) pairs.set(key, []);
+    pairs.get(key).push(l);
+    links.push(l);
+    return l;
+  }
+
+  function load(graph) {
+    ambient.sleep();
+    nodes = [];
+    links = [];
+    byId.clear();
+    pairs.clear();
+    graph.nodes.forEach(d => {
+      const n = {id: d.id, group: d.group};
+      if (graph.positioned) { n.x = d.x; n.y = d.y; }
+      if (d.importance !== undefined) n.importance = d.importance;
+      byId.set(n.id, n);
+      nodes.push(n);
+    });
+    graph.links.forEach(l => addLink(byId.get(l.source.id), byId.get(l.target.id)));
+    restructure();
+
+    // Precomputed layout: render it directly instead of simulating from scratch
+    if (graph.positioned) {
+      ticked(null);
+      relabel();
+      if (opts.layoutMode !== "static") ambient.wake(0.1);
+    } else {
+      ambient.wake(1);
+    }
+  }
+
+  // Start a new node at the mean position of its already placed neighbours
+  function place(d, neighbours) {
+    const placed = neighbours.filter(n => n.x !== undefined);
+    const jitter = () => (Math.random() - 0.5) * opts.linkDistance;
+    if (placed.length) {
+      d.x = d3.mean(placed, n => n.x) + jitter();
+      d.y = d3.mean(placed, n => n.y) + jitter();
+    } else {
+      d.x = width / 2 + jitter();
+      d.y = height / 2 + jitter();
+    }
+  }
+
+  function apply(delta) {
+    ambient.sleep();
+    const touched = new Set();
+
+    delta.removeLinks.forEach(([s, t]) => {
+      const list = pairs.get(s + LIVE_SEP + t);
+      if (!list || !list.length) return;
+      list.pop().removed = true;
+      if (!list.length) pairs.delete(s + LIVE_SEP + t);
+      touched.add(s);
+      touched.add(t);
+    });
+    links = links.filter(l => !l.removed);
+
+    delta.removeNodes.forEach(id => byId.delete(id));
+    nodes = nodes.filter(d => byId.has(d.id));
+
+    delta.regroup.forEach(([id, group]) => {
+      const d = byId.get(id);
+      if (d) d.group = group;
+    });
+
+    const fresh = delta.addNodes.map(([id, group]) => {
+      const d = {id, group};
+      byId.set(id, d);
+      nodes.push(d);
+      touched.add(id);
+      return d;
+    });
+    const neighbours = new Map(fresh.map(d => [d, []]));
+    delta.addLinks.forEach(([s, t]) => {
+      const l = addLink(byId.get(s), byId.get(t));
+      if (neighbours.has(l.source)) neighbours.get(l.source).push(l.target);
+      if (neighbours.has(l.target)) neighbours.get(l.target).push(l.source);
+      touched.add(s);
+      touched.add(t);
+    });
+    fresh.forEach(d => place(d, neighbours.get(d)));
+    (delta.resize || []).forEach(([id, importance]) => {
+      const d = byId.get(id);
+      if (d) d.importance = importance;
+    });
+
+    restructure();
+    ticked(null);
+    relabel();
+    reheat(touched);
+  }
+
+  // Wake only the changed nodes and their neighbours within opts.reheatHops links
+  function reheat(touched) {
+    const hot = new Set([...touched].map(id => byId.get(id)).filter(d => d));
+    if (!hot.size) return;
+    let frontier = [...hot];
+    for (let hop = 0; hop < opts.reheatHops; hop++) {
+      const next = [];
+      frontier.forEach(d => nodeLinks[d.index].forEach(i => {
+        const l = links[i];
+        const n = l.source === d ? l.target : l.source;
+        if (!hot.has(n)) { hot.add(n); next.push(n); }
+      }));
+      frontier = next;
+    }
+    ambient.focus([...hot], opts.reheatAlpha);
+  }
+
+  // ------------------- Drawing -------------------
+  function restructure() {
+    simulation.nodes(nodes);
+    simulation.force("link").links(links);
+
+    link = link.data(links, l => l.uid)
+      .join("line")
+      .attr("class", "link")
+      .attr("stroke-width", 3);
+
+    node = node.data(nodes, d => d.id)
+      .join(enter => {
+        const g = enter.append("g").attr("class", "node").call(drag);
+        g.append("circle").attr("class", "halo").attr("r", d => nodeRadius(d) * GLOW_SPREAD);
+        g.append("circle").attr("class", "dot").attr("r", nodeRadius);
+        g.append("text").attr("x", LABEL_DX).attr("y", LABEL_DY).attr("display", "none").text(d => d.id);
+        return g;
+      });
+    node.on("click", (event, d) => {
+      event.stopPropagation(); // prevent background reset
+      pick(d.id, d.group);
+    });
+    node.on("mouseenter", (event, d) => { hovered = d; relabel(); })
+      .on("mouseleave", () => { hovered = null; relabel(); });
+
+    nodeEls = node.nodes();
+    linkEls = link.nodes();
+    textEls = node.select("text").nodes();
+    const adjacency = buildAdjacency({nodes, links});
+    nodeLinks = nodes.map((d, i) => adjacency.nodeLinks(i));
+
+    // Entering elements are attached, surviving ones keep their state
+    nodeShown = Uint8Array.from(nodeEls, el => (el.parentNode ? 1 : 0));
+    linkShown = Uint8Array.from(linkEls, el => (el.parentNode ? 1 : 0));
+    shownNodes = [];
+    nodeShown.forEach((on, i) => { if (on) shownNodes.push(i); });
+    shownLinks = [];
+    linkShown.forEach((on, i) => { if (on) shownLinks.push(i); });
+    nodeMark = new Uint8Array(nodes.length);
+    movedMark = new Uint8Array(nodes.length);
+    linkMark = new Uint8Array(links.length);
+    labelMark = Uint8Array.from(textEls, el => (el.hasAttribute("display") ? 0 : 1));
+    labelled = [];
+    labelMark.forEach((on, i) => { if (on) labelled.push(i); });
+    if (hovered && !byId.has(hovered.id)) hovered = null;
+    index.invalidate();
+    glow.update(nodes.length);
+    selection = createSelection({nodes, links}, adjacency);
+    fillDropdowns();
+
+    // Keep the current highlight unless its node or cluster is gone
+    const keepNode = current.node !== null && byId.has(current.node) ? current.node : null;
+    const keepGroup = current.group !== null && nodes.some(d => String(d.group) === String(current.group))
+      ? current.group : null;
+    highlight(keepNode, keepGroup, 0);
+  }
+
+  function placeNode(i) {
+    const d = nodes[i];
+    nodeEls[i].setAttribute("transform", `translate(${d.x},${d.y})`);
+  }
+
+  function placeLink(i) {
+    const l = links[i];
+    const el = linkEls[i];
+    el.setAttribute("x1", l.source.x); el.setAttribute("y1", l.source.y);
+    el.setAttribute("x2", l.target.x); el.setAttribute("y2", l.target.y);
+  }
+
+  // active: the nodes ambient motion is moving, or null when everything moves
+  function ticked(active) {
+    if (active) index.move(active);
+    else index.invalidate();
+    refresh(active);
+  }
+
+  // Attach what is in view, detach the rest, and position the attached
+  // elements that moved (active: null = all, a list = those nodes,
+  // undefined = none, the view changed). Newly attached ones are always placed.
+  function refresh(active) {
+    const [x0, y0] = transform.invert([-CULL_LEFT, -CULL_MARGIN]);
+    const [x1, y1] = transform.invert([width + CULL_MARGIN, height + CULL_MARGIN]);
+    const visible = index.query(nodes, x0, y0, x1, y1).map(d => d.index);
+    const visibleLinks = incidentLinks(visible.map(i => nodes[i]), i => nodeLinks[i], linkMark);
+
+    visible.forEach(i => { nodeMark[i] = 1; });
+    shownNodes.forEach(i => { if (!nodeMark[i]) { nodeEls[i].remove(); nodeShown[i] = 0; } });
+    visibleLinks.forEach(l => { linkMark[l] = 1; });
+    shownLinks.forEach(l => { if (!linkMark[l]) { linkEls[l].remove(); linkShown[l] = 0; } });
+    if (active) active.forEach(d => { movedMark[d.index] = 1; });
+
+    const nodeRoot = nodeLayer.node();
+    visible.forEach(i => {
+      if (!nodeShown[i]) {
+        nodeRoot.appendChild(nodeEls[i]);
+        nodeShown[i] = 1;
+        placeNode(i);
+      } else if (active === null || (active && movedMark[i])) {
+        placeNode(i);
+      }
+      nodeMark[i] = 0;
+    });
+    const linkRoot = linkLayer.node();
+    visibleLinks.forEach(l => {
+      if (!linkShown[l]) {
+        linkRoot.appendChild(linkEls[l]);
+        linkShown[l] = 1;
+        placeLink(l);
+      } else if (active === null || (active && (movedMark[links[l].source.index] || movedMark[links[l].target.index]))) {
+        placeLink(l);
+      }
+      linkMark[l] = 0;
+    });
+
+    if (active) active.forEach(d => { movedMark[d.index] = 0; });
+    shownNodes = visible;
+    shownLinks = visibleLinks;
+  }
+
+  // ------------------- Labels -------------------
+  function importance(i) {
+    const d = nodes[i];
+    if (d === hovered) return LABEL_HOVERED;
+    const degree = nodeLinks[i].length;
+    const selected = (current.node !== null || current.group !== null) && selection.nodeOn[i];
+    return selected ? LABEL_SELECTED + degree : degree;
+  }
+
+  // Display the labels placed for the attached nodes, hide the others
+  function relabel() {
+    const placed = labels.place(shownNodes, nodes, importance, transform);
+    placed.forEach(i => { labelMark[i] |= 2; });
+    labelled.forEach(i => { if (labelMark[i] === 1) textEls[i].setAttribute("display", "none"); });
+    placed.forEach(i => { if (labelMark[i] === 2) textEls[i].removeAttribute("display"); });
+    labelled.forEach(i => { labelMark[i] = 0; });
+    placed.forEach(i => { labelMark[i] = 1; });
+    labelled = placed;
+  }
+
+  // ------------------- Highlight -------------------
+  // Only the elements whose on/off state flips get a transition
+  function highlight(nodeId, group, duration) {
+    current = {node: nodeId, group};
+    const none = nodeId === null && group === null;
+    const change = selection.select(nodeId, group);
+    const nodeOn = d => selection.nodeOn[d.index];
+    const linkOn = d => selection.linkOn[d.index];
+    const changedNodes = change.all ? node : d3.selectAll(change.nodes.map(i => nodeEls[i]));
+    const changedLinks = change.all ? link : d3.selectAll(change.links.map(i => linkEls[i]));
+
+    const style = highlightStyle(!none);
+    const radius = d => nodeRadius(d) * style.nodeScale(nodeOn(d));
+    const fill = d => nodeOn(d) ? color(d.group) : "#555";
+    changedNodes.select("circle.dot")
+      .transition().duration(duration)
+      .attr("r", radius)
+      .attr("fill", fill)
+      .attr("opacity", d => style.nodeOpacity(nodeOn(d)));
+    changedNodes.select("circle.halo")
+      .attr("fill", d => glow.fill(fill(d)))
+      .transition().duration(duration)
+      .attr("r", d => radius(d) * GLOW_SPREAD)
+      .attr("opacity", d => style.nodeOpacity(nodeOn(d)));
+    changedNodes.select("text")
+      .transition().duration(duration)
+      .attr("opacity", d => style.nodeOpacity(nodeOn(d)));
+    changedLinks.transition().duration(duration)
+      .attr("stroke-width", d => style.linkWidth(linkOn(d)))
+      .attr("opacity", d => style.linkOpacity(linkOn(d)));
+    relabel();
+  }
+
+  function select(nodeId, group) {
+    highlight(nodeId, group, 300);
+    nodeSelect.value = nodeId === null ? "" : nodeId;
+    clusterSelect.value = group === null ? "" : group;
+  }
+
+  // Selections made in the page are reported back
+  function pick(nodeId, group) {
+    select(nodeId, group);
+    onSelect({node: nodeId, group: group === null ? null : Number(group)});
+  }
+
+  // ------------------- Dropdowns -------------------
+  const nodeSelect = document.getElementById("nodeSelect");
+  const clusterSelect = document.getElementById("clusterSelect");
+
+  function fillSelect(el, placeholder, values, label) {
+    const keep = el.value;
+    el.replaceChildren(new Option(placeholder, ""));
+    values.forEach(v => el.appendChild(new Option(label(v), v)));
+    el.value = values.some(v => String(v) === keep) ? keep : "";
+  }
+
+  function fillDropdowns() {
+    fillSelect(nodeSelect, "--Select Node--", nodes.map(d => d.id), v => v);
+    const clusters = [...new Set(nodes.map(d => d.group))].sort((a, b) => a - b);
+    fillSelect(clusterSelect, "--Select Cluster--", clusters, g => "Cluster " + g);
+  }
+
+  nodeSelect.addEventListener("change", function() { pick(this.value || null, null); });
+  clusterSelect.addEventListener("change", function() { pick(null, this.value === "" ? null : this.value); });
+  // Background click reset
+  svg.on("click", event => { if (event.target.tagName === "svg") pick(null, null); });
+
+  return {load, apply, select};
+}
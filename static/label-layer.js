@@ -0,0 +1,72 @@
+// Label culling and placement for graph-live.js and canvas-renderer.js.
+// A 19 px label on every node costs text layout and paint on every frame and
+// piles labels on top of each other. place() picks the nodes that get one:
+//   - none while labels would be under opts.minLabelPx tall on screen;
+//   - of the candidates (the nodes in view), those whose importance reaches
+//     opts.labelDegree / k, so zooming in admits less connected nodes;
+//     importance is the degree, and pages rank hovered and selected nodes
+//     above every degree so they always qualify;
+//   - most important first, each only if its label box lands on screen
+//     cells (LABEL_CELL px) that no placed label covers yet;
+//   - opts.maxLabels at most.
+// Pages call it when the view settles (zoom end, selection, hover, the
+// layout going to sleep), never per tick.
+const LABEL_FONT_PX = 19;
+const LABEL_DX = 26;           // label offset from the node centre, graph units
+const LABEL_DY = 6;
+const LABEL_CELL = 8;          // px per occupancy-grid cell
+const LABEL_CHAR_WIDTH = 0.6;  // mean glyph width / font size, bold Arial
+const LABEL_ASCENT = 0.8;      // cap height above the baseline / font size
+const LABEL_SELECTED = 1e9;    // importance added for selected nodes ...
+const LABEL_HOVERED = Infinity; // ... and given to the hovered one
+
+function createLabelLayer(opts) {
+  const cols = Math.ceil(opts.width / LABEL_CELL);
+  const rows = Math.ceil(opts.height / LABEL_CELL);
+  const grid = new Uint8Array(cols * rows);
+
+  // candidates: node indices; importance(i) -> number; returns the labelled indices
+  function place(candidates, nodes, importance, transform) {
+    const k = transform.k;
+    const font = LABEL_FONT_PX * k;
+    if (font < opts.minLabelPx) return [];
+    const threshold = opts.labelDegree / k;
+
+    const score = new Map();
+    const ranked = [];
+    for (const i of candidates) {
+      const s = importance(i);
+      if (s >= threshold) { score.set(i, s); ranked.push(i); }
+    }
+    ranked.sort((a, b) => score.get(b) - score.get(a));
+
+    grid.fill(0);
+    const placed = [];
+    for (const i of ranked) {
+      if (placed.length >= opts.maxLabels) break;
+      const d = nodes[i];
+      const x0 = transform.applyX(d.x + LABEL_DX);
+      const x1 = x0 + String(d.id).length * LABEL_CHAR_WIDTH * font;
+      const y1 = transform.applyY(d.y + LABEL_DY);
+      const y0 = y1 - LABEL_ASCENT * font;
+      if (x1 < 0 || x0 >= opts.width || y1 < 0 || y0 >= opts.height) continue;
+
+      const c0 = Math.max(0, Math.floor(x0 / LABEL_CELL));
+      const c1 = Math.min(cols - 1, Math.floor(x1 / LABEL_CELL));
+      const r0 = Math.max(0, Math.floor(y0 / LABEL_CELL));
+      const r1 = Math.min(rows - 1, Math.floor(y1 / LABEL_CELL));
+      let free = true;
+      for (let r = r0; r <= r1 && free; r++) {
+        for (let c = c0; c <= c1; c++) {
+          if (grid[r * cols + c]) { free = false; break; }
+        }
+      }
+      if (!free) continue;
+      for (let r = r0; r <= r1; r++) grid.fill(1, r * cols + c0, r * cols + c1 + 1);
+      placed.push(i);
+    }
+    return placed;
+  }
+
+  return {place};
+}
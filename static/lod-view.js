@@ -0,0 +1,225 @@
+// Level-of-detail view for graphs too large to draw node by node. Starts
+// from one super-node per cluster (graphlayout.lod_json) joined by links
+// carrying the number of edges between them, and expands clusters into
+// their sub-clusters and finally their members as they grow on screen.
+// At most opts.maxUnits circles and opts.maxLinks lines are in the DOM,
+// whatever the graph size. Positions come from the precomputed layout.
+const LOD_NONE = 0xFFFFFFFF;
+
+function csrOf(keys, nKeys) {
+  const start = new Uint32Array(nKeys + 1);
+  for (let i = 0; i < keys.length; i++) if (keys[i] !== LOD_NONE) start[keys[i] + 1]++;
+  for (let k = 0; k < nKeys; k++) start[k + 1] += start[k];
+  const items = new Uint32Array(start[nKeys]);
+  const cursor = start.slice(0, nKeys);
+  for (let i = 0; i < keys.length; i++) if (keys[i] !== LOD_NONE) items[cursor[keys[i]]++] = i;
+  return [start, items];
+}
+
+function decodeLod(payload) {
+  const lod = {
+    parent: decodeUint32(payload.parent),
+    count: decodeUint32(payload.count),
+    x: decodeFloat32(payload.x),
+    y: decodeFloat32(payload.y),
+    radius: decodeFloat32(payload.radius),
+    group: decodeUint32(payload.group),
+    leaf: decodeUint32(payload.leaf),
+  };
+  lod.size = lod.parent.length;
+  [lod.childStart, lod.children] = csrOf(lod.parent, lod.size);
+  [lod.memberStart, lod.members] = csrOf(lod.leaf, lod.size);
+  lod.roots = [];
+  for (let a = 0; a < lod.size; a++) if (lod.parent[a] === LOD_NONE) lod.roots.push(a);
+  return lod;
+}
+
+function renderLodGraph(graph, lod, opts) {
+  const width = opts.width;
+  const height = opts.height;
+  const nodes = graph.nodes;
+  const links = graph.links;
+  const A = lod.size;
+  const color = d3.scaleOrdinal(opts.palette);
+
+  const svg = d3.select("svg");
+  const layer = svg.append("g");
+  const linkLayer = layer.append("g");
+  const unitLayer = layer.append("g");
+  let transform = d3.zoomIdentity;
+
+  // ------------------- Cut through the hierarchy -------------------
+  const expanded = new Uint8Array(A);
+  const unitAgg = new Uint32Array(A);
+
+  function shownChildren(a) {
+    return (lod.childStart[a + 1] - lod.childStart[a]) + (lod.memberStart[a + 1] - lod.memberStart[a]);
+  }
+
+  function onScreen(a) {
+    const [px, py] = transform.apply([lod.x[a], lod.y[a]]);
+    const r = lod.radius[a] * transform.k;
+    return px + r >= 0 && px - r <= width && py + r >= 0 && py - r <= height;
+  }
+
+  // Expand the largest visible clusters first, level by level, while the
+  // number of drawn units stays within budget
+  function computeCut() {
+    expanded.fill(0);
+    let shown = lod.roots.length;
+    let frontier = lod.roots;
+    while (frontier.length) {
+      const candidates = frontier
+        .filter(a => Math.max(lod.radius[a], 20) * transform.k >= opts.expandPx && onScreen(a))
+        .sort((a, b) => lod.radius[b] - lod.radius[a]);
+      const next = [];
+      for (const a of candidates) {
+        const extra = shownChildren(a) - 1;
+        if (shown + extra > opts.maxUnits) continue;
+        expanded[a] = 1;
+        shown += extra;
+        for (let k = lod.childStart[a]; k < lod.childStart[a + 1]; k++) next.push(lod.children[k]);
+      }
+      frontier = next;
+    }
+    // Parents precede children, so one pass finds each aggregate's drawn ancestor
+    for (let a = 0; a < A; a++) {
+      const p = lod.parent[a];
+      unitAgg[a] = p !== LOD_NONE && !expanded[p] ? unitAgg[p] : a;
+    }
+  }
+
+  // Drawn unit of a node: its own circle (A + i) or the collapsed cluster holding it
+  function unitOf(i) {
+    const a = lod.leaf[i];
+    const u = unitAgg[a];
+    return u === a && expanded[a] ? A + i : u;
+  }
+
+  function collectUnits() {
+    const units = [];
+    for (let a = 0; a < A; a++) {
+      if (unitAgg[a] !== a) continue;
+      if (!expanded[a]) {
+        const count = lod.count[a];
+        const r = Math.max(20, Math.min(lod.radius[a], 6 * Math.sqrt(count)));
+        units.push({key: a, cluster: a, x: lod.x[a], y: lod.y[a], r, group: lod.group[a],
+                    label: "Cluster " + lod.group[a] + " · " + count.toLocaleString()});
+      } else {
+        for (let k = lod.memberStart[a]; k < lod.memberStart[a + 1]; k++) {
+          const d = nodes[lod.members[k]];
+          units.push({key: A + d.index, cluster: null, x: d.x, y: d.y, r: 20, group: d.group, label: d.id});
+        }
+      }
+    }
+    return units;
+  }
+
+  function collectLinks(position) {
+    const U = A + nodes.length;
+    const counts = new Map();
+    for (let l = 0; l < links.length; l++) {
+      let s = unitOf(links[l].source.index);
+      let t = unitOf(links[l].target.index);
+      if (s === t) continue;
+      if (s > t) [s, t] = [t, s];
+      const key = s * U + t;
+      counts.set(key, (counts.get(key) || 0) + 1);
+    }
+    const out = [];
+    counts.forEach((count, key) => {
+      const s = Math.floor(key / U);
+      out.push({key, source: position.get(s), target: position.get(key - s * U), count});
+    });
+    out.sort((a, b) => b.count - a.count);
+    return out.slice(0, opts.maxLinks);
+  }
+
+  // ------------------- Drawing -------------------
+  function draw() {
+    computeCut();
+    const units = collectUnits();
+    const position = new Map(units.map(u => [u.key, u]));
+
+    linkLayer.selectAll("line")
+      .data(collectLinks(position), d => d.key)
+      .join("line")
+      .attr("class", "link")
+      .attr("x1", d => d.source.x).attr("y1", d => d.source.y)
+      .attr("x2", d => d.target.x).attr("y2", d => d.target.y)
+      .attr("stroke-width", d => 1.5 + Math.log2(d.count));
+
+    const unit = unitLayer.selectAll("g.unit")
+      .data(units, d => d.key)
+      .join(enter => {
+        const g = enter.append("g").attr("class", "unit");
+        g.append("circle");
+        g.append("text");
+        return g;
+      })
+      .classed("cluster", d => d.cluster !== null)
+      .attr("transform", d => `translate(${d.x},${d.y})`);
+    unit.select("circle")
+      .attr("r", d => d.r)
+      .attr("fill", d => color(d.group));
+    unit.select("text")
+      .attr("x", d => d.r + 6)
+      .attr("y", 6)
+      .attr("font-size", d => Math.max(19, d.r / 3))
+      .text(d => d.label);
+  }
+
+  // ------------------- Zoom -------------------
+  let x0 = Infinity, y0 = Infinity, x1 = -Infinity, y1 = -Infinity;
+  lod.roots.forEach(a => {
+    x0 = Math.min(x0, lod.x[a] - lod.radius[a]);
+    x1 = Math.max(x1, lod.x[a] + lod.radius[a]);
+    y0 = Math.min(y0, lod.y[a] - lod.radius[a]);
+    y1 = Math.max(y1, lod.y[a] + lod.radius[a]);
+  });
+  function fit(cx, cy, r) {
+    const k = Math.min(8, 0.45 * Math.min(width, height) / Math.max(r, 1));
+    return d3.zoomIdentity.translate(width / 2, height / 2).scale(k).translate(-cx, -cy);
+  }
+  const overview = lod.roots.length
+    ? fit((x0 + x1) / 2, (y0 + y1) / 2, Math.max(x1 - x0, y1 - y0) / 2)
+    : d3.zoomIdentity;
+
+  let pending = null;
+  const zoom = d3.zoom()
+    .scaleExtent([Math.min(0.2, overview.k / 2), 8])
+    .on("zoom", event => {
+      transform = event.transform;
+      layer.attr("transform", transform);
+      if (pending === null) pending = setTimeout(() => { pending = null; draw(); }, opts.redrawDelay);
+    });
+  svg.call(zoom);
+
+  function zoomTo(a) {
+    svg.transition().duration(600).call(zoom.transform, fit(lod.x[a], lod.y[a], lod.radius[a]));
+  }
+
+  unitLayer.on("click", event => {
+    const g = event.target.closest("g.unit");
+    if (g && g.__data__.cluster !== null) zoomTo(g.__data__.cluster);
+  });
+
+  // ------------------- Cluster dropdown -------------------
+  const clusterSelect = document.getElementById("clusterSelect");
+  lod.roots.forEach(a => {
+    const opt = document.createElement("option");
+    opt.value = a;
+    opt.text = "Cluster " + lod.group[a];
+    clusterSelect.appendChild(opt);
+  });
+  clusterSelect.addEventListener("change", function() {
+    if (this.value === "") svg.transition().duration(600).call(zoom.transform, overview);
+    else zoomTo(+this.value);
+  });
+
+  svg.call(zoom.transform, overview);
+  clearTimeout(pending);
+  pending = null;
+  draw();
+  return {zoomTo, draw};
+}
@@ -0,0 +1,36 @@
+// Node glow without a per-node SVG filter (graph-live.js, network7.py,
+// network8.py). An feGaussianBlur filter on every circle is re-rasterized
+// per node on every tick. Here each colour gets one radial-gradient halo in
+// <defs>, which the browser renders once, and every node draws it as a
+// plain circle under its own, as cheap to paint as the circle itself.
+// Labels get a stroked outline (paint-order) instead of a blurred
+// text-shadow. Past maxNodes the halos and outlines are switched off by
+// the "no-glow" class on the <svg> (see the pages' CSS).
+const GLOW_SPREAD = 1.45;  // halo radius / circle radius, the reach of the old blur
+
+function createGlow(svg, maxNodes) {
+  let defs = svg.select("defs");
+  if (defs.empty()) defs = svg.insert("defs", ":first-child");
+  const ids = new Map();  // colour -> gradient id
+
+  // Halo fill for a circle of colour c
+  function fill(c) {
+    if (!ids.has(c)) {
+      const id = "glow-" + ids.size;
+      const gradient = defs.append("radialGradient").attr("id", id);
+      gradient.append("stop").attr("offset", 1 / GLOW_SPREAD)
+        .attr("stop-color", c).attr("stop-opacity", 0.6);
+      gradient.append("stop").attr("offset", 1)
+        .attr("stop-color", c).attr("stop-opacity", 0);
+      ids.set(c, id);
+    }
+    return `url(#${ids.get(c)})`;
+  }
+
+  // Glow on or off for a graph of this size
+  function update(nodeCount) {
+    svg.classed("no-glow", nodeCount > maxNodes);
+  }
+
+  return {fill, update};
+}
@@ -0,0 +1,74 @@
+// Spatial index of node positions for viewport culling (graph-live.js,
+// canvas-renderer.js). Nodes are filed in a d3.quadtree under the position
+// they had when last indexed: move(nodes) re-files only the nodes that
+// moved, and query() visits only the quadrants overlapping the rectangle,
+// so per-frame work tracks the moving and visible nodes, not graph size.
+// Links are culled through their endpoints: a link is drawn when either end
+// is within the viewport margin.
+function createViewportIndex() {
+  let tree = null;
+  let stale = true;
+
+  function file(d) {
+    d._qx = d.x;
+    d._qy = d.y;
+  }
+
+  // Re-file everything on the next query (after the whole layout moved)
+  function invalidate() {
+    stale = true;
+  }
+
+  function rebuild(nodes) {
+    nodes.forEach(file);
+    tree = d3.quadtree().x(d => d._qx).y(d => d._qy).addAll(nodes);
+    stale = false;
+  }
+
+  function move(moved) {
+    if (stale) return;
+    moved.forEach(d => {
+      tree.remove(d);
+      file(d);
+      tree.add(d);
+    });
+  }
+
+  // Nodes inside [x0, x1] x [y0, y1] (graph coordinates)
+  function query(nodes, x0, y0, x1, y1) {
+    if (stale) rebuild(nodes);
+    const out = [];
+    tree.visit((q, qx0, qy0, qx1, qy1) => {
+      if (!q.length) {
+        do {
+          const d = q.data;
+          if (d._qx >= x0 && d._qx <= x1 && d._qy >= y0 && d._qy <= y1) out.push(d);
+        } while ((q = q.next));
+      }
+      return qx0 > x1 || qy0 > y1 || qx1 < x0 || qy1 < y0;
+    });
+    return out;
+  }
+
+  function find(nodes, x, y, radius) {
+    if (stale) rebuild(nodes);
+    return tree.find(x, y, radius);
+  }
+
+  return {invalidate, move, query, find};
+}
+
+// Indices of the links incident to `visible`, each once; `mark` is a
+// scratch Uint8Array with one slot per link, left cleared.
+function incidentLinks(visible, nodeLinks, mark) {
+  const out = [];
+  visible.forEach(d => {
+    const incident = nodeLinks(d.index);
+    for (let k = 0; k < incident.length; k++) {
+      const l = incident[k];
+      if (!mark[l]) { mark[l] = 1; out.push(l); }
+    }
+  });
+  out.forEach(l => { mark[l] = 0; });
+  return out;
+}
@@ -0,0 +1,20 @@
+import pytest
+
+from chartassets import D3_ASSET, asset_hash, d3_script, read_asset
+
+
+def test_inline_d3_embeds_the_vendored_library():
+    tag = d3_script("inline")
+    assert read_asset(D3_ASSET) in tag
+    assert f'data-sha1="{asset_hash(D3_ASSET)}"' in tag
+    assert tag.startswith("<script data-asset=")
+
+
+def test_static_d3_is_a_versioned_local_url():
+    tag = d3_script("static")
+    assert tag == f'<script src="/app/static/{D3_ASSET}?v={asset_hash(D3_ASSET)}"></script>'
+
+
+def test_unknown_mode():
+    with pytest.raises(ValueError):
+        d3_script("cdn")
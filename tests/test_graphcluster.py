@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from graphcluster import label_propagation, louvain, modularity
+
+
+def _cliques(sizes, bridges=True):
+    # Complete subgraphs of the given sizes, consecutive ones joined by one edge
+    src, tgt, start, firsts = [], [], 0, []
+    for size in sizes:
+        for i in range(start, start + size):
+            for j in range(i + 1, start + size):
+                src.append(i)
+                tgt.append(j)
+        firsts.append(start)
+        start += size
+    if bridges:
+        for a, b in zip(firsts, firsts[1:]):
+            src.append(a)
+            tgt.append(b)
+    return start, np.array(src), np.array(tgt)
+
+
+def _partition(labels):
+    return sorted(sorted(np.flatnonzero(labels == g).tolist()) for g in np.unique(labels))
+
+
+@pytest.mark.parametrize("method", [louvain, label_propagation])
+def test_cliques_become_communities_largest_first(method):
+    n, src, tgt = _cliques([8, 6, 5])
+    labels = method(n, src, tgt)
+
+    assert labels.dtype == np.int32
+    assert _partition(labels) == [list(range(0, 8)), list(range(8, 14)), list(range(14, 19))]
+    # Numbered by size, so the largest clique gets the first colour
+    assert labels[0] == 0 and labels[8] == 1 and labels[14] == 2
+
+
+def test_louvain_beats_singletons_and_matches_networkx_modularity():
+    nx = pytest.importorskip("networkx")
+    rng = np.random.default_rng(1)
+    n, src, tgt = _cliques([12, 10, 9, 7])
+    # Noise edges between the cliques
+    src = np.r_[src, rng.integers(0, n, 15)]
+    tgt = np.r_[tgt, rng.integers(0, n, 15)]
+    labels = louvain(n, src, tgt)
+
+    g = nx.MultiGraph()
+    g.add_nodes_from(range(n))
+    g.add_edges_from(zip(src.tolist(), tgt.tolist()))
+    communities = [set(np.flatnonzero(labels == c).tolist()) for c in np.unique(labels)]
+    expected = nx.community.modularity(g, communities)
+
+    assert modularity(n, src, tgt, labels) == pytest.approx(expected, abs=1e-9)
+    assert modularity(n, src, tgt, labels) > modularity(n, src, tgt, np.arange(n))
+    assert modularity(n, src, tgt, labels) > 0.5
+
+
+def test_edgeless_graph_keeps_one_node_per_community():
+    empty = np.array([], dtype=np.int64)
+    for method in (louvain, label_propagation):
+        assert sorted(method(4, empty, empty).tolist()) == [0, 1, 2, 3]
+    assert modularity(4, empty, empty, np.zeros(4, dtype=np.int64)) == 0.0
@@ -0,0 +1,125 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from graphdata import (
+    artifact_dir, build_graph, compile_graph, csv_fingerprint, diff_graphs, invalidate_graphs,
+    load_artifact_array, load_graph, open_artifact, read_edges, save_artifact_array, stream_graph,
+)
+
+
+def _as_names(built):
+    names = built.names
+    groups = dict(zip(names.tolist(), built.groups.tolist()))
+    edges = sorted(zip(names[built.source].tolist(), names[built.target].tolist()))
+    return groups, edges
+
+
+def test_stream_and_memory_builds_agree_on_numeric_ids(tmp_path):
+    csv = tmp_path / "edges.csv"
+    rng = np.random.default_rng(0)
+    pd.DataFrame({
+        "source": rng.integers(0, 50, 300),
+        "target": rng.integers(0, 50, 300),
+    }).to_csv(csv, index=False)
+
+    in_memory = build_graph(read_edges(csv))
+    streamed = stream_graph(str(csv), chunksize=64)
+
+    assert all(isinstance(n, str) for n in in_memory.names.tolist())
+    assert all(isinstance(n, str) for n in streamed.names.tolist())
+    assert _as_names(in_memory) == _as_names(streamed)
+    # One chunk numbers the nodes exactly like the in-memory build
+    single = stream_graph(str(csv), chunksize=1000)
+    assert in_memory.names.tolist() == single.names.tolist()
+    assert np.array_equal(in_memory.source, single.source)
+    assert np.array_equal(in_memory.target, single.target)
+
+
+def _apply(delta, old):
+    # Replays a diff_graphs delta on old's groups and edge multiset
+    groups, edges = _as_names(old)
+    for name in delta["removeNodes"]:
+        del groups[name]
+    for name, group in delta["addNodes"] + delta["regroup"]:
+        groups[name] = group
+    for pair in delta["removeLinks"]:
+        edges.remove(tuple(pair))
+    edges.extend(tuple(pair) for pair in delta["addLinks"])
+    return groups, sorted(edges)
+
+
+def test_diff_graphs_replays_to_the_new_graph():
+    old = build_graph(pd.DataFrame({
+        "source": ["a", "a", "a", "b", "c"],
+        "target": ["b", "b", "c", "c", "d"],
+    }))
+    new = build_graph(pd.DataFrame({
+        "source": ["a", "b", "b", "c", "e"],
+        "target": ["b", "c", "c", "e", "a"],
+    }))
+    delta = diff_graphs(old, new)
+
+    assert delta["removeNodes"] == ["d"]
+    assert [name for name, _ in delta["addNodes"]] == ["e"]
+    # Duplicate edges count: one of the two a->b goes, a second b->c comes
+    assert sorted(map(tuple, delta["removeLinks"])) == [("a", "b"), ("a", "c"), ("c", "d")]
+    assert sorted(map(tuple, delta["addLinks"])) == [("b", "c"), ("c", "e"), ("e", "a")]
+    assert _apply(delta, old) == _as_names(new)
+    assert diff_graphs(new, new) == {key: [] for key in delta}
+
+
+def test_diff_graphs_of_random_versions():
+    rng = np.random.default_rng(2)
+
+    def version(n):
+        return build_graph(pd.DataFrame({
+            "source": [f"n{i}" for i in rng.integers(0, n, 200)],
+            "target": [f"n{i}" for i in rng.integers(0, n, 200)],
+        }), grouping="louvain")
+
+    old, new = version(40), version(50)
+    assert _apply(diff_graphs(old, new), old) == _as_names(new)
+
+
+def test_artifact_round_trip(tmp_path):
+    csv = tmp_path / "edges.csv"
+    pd.DataFrame({"source": ["a", "b", "7"], "target": ["b", "c", "a"]}).to_csv(csv, index=False)
+    fingerprint = csv_fingerprint(str(csv))
+
+    compiled = compile_graph(str(csv), fingerprint=fingerprint)
+    assert compiled.artifact == artifact_dir(str(csv))
+    save_artifact_array(compiled, "layout", np.arange(4.0))
+
+    # What a later process sees: the edges memory-mapped, the same graph
+    opened = open_artifact(str(csv), fingerprint)
+    assert isinstance(opened.source, np.memmap)
+    assert opened.names.tolist() == compiled.names.tolist()
+    assert np.array_equal(opened.groups, compiled.groups)
+    assert _as_names(opened) == _as_names(compiled)
+    assert load_artifact_array(opened, "layout").tolist() == [0.0, 1.0, 2.0, 3.0]
+    assert load_artifact_array(opened, "missing") is None
+    # Another grouping is computed and stored on first use
+    louvain = open_artifact(str(csv), fingerprint, grouping="louvain")
+    assert os.path.exists(os.path.join(louvain.artifact, "groups.louvain.npy"))
+
+    invalidate_graphs()
+    loaded = load_graph(str(csv))
+    assert isinstance(loaded.source, np.memmap)
+    assert _as_names(loaded) == _as_names(compiled)
+
+
+def test_stale_artifact_is_ignored(tmp_path):
+    csv = tmp_path / "edges.csv"
+    pd.DataFrame({"source": ["a"], "target": ["b"]}).to_csv(csv, index=False)
+    old = csv_fingerprint(str(csv))
+    compile_graph(str(csv), fingerprint=old)
+
+    pd.DataFrame({"source": ["a", "b"], "target": ["b", "c"]}).to_csv(csv, index=False)
+    new = csv_fingerprint(str(csv))
+    assert open_artifact(str(csv), new) is None
+    rebuilt = load_graph(str(csv))
+    assert rebuilt.fingerprint == new
+    assert _as_names(rebuilt)[1] == [("a", "b"), ("b", "c")]
+    assert open_artifact(str(csv), new) is not None
@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import graphexport
+from graphdata import build_graph
+from graphexport import place_labels, snapshot, to_svg
+
+
+def _star(n):
+    return build_graph(pd.DataFrame({"source": [f"leaf{i}" for i in range(n)], "target": ["hub"] * n}))
+
+
+def _grid_positions(n):
+    x = np.arange(n, dtype=np.float32) % 10 * 200
+    y = np.arange(n, dtype=np.float32) // 10 * 200
+    return x, y
+
+
+def test_given_positions_skip_the_layout(monkeypatch):
+    built = _star(30)
+
+    def no_layout(*args, **kwargs):
+        raise AssertionError("layout_positions called")
+
+    monkeypatch.setattr(graphexport, "layout_positions", no_layout)
+    g = snapshot(built, 1200, 700, positions=_grid_positions(len(built.names)))
+    assert len(g["x"]) == len(built.names)
+    assert (g["x"] >= 0).all() and (g["x"] <= 1200).all()
+    assert to_svg(built, positions=_grid_positions(len(built.names))).startswith("<svg")
+
+
+def test_labels_rank_by_importance_without_overlap():
+    # Three labels on one spot: only the best scored is placed
+    x = np.array([100.0, 100.0, 100.0, 600.0])
+    y = np.array([100.0, 100.0, 100.0, 400.0])
+    names = np.array(["a", "b", "c", "d"], dtype=object)
+    score = np.array([0.1, 0.9, 0.5, 0.2])
+    assert place_labels(x, y, names, 19.0, 1.0, score, 1200, 700).tolist() == [1, 3]
+    assert place_labels(x, y, names, 19.0, 1.0, score, 1200, 700, max_labels=1).tolist() == [1]
+    assert len(place_labels(x, y, names, 5.0, 1.0, score, 1200, 700)) == 0
+
+
+def test_png_matches_svg_size():
+    pytest.importorskip("PIL")
+    from PIL import Image
+    import io
+
+    built = _star(5)
+    png = graphexport.to_png(built, 300, 200, positions=_grid_positions(len(built.names)))
+    assert Image.open(io.BytesIO(png)).size == (300, 200)
@@ -0,0 +1,49 @@
+import json
+import time
+
+import numpy as np
+
+from graphdata import load_graph
+from graphlayout import _grid_pairs, _layout_batch, component_layout, lod_json, positioned_json
+
+
+def test_component_layout_without_nodes():
+    x, y = component_layout(0, np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.int32), processes=1)
+    assert x.dtype == y.dtype == np.float32
+    assert len(x) == len(y) == 0
+
+
+def test_header_only_csv(tmp_path):
+    csv = tmp_path / "edges.csv"
+    csv.write_text("source,target\n")
+    built = load_graph(str(csv))
+    assert json.loads(positioned_json(built))["names"] == []
+    assert json.loads(lod_json(built))["format"] == "lod"
+
+
+def test_grid_pairs_stay_within_groups():
+    # Every point in one cell: without groups all pairs, with groups only same-group ones
+    cx = np.zeros(300, dtype=np.int64)
+    group = np.repeat(np.arange(150), 2)
+    i, j = _grid_pairs(cx, cx)
+    assert len(i) == 300 * 299 // 2
+    i, j = _grid_pairs(cx, cx, group)
+    assert len(i) == 150
+    assert np.array_equal(group[i], group[j])
+
+
+def test_many_tiny_components():
+    # A batch of tiny components is simulated on top of itself; collision
+    # pairs must not grow with the square of the batch
+    jobs = [(2, np.array([0]), np.array([1]))] * 1000
+    t0 = time.perf_counter()
+    out = _layout_batch(jobs, {})
+    assert time.perf_counter() - t0 < 10
+    assert len(out) == 1000
+
+    n = 4000
+    src = np.arange(0, n, 2)
+    x, y = component_layout(n, src, src + 1, processes=1)
+    assert np.isfinite(x).all() and np.isfinite(y).all()
+    gap = np.hypot(x[src] - x[src + 1], y[src] - y[src + 1])
+    assert (gap > 45).all()
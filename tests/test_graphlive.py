@@ -0,0 +1,49 @@
+import json
+
+import pandas as pd
+
+import graphlive
+from graphdata import load_graph
+from graphlayout import positioned_json
+
+
+def _write(path, edges):
+    pd.DataFrame(edges, columns=["source", "target"]).to_csv(path, index=False)
+
+
+def test_live_args_sends_a_delta_from_the_cached_version(tmp_path):
+    csv = tmp_path / "edges.csv"
+    _write(csv, [("a", "b"), ("b", "c")])
+    old = load_graph(str(csv), persist=False)
+    shown = {"fingerprint": old.fingerprint, "grouping": "letter"}
+
+    # The page is current: only the version goes out
+    assert graphlive.live_args(old, "letter", shown) == {"version": shown}
+
+    _write(csv, [("a", "b"), ("b", "c"), ("c", "d")])
+    new = load_graph(str(csv), persist=False)
+    args = graphlive.live_args(new, "letter", shown)
+    assert args["version"] == {"fingerprint": new.fingerprint, "grouping": "letter"}
+    assert args["base"] == shown
+    assert args["delta"]["addLinks"] == [["c", "d"]]
+    assert "graph" not in args
+
+
+def test_live_args_sends_the_whole_graph_otherwise(tmp_path, monkeypatch):
+    csv = tmp_path / "edges.csv"
+    _write(csv, [("a", "b"), ("b", "c")])
+    old = load_graph(str(csv), persist=False)
+    shown = {"fingerprint": old.fingerprint, "grouping": "letter"}
+    _write(csv, [("a", "b"), ("b", "c"), ("c", "d")])
+    new = load_graph(str(csv), persist=False)
+
+    def check(args):
+        assert "delta" not in args and "base" not in args
+        assert args["graph"] == positioned_json(new)
+        assert json.loads(args["graph"])["names"] == new.names.tolist()
+
+    # First load, a version no longer cached, or too large a change
+    check(graphlive.live_args(new, "letter", None))
+    check(graphlive.live_args(new, "letter", {"fingerprint": "gone", "grouping": "letter"}))
+    monkeypatch.setattr(graphlive, "MAX_DELTA_LINKS", 0)
+    check(graphlive.live_args(new, "letter", shown))
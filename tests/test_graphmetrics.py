@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from graphdata import build_graph
+from graphmetrics import betweenness, degree, pagerank, top_nodes, top_subgraph
+
+
+def _random_edges(n_nodes, n_edges, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.integers(0, n_nodes, n_edges), rng.integers(0, n_nodes, n_edges)
+
+
+def test_degree_counts_self_loops_once():
+    assert degree(3, [0, 0, 2], [1, 0, 1]).tolist() == [2, 2, 1]
+
+
+def test_pagerank_matches_networkx():
+    nx = pytest.importorskip("networkx")
+    src, tgt = _random_edges(60, 240)
+    g = nx.MultiDiGraph()  # duplicate links add weight, as in pagerank()
+    g.add_nodes_from(range(60))
+    g.add_edges_from(zip(src.tolist(), tgt.tolist()))
+    expected = nx.pagerank(g, alpha=0.85, tol=1e-12)
+    rank = pagerank(60, src, tgt)
+    assert rank.sum() == pytest.approx(1.0)
+    assert np.allclose(rank, [expected[i] for i in range(60)], atol=1e-6)
+
+
+def test_betweenness_is_exact_on_small_graphs():
+    nx = pytest.importorskip("networkx")
+    src, tgt = _random_edges(40, 90, seed=1)
+    g = nx.Graph()
+    g.add_nodes_from(range(40))
+    g.add_edges_from((s, t) for s, t in zip(src.tolist(), tgt.tolist()) if s != t)
+    expected = nx.betweenness_centrality(g, normalized=True)
+    assert np.allclose(betweenness(40, src, tgt), [expected[i] for i in range(40)], atol=1e-9)
+
+
+def test_betweenness_of_a_path_peaks_in_the_middle():
+    values = betweenness(5, [0, 1, 2, 3], [1, 2, 3, 4])
+    assert values.argmax() == 2
+    assert values[0] == values[4] == 0
+
+
+def test_top_subgraph_without_fingerprint():
+    # A star around "hub" plus a pair: the hub and its leaves rank first
+    df = pd.DataFrame({"source": ["a", "b", "c", "d", "x"], "target": ["hub"] * 4 + ["y"]})
+    built = build_graph(df)
+    assert built.fingerprint is None
+    top = top_subgraph(built, 2)
+    assert top.fingerprint is None
+    assert len(top.names) == 2
+    assert "hub" in top.names.tolist()
+    assert built.names[top_nodes(built, 1)[0]] == "hub"
+    assert top_subgraph(built, 10) is built
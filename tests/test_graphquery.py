@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from graphdata import build_graph
+from graphquery import QueryIndex, focus_graph
+
+
+def _random_graph(n=60, m=150, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "source": [f"n{i}" for i in rng.integers(0, n, m)],
+        "target": [f"n{i}" for i in rng.integers(0, n, m)],
+    })
+    return build_graph(df)
+
+
+def test_neighbourhood_matches_networkx_balls():
+    nx = pytest.importorskip("networkx")
+    built = _random_graph()
+    index = QueryIndex(built)
+    g = nx.Graph()
+    g.add_nodes_from(range(len(built.names)))
+    g.add_edges_from(zip(built.source.tolist(), built.target.tolist()))
+
+    for seed in (0, 7, 21):
+        for hops in (0, 1, 2):
+            nodes, truncated = index.neighbourhood([seed], hops)
+            expected = nx.single_source_shortest_path_length(g, seed, cutoff=hops)
+            assert not truncated
+            assert nodes[0] == seed
+            assert sorted(nodes.tolist()) == sorted(expected)
+            # Ring by ring: distances never decrease along the result
+            distances = [expected[v] for v in nodes.tolist()]
+            assert distances == sorted(distances)
+
+
+def test_links_among_and_members():
+    built = _random_graph(seed=1)
+    index = QueryIndex(built)
+    nodes = np.arange(0, len(built.names), 3)
+    inside = np.isin(built.source, nodes) & np.isin(built.target, nodes)
+    assert index.links_among(nodes).tolist() == np.flatnonzero(inside).tolist()
+
+    for group in np.unique(built.groups).tolist():
+        assert index.members(group).tolist() == np.flatnonzero(built.groups == group).tolist()
+    assert index.members(-1).tolist() == []
+    assert index.node("n0") == built.names.tolist().index("n0")
+    assert index.node("missing") is None
+
+
+def test_self_loops_are_listed_once():
+    built = build_graph(pd.DataFrame({"source": ["a", "a"], "target": ["a", "b"]}))
+    index = QueryIndex(built)
+    a = index.node("a")
+    assert index.links_among([a]).tolist() == [0]
+    assert sorted(index.neighbourhood([a], 1)[0].tolist()) == sorted(range(len(built.names)))
+
+
+def test_limit_keeps_the_most_important_of_the_last_ring():
+    # A hub with five leaves; leaf "l4" also links to three more nodes
+    edges = [("hub", f"l{i}") for i in range(5)] + [("l4", f"x{i}") for i in range(3)]
+    built = build_graph(pd.DataFrame(edges, columns=["source", "target"]))
+    index = QueryIndex(built)
+    hub = index.node("hub")
+    score = np.zeros(len(built.names))
+    score[index.node("l2")] = 1.0
+
+    nodes, truncated = index.neighbourhood([hub], 2, limit=2, score=score)
+    assert truncated
+    assert built.names[nodes].tolist() == ["hub", "l2"]
+
+
+def test_focus_graph_cuts_a_subgraph():
+    edges = [("hub", f"l{i}") for i in range(5)] + [("l4", "far")]
+    built = build_graph(pd.DataFrame(edges, columns=["source", "target"]))
+
+    view, truncated = focus_graph(built, node="hub", hops=1, limit=None)
+    assert not truncated
+    assert view.names[0] == "hub"
+    assert sorted(view.names.tolist()) == sorted(["hub"] + [f"l{i}" for i in range(5)])
+    assert len(view.source) == 5
+    assert sorted(view.names[view.target].tolist()) == [f"l{i}" for i in range(5)]
+
+    view, truncated = focus_graph(built, node="hub", hops=2, limit=3)
+    assert truncated and len(view.names) == 3
+    assert focus_graph(built, node="missing") == (None, False)
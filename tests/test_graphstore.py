@@ -0,0 +1,81 @@
+import gc
+import threading
+import time
+
+import numpy as np
+
+from graphstore import GraphStore, hold
+
+
+def test_held_entries_survive_and_released_ones_are_evicted_lru():
+    store = GraphStore(max_idle=1)
+    a = store.acquire("a", lambda: np.arange(3))
+    b = store.acquire("b", lambda: np.arange(4))
+    store.acquire("c", lambda: np.arange(5))  # released at once, stays idle
+
+    # Over max_idle only idle entries go; held ones stay whatever the limit
+    assert store.stats()["held"] == 2
+    assert store.get("a") is not None and store.get("b") is not None
+
+    del a
+    gc.collect()
+    stats = store.stats()
+    # "c" was the least recently used idle entry
+    assert store.get("c") is None and store.get("a") is not None
+    assert stats["held"] == 1 and stats["refs"] == 1 and stats["evictions"] == 1
+    assert b.value.tolist() == [0, 1, 2, 3]
+    assert not b.value.flags.writeable
+
+
+def test_idle_bytes_limit():
+    store = GraphStore(max_idle=10, max_idle_bytes=1000)
+    store.put("small", np.zeros(30))    # 240 bytes
+    store.put("big", np.zeros(100))     # 800 bytes: together over the limit
+    assert store.get("small") is None
+    assert store.get("big") is not None
+    assert store.stats()["bytes"] == 800
+
+
+def test_acquire_builds_once_for_concurrent_callers():
+    store = GraphStore()
+    calls = []
+
+    def build():
+        calls.append(1)
+        time.sleep(0.05)
+        return np.arange(10)
+
+    refs = []
+    threads = [threading.Thread(target=lambda: refs.append(store.acquire("k", build))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(calls) == 1
+    assert len({id(r.value) for r in refs}) == 1
+    assert store.stats()["refs"] == 8
+    assert store.acquire("missing") is None
+
+
+def test_invalidate_keeps_the_value_for_holders():
+    store = GraphStore()
+    old = store.acquire(("g", 1), lambda: np.array([1]))
+    store.acquire(("h", 1), lambda: np.array([2]))
+
+    assert store.invalidate(lambda key: key[0] == "g") == 1
+    assert store.get(("g", 1)) is None and store.get(("h", 1)) is not None
+    assert old.value.tolist() == [1]
+
+    new = store.acquire(("g", 1), lambda: np.array([3]))
+    assert new.value.tolist() == [3]
+    # Releasing the dropped reference leaves the rebuilt entry alone
+    del old
+    gc.collect()
+    assert store.get(("g", 1)).tolist() == [3]
+    assert store.stats()["refs"] == 1
+
+
+def test_hold_outside_a_script_run_does_nothing():
+    store = GraphStore()
+    ref = store.acquire("a", lambda: np.arange(2))
+    assert hold("graph", ref) is None